@@ -5,6 +5,7 @@ with validation and hot reload capabilities.
 """
 
 import json
+import logging
 import os
 import time
 from pathlib import Path
@@ -22,6 +23,12 @@ except ImportError:
 
 from .schema import DNSServerConfig, create_default_config
 
+logger = logging.getLogger(__name__)
+
+# Settings of the retired upstream connection pool. Config files that still
+# set them load, with a warning that they have no effect
+_RETIRED_SERVER_KEYS = ("max_upstream_connections", "connection_timeout")
+
 
 class ConfigLoader:
     """Configuration loader with hot reload support."""
@@ -158,10 +165,19 @@ class ConfigLoader:
                 "workers": config.server.workers,
                 "max_concurrent_requests": config.server.max_concurrent_requests,
                 "request_queue_size": config.server.request_queue_size,
-                "max_upstream_connections": config.server.max_upstream_connections,
-                "connection_timeout": config.server.connection_timeout,
                 "keepalive_timeout": config.server.keepalive_timeout,
                 "max_clients": config.server.max_clients,
+                "udp_rcvbuf": config.server.udp_rcvbuf,
+                "udp_sndbuf": config.server.udp_sndbuf,
+                "max_inflight": config.server.max_inflight,
+                "response_cache_size": config.server.response_cache_size,
+                "edns0_enabled": config.server.edns0_enabled,
+                "negative_ttl_max": config.server.negative_ttl_max,
+                "negative_error_ttl": config.server.negative_error_ttl,
+                "negative_cache_size": config.server.negative_cache_size,
+                "adaptive_concurrency": config.server.adaptive_concurrency,
+                "target_latency_ms": config.server.target_latency_ms,
+                "min_concurrent_requests": config.server.min_concurrent_requests,
             },
             "upstream_servers": config.upstream_servers,
             "logging": {
@@ -232,8 +248,14 @@ class ConfigLoader:
             WebConfig,
         )
 
+        server_dict = dict(config_dict.get("server", {}))
+        for key in _RETIRED_SERVER_KEYS:
+            if key in server_dict:
+                del server_dict[key]
+                logger.warning(f"Ignoring server.{key}: the setting has been retired")
+
         # Create configuration objects with validation
-        server_config = ServerConfig(**config_dict.get("server", {}))
+        server_config = ServerConfig(**server_dict)
         logging_config = LoggingConfig(**config_dict.get("logging", {}))
         security_config = SecurityConfig(**config_dict.get("security", {}))
         monitoring_config = MonitoringConfig(**config_dict.get("monitoring", {}))
@@ -57,10 +57,19 @@ class ServerConfig:
     workers: int = 1
     max_concurrent_requests: int = 1000
     request_queue_size: int = 5000
-    max_upstream_connections: int = 100
-    connection_timeout: float = 30.0
     keepalive_timeout: float = 60.0
     max_clients: int = 1000
+    udp_rcvbuf: int = 4 * 1024 * 1024
+    udp_sndbuf: int = 4 * 1024 * 1024
+    max_inflight: int = 10000
+    response_cache_size: int = 10000
+    edns0_enabled: bool = True
+    negative_ttl_max: int = 300
+    negative_error_ttl: int = 5
+    negative_cache_size: int = 10000
+    adaptive_concurrency: bool = False
+    target_latency_ms: float = 200.0
+    min_concurrent_requests: int = 10
 
     def __post_init__(self) -> None:
         """Validate server configuration."""
@@ -86,23 +95,60 @@ class ServerConfig:
                 f"Request queue size must be positive: {self.request_queue_size}"
             )
 
-        if not validate_positive_int(self.max_upstream_connections):
+        if not validate_positive_float(self.keepalive_timeout):
             raise ValueError(
-                f"Max upstream connections must be positive: {self.max_upstream_connections}"
+                f"Keepalive timeout must be positive: {self.keepalive_timeout}"
             )
 
-        if not validate_positive_float(self.connection_timeout):
+        if not validate_positive_int(self.max_clients):
+            raise ValueError(f"Max clients must be positive: {self.max_clients}")
+
+        if not validate_positive_int(self.udp_rcvbuf):
+            raise ValueError(f"UDP receive buffer must be positive: {self.udp_rcvbuf}")
+
+        if not validate_positive_int(self.udp_sndbuf):
+            raise ValueError(f"UDP send buffer must be positive: {self.udp_sndbuf}")
+
+        if not validate_positive_int(self.max_inflight):
+            raise ValueError(f"Max in-flight must be positive: {self.max_inflight}")
+
+        if not validate_positive_int(self.response_cache_size):
             raise ValueError(
-                f"Connection timeout must be positive: {self.connection_timeout}"
+                f"Response cache size must be positive: {self.response_cache_size}"
             )
 
-        if not validate_positive_float(self.keepalive_timeout):
+        if not validate_boolean(self.edns0_enabled):
+            raise ValueError(f"EDNS0 enabled must be boolean: {self.edns0_enabled}")
+
+        if not validate_positive_int(self.negative_ttl_max):
             raise ValueError(
-                f"Keepalive timeout must be positive: {self.keepalive_timeout}"
+                f"Negative TTL max must be positive: {self.negative_ttl_max}"
             )
 
-        if not validate_positive_int(self.max_clients):
-            raise ValueError(f"Max clients must be positive: {self.max_clients}")
+        if not validate_positive_int(self.negative_error_ttl):
+            raise ValueError(
+                f"Negative error TTL must be positive: {self.negative_error_ttl}"
+            )
+
+        if not validate_positive_int(self.negative_cache_size):
+            raise ValueError(
+                f"Negative cache size must be positive: {self.negative_cache_size}"
+            )
+
+        if not validate_boolean(self.adaptive_concurrency):
+            raise ValueError(
+                f"Adaptive concurrency must be boolean: {self.adaptive_concurrency}"
+            )
+
+        if not validate_positive_float(self.target_latency_ms):
+            raise ValueError(
+                f"Target latency must be positive: {self.target_latency_ms}"
+            )
+
+        if not validate_positive_int(self.min_concurrent_requests):
+            raise ValueError(
+                f"Min concurrent requests must be positive: {self.min_concurrent_requests}"
+            )
 
 
 @dataclass
@@ -152,9 +198,7 @@ class SecurityConfig:
             )
 
         if not validate_boolean(self.debug_client_ip):
-            raise ValueError(
-                f"Debug client IP must be boolean: {self.debug_client_ip}"
-            )
+            raise ValueError(f"Debug client IP must be boolean: {self.debug_client_ip}")
 
 
 @dataclass
@@ -210,9 +254,7 @@ class LoggingConfig:
             )
 
         if self.structured_format not in ["json", "key_value"]:
-            raise ValueError(
-                f"Invalid structured format: {self.structured_format}"
-            )
+            raise ValueError(f"Invalid structured format: {self.structured_format}")
 
 
 @dataclass
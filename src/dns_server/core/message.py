@@ -8,15 +8,24 @@ This module implements RFC 1035 compliant DNS message handling including:
 - Support for all required record types (A, AAAA, CNAME, MX, NS, PTR, TXT, SOA)
 """
 
+import functools
 import logging
 import socket
 import struct
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Precompiled layouts of the fixed-size parts of a message
+_HEADER = struct.Struct("!HHHHHH")
+_QUESTION_TAIL = struct.Struct("!HH")  # QTYPE, QCLASS
+_RR_FIXED = struct.Struct("!HHIH")  # TYPE, CLASS, TTL, RDLENGTH
+_HEADER_START = struct.Struct("!HHH")  # ID, flags, QDCOUNT
+_U16 = struct.Struct("!H")
+_U16_PAIR = struct.Struct("!HH")
+
 
 class DNSOpcode(IntEnum):
     """DNS Operation Codes"""
@@ -69,7 +78,7 @@ class DNSClass(IntEnum):
     ANY = 255
 
 
-@dataclass
+@dataclass(slots=True)
 class DNSHeader:
     """DNS Message Header"""
 
@@ -119,8 +128,7 @@ class DNSHeader:
 
     def to_bytes(self) -> bytes:
         """Convert header to bytes"""
-        return struct.pack(
-            "!HHHHHH",
+        return _HEADER.pack(
             self.transaction_id,
             self.flags,
             self.question_count,
@@ -135,24 +143,60 @@ class DNSHeader:
         if len(data) < 12:
             raise ValueError("Invalid DNS header: too short")
 
-        tid, flags, qcount, acount, authcount, addcount = struct.unpack(
-            "!HHHHHH", data[:12]
-        )
-
-        flag_components = cls.parse_flags(flags)
+        tid, flags, qcount, acount, authcount, addcount = _HEADER.unpack_from(data)
 
-        return cls(
-            transaction_id=tid,
-            flags=flags,
-            question_count=qcount,
-            answer_count=acount,
-            authority_count=authcount,
-            additional_count=addcount,
-            **flag_components,
-        )
+        return cls._construct(tid, flags, (qcount, acount, authcount, addcount))
 
-
-@dataclass
+    @classmethod
+    def _construct(
+        cls, tid: int, flags: int, counts: Tuple[int, int, int, int]
+    ) -> "DNSHeader":
+        """Build a header from wire values without the __post_init__ round-trip"""
+        hdr = cls.__new__(cls)
+        hdr.transaction_id = tid
+        hdr.flags = flags
+        (
+            hdr.question_count,
+            hdr.answer_count,
+            hdr.authority_count,
+            hdr.additional_count,
+        ) = counts
+
+        # Flags are already authoritative, so only split them out
+        hdr.qr = bool(flags & 0x8000)
+        hdr.opcode = (flags >> 11) & 0x0F
+        hdr.aa = bool(flags & 0x0400)
+        hdr.tc = bool(flags & 0x0200)
+        hdr.rd = bool(flags & 0x0100)
+        hdr.ra = bool(flags & 0x0080)
+        hdr.z = (flags >> 4) & 0x07
+        hdr.rcode = flags & 0x0F
+        return hdr
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_name(name: str) -> bytes:
+    """Encode domain name using DNS label encoding
+
+    Responses repeat the same owner names, so encodings are cached.
+    """
+    if name == ".":
+        return b"\x00"
+
+    buf = bytearray()
+    for label in name.rstrip(".").split("."):
+        label_bytes = label.encode("ascii")
+        if len(label_bytes) > 63:
+            raise ValueError(f"Label too long: {label}")
+        buf.append(len(label_bytes))
+        buf += label_bytes
+    buf.append(0)  # Root label
+    if len(buf) > 255:
+        raise ValueError(f"Name too long: {name}")
+    return bytes(buf)
+
+
+@dataclass(frozen=True, slots=True)
 class DNSQuestion:
     """DNS Question Section"""
 
@@ -162,23 +206,12 @@ class DNSQuestion:
 
     def to_bytes(self) -> bytes:
         """Convert question to bytes"""
-        name_bytes = self._encode_name(self.name)
-        return name_bytes + struct.pack("!HH", self.qtype, self.qclass)
+        name_bytes = _encode_name(self.name)
+        return name_bytes + _QUESTION_TAIL.pack(self.qtype, self.qclass)
 
     def _encode_name(self, name: str) -> bytes:
         """Encode domain name using DNS label encoding"""
-        if name == ".":
-            return b"\x00"
-
-        labels = name.rstrip(".").split(".")
-        result = b""
-        for label in labels:
-            label_bytes = label.encode("ascii")
-            if len(label_bytes) > 63:
-                raise ValueError(f"Label too long: {label}")
-            result += struct.pack("!B", len(label_bytes)) + label_bytes
-        result += b"\x00"  # Root label
-        return result
+        return _encode_name(name)
 
     @classmethod
     def parse(cls, data: bytes, offset: int) -> Tuple["DNSQuestion", int]:
@@ -187,7 +220,7 @@ class DNSQuestion:
         if new_offset + 4 > len(data):
             raise ValueError("Invalid question: not enough data for type and class")
 
-        qtype, qclass = struct.unpack("!HH", data[new_offset : new_offset + 4])
+        qtype, qclass = _QUESTION_TAIL.unpack_from(data, new_offset)
         return cls(name=name, qtype=qtype, qclass=qclass), new_offset + 4
 
     @staticmethod
@@ -196,9 +229,11 @@ class DNSQuestion:
         labels = []
         original_offset = offset
         jumped = False
+        n = len(data)
+        segment_start = offset
 
         while True:
-            if offset >= len(data):
+            if offset >= n:
                 raise ValueError("Invalid name: offset out of bounds")
 
             length = data[offset]
@@ -209,26 +244,31 @@ class DNSQuestion:
                 break
             elif (length & 0xC0) == 0xC0:
                 # Name compression
-                if offset + 1 >= len(data):
+                if offset + 1 >= n:
                     raise ValueError("Invalid compression pointer")
                 pointer = ((length & 0x3F) << 8) | data[offset + 1]
+                # Each jump must land strictly before the labels read so far,
+                # otherwise a crafted pointer chain would loop forever
+                if pointer >= segment_start:
+                    raise ValueError("Invalid compression pointer: loop")
                 if not jumped:
                     original_offset = offset + 2
                     jumped = True
-                offset = pointer
+                offset = segment_start = pointer
             else:
                 # Regular label
-                if offset + length + 1 > len(data):
+                end = offset + 1 + length
+                if end > n:
                     raise ValueError("Invalid label: length exceeds data")
-                label = data[offset + 1 : offset + 1 + length].decode("ascii")
-                labels.append(label)
-                offset += length + 1
+                labels.append(data[offset + 1 : end])
+                offset = end
 
-        name = ".".join(labels) + "." if labels else "."
+        # One ASCII decode per name instead of one per label
+        name = b".".join(labels).decode("ascii") + "." if labels else "."
         return name, original_offset if jumped else offset
 
 
-@dataclass
+@dataclass(slots=True)
 class DNSResourceRecord:
     """DNS Resource Record"""
 
@@ -237,13 +277,14 @@ class DNSResourceRecord:
     rclass: int
     ttl: int
     rdata: bytes
+    _readable: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def to_bytes(self) -> bytes:
         """Convert resource record to bytes"""
-        name_bytes = DNSQuestion._encode_name(None, self.name)
-        header = struct.pack(
-            "!HHIH", self.rtype, self.rclass, self.ttl, len(self.rdata)
-        )
+        name_bytes = _encode_name(self.name)
+        header = _RR_FIXED.pack(self.rtype, self.rclass, self.ttl, len(self.rdata))
         return name_bytes + header + self.rdata
 
     @classmethod
@@ -254,9 +295,7 @@ class DNSResourceRecord:
         if new_offset + 10 > len(data):
             raise ValueError("Invalid resource record: not enough data for header")
 
-        rtype, rclass, ttl, rdlength = struct.unpack(
-            "!HHIH", data[new_offset : new_offset + 10]
-        )
+        rtype, rclass, ttl, rdlength = _RR_FIXED.unpack_from(data, new_offset)
         new_offset += 10
 
         if new_offset + rdlength > len(data):
@@ -270,7 +309,13 @@ class DNSResourceRecord:
         )
 
     def get_readable_rdata(self) -> str:
-        """Get human-readable representation of rdata"""
+        """Get human-readable representation of rdata (computed once)"""
+        if self._readable is None:
+            self._readable = self._format_rdata()
+        return self._readable
+
+    def _format_rdata(self) -> str:
+        """Render rdata according to the record type"""
         try:
             if self.rtype == DNSRecordType.A:
                 return socket.inet_ntoa(self.rdata)
@@ -284,7 +329,7 @@ class DNSResourceRecord:
                 name, _ = DNSQuestion._decode_name(self.rdata + b"\x00", 0)
                 return name
             elif self.rtype == DNSRecordType.MX:
-                priority = struct.unpack("!H", self.rdata[:2])[0]
+                (priority,) = _U16.unpack_from(self.rdata)
                 name, _ = DNSQuestion._decode_name(self.rdata[2:] + b"\x00", 0)
                 return f"{priority} {name}"
             elif self.rtype == DNSRecordType.TXT:
@@ -317,7 +362,7 @@ class DNSResourceRecord:
             return self.rdata.hex()
 
 
-@dataclass
+@dataclass(slots=True)
 class DNSMessage:
     """Complete DNS Message"""
 
@@ -328,28 +373,36 @@ class DNSMessage:
     additional: List[DNSResourceRecord]
 
     def to_bytes(self) -> bytes:
-        """Convert entire message to bytes"""
-        # Update counts in header
-        self.header.question_count = len(self.questions)
-        self.header.answer_count = len(self.answers)
-        self.header.authority_count = len(self.authority)
-        self.header.additional_count = len(self.additional)
-
-        result = self.header.to_bytes()
+        """Convert entire message to bytes in a single growing buffer"""
+        header = self.header
+        header.question_count = len(self.questions)
+        header.answer_count = len(self.answers)
+        header.authority_count = len(self.authority)
+        header.additional_count = len(self.additional)
+
+        buf = bytearray(12)
+        _HEADER.pack_into(
+            buf,
+            0,
+            header.transaction_id,
+            header.flags,
+            header.question_count,
+            header.answer_count,
+            header.authority_count,
+            header.additional_count,
+        )
 
         for question in self.questions:
-            result += question.to_bytes()
+            buf += _encode_name(question.name)
+            buf += _QUESTION_TAIL.pack(question.qtype, question.qclass)
 
-        for answer in self.answers:
-            result += answer.to_bytes()
+        for section in (self.answers, self.authority, self.additional):
+            for rr in section:
+                buf += _encode_name(rr.name)
+                buf += _RR_FIXED.pack(rr.rtype, rr.rclass, rr.ttl, len(rr.rdata))
+                buf += rr.rdata
 
-        for auth in self.authority:
-            result += auth.to_bytes()
-
-        for add in self.additional:
-            result += add.to_bytes()
-
-        return result
+        return bytes(buf)
 
     @classmethod
     def from_bytes(cls, data: bytes) -> "DNSMessage":
@@ -392,6 +445,50 @@ class DNSMessage:
             additional=additional,
         )
 
+    @staticmethod
+    def peek_header(data: bytes) -> Tuple[int, int, int]:
+        """Read (transaction_id, flags, rcode) without parsing the message"""
+        if len(data) < 12:
+            raise ValueError("Invalid DNS message: too short")
+
+        tid, flags = _U16_PAIR.unpack_from(data)
+        return tid, flags, flags & 0x000F
+
+    @staticmethod
+    def parse_header_and_first_question(
+        data: bytes,
+    ) -> Tuple[int, int, bytes, int, int]:
+        """Read the header and first question without parsing the rest
+
+        Returns (transaction_id, flags, qname, qtype, qclass) with the QNAME
+        left in wire format. A compressed QNAME is rejected, not followed.
+        """
+        n = len(data)
+        if n < 12:
+            raise ValueError("Invalid DNS message: too short")
+
+        tid, flags, question_count = _HEADER_START.unpack_from(data)
+        if not question_count:
+            raise ValueError("Invalid DNS message: no question")
+
+        offset = 12
+        while True:
+            if offset >= n:
+                raise ValueError("Invalid name: offset out of bounds")
+            length = data[offset]
+            if not length:
+                break
+            if length & 0xC0:
+                raise ValueError("Invalid question: compressed name")
+            offset += length + 1
+
+        name_end = offset + 1
+        if name_end + 4 > n:
+            raise ValueError("Invalid question: not enough data for type and class")
+
+        qtype, qclass = _QUESTION_TAIL.unpack_from(data, name_end)
+        return tid, flags, data[12:name_end], qtype, qclass
+
     def is_query(self) -> bool:
         """Check if this is a query message"""
         return not self.header.qr
@@ -442,7 +539,7 @@ def create_aaaa_record(name: str, ip: str, ttl: int = 300) -> DNSResourceRecord:
 
 def create_cname_record(name: str, target: str, ttl: int = 300) -> DNSResourceRecord:
     """Create a CNAME record"""
-    rdata = DNSQuestion._encode_name(None, target)
+    rdata = _encode_name(target)
     return DNSResourceRecord(
         name=name, rtype=DNSRecordType.CNAME, rclass=DNSClass.IN, ttl=ttl, rdata=rdata
     )
@@ -452,7 +549,7 @@ def create_mx_record(
     name: str, priority: int, target: str, ttl: int = 300
 ) -> DNSResourceRecord:
     """Create an MX record"""
-    rdata = struct.pack("!H", priority) + DNSQuestion._encode_name(None, target)
+    rdata = _U16.pack(priority) + _encode_name(target)
     return DNSResourceRecord(
         name=name, rtype=DNSRecordType.MX, rclass=DNSClass.IN, ttl=ttl, rdata=rdata
     )
@@ -5,35 +5,313 @@ This module provides:
 - Timing decorators for all operations
 - Performance metrics collection
 - Memory usage tracking
-- Connection pooling management
 - Concurrency limiting
 """
 
 import asyncio
 import functools
 import logging
+import os
 import time
+import weakref
+from array import array
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 import psutil
 
 logger = logging.getLogger(__name__)
 
+# Linux exposes RSS (in pages) as the second field of /proc/self/statm
+_PROC_STATM = "/proc/self/statm"
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+class Operation(IntEnum):
+    """Timed operations, used as direct indexes into the metrics table"""
+
+    DNS_REQUEST_HANDLING = 0
+    DNS_RESOLUTION = 1
+    UPSTREAM_FORWARDING = 2
+    RECURSIVE_RESOLUTION = 3
+    UPSTREAM_HEALTH_CHECK = 4
+    DNS_QUERY = 5
+    DNS_QUERY_FALLBACK = 6
+    DNS_QUERY_FAILED = 7
+
+
+def _operation_label(operation: Union[Operation, str]) -> str:
+    """Get the reporting name for an operation"""
+    if isinstance(operation, Operation):
+        return operation.name.lower()
+    return operation
+
+
+class RingBuffer:
+    """Fixed-capacity ring of unboxed float samples
+
+    Samples live in one contiguous array('d') instead of a deque of boxed
+    floats, costing 8 bytes per sample.
+    """
+
+    __slots__ = ("buf", "head", "count", "cap")
+
+    def __init__(self, cap: int):
+        self.buf = array("d", bytes(8 * cap))
+        self.head = 0
+        self.count = 0
+        self.cap = cap
+
+    def append(self, value: float) -> Optional[float]:
+        """Store a sample, returning the evicted one once the ring is full"""
+        head = self.head
+        evicted = self.buf[head] if self.count == self.cap else None
+        self.buf[head] = value
+        head += 1
+        self.head = 0 if head == self.cap else head
+        if evicted is None:
+            self.count += 1
+        return evicted
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[float]:
+        """Iterate samples oldest first"""
+        start = self.head - self.count
+        buf = self.buf
+        for i in range(start, self.head):
+            yield buf[i]
+
+    @property
+    def last(self) -> float:
+        return self.buf[self.head - 1]
+
+
+class RunningStat:
+    """Sliding-window aggregate with O(1) mean/min/max reads
+
+    Keeps a running sum plus monotonic deques for the window minimum and
+    maximum, so reading the aggregates never rescans the samples.
+    """
+
+    __slots__ = ("maxlen", "total", "_window", "_min_q", "_max_q", "_seq")
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self.total = 0.0
+        self._window = RingBuffer(maxlen)
+        self._min_q = deque()  # (value, seq) with increasing values
+        self._max_q = deque()  # (value, seq) with decreasing values
+        self._seq = 0
+
+    def add(self, value: float):
+        """Add a sample, evicting the oldest one once the window is full"""
+        seq = self._seq
+        self._seq = seq + 1
+
+        evicted = self._window.append(value)
+        self.total += value
+        if evicted is not None:
+            self.total -= evicted
+
+        oldest = seq - self.maxlen
+        min_q = self._min_q
+        while min_q and min_q[-1][0] >= value:
+            min_q.pop()
+        min_q.append((value, seq))
+        if min_q[0][1] <= oldest:
+            min_q.popleft()
+
+        max_q = self._max_q
+        while max_q and max_q[-1][0] <= value:
+            max_q.pop()
+        max_q.append((value, seq))
+        if max_q[0][1] <= oldest:
+            max_q.popleft()
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    @property
+    def added(self) -> int:
+        """Total samples ever added; changes whenever the aggregates may"""
+        return self._seq
+
+    @property
+    def last(self) -> float:
+        return self._window.last
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self._window) if self._window else 0.0
+
+    @property
+    def min(self) -> float:
+        return self._min_q[0][0]
+
+    @property
+    def max(self) -> float:
+        return self._max_q[0][0]
+
+
+class LatencyHistogram:
+    """Fixed-memory log-linear latency histogram (HDR-style)
+
+    Values are recorded as integer microseconds. Below 64us every value has
+    its own bucket; above that each power of two is split into 32 buckets,
+    which bounds the relative error of reported percentiles to about 3%.
+    Memory is constant regardless of how many samples are recorded.
+    """
+
+    SUB_BUCKETS = 32
+    MAX_VALUE_US = 60_000_000  # Values above 60s are clamped
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        size = self._index(self.MAX_VALUE_US) + 1
+        self.counts = array("Q", bytes(8 * size))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        """Map a value to its bucket index"""
+        if value < 2 * cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 6
+        return (
+            2 * cls.SUB_BUCKETS
+            + (shift - 1) * cls.SUB_BUCKETS
+            + ((value >> shift) - cls.SUB_BUCKETS)
+        )
+
+    @classmethod
+    def _highest_equivalent(cls, index: int) -> int:
+        """Largest value that maps to the given bucket"""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index
+        shift, sub = divmod(index - 2 * cls.SUB_BUCKETS, cls.SUB_BUCKETS)
+        shift += 1
+        return ((sub + cls.SUB_BUCKETS + 1) << shift) - 1
+
+    def record(self, value_us: int):
+        """Record a single value in microseconds"""
+        if value_us < 0:
+            value_us = 0
+        elif value_us > self.MAX_VALUE_US:
+            value_us = self.MAX_VALUE_US
+
+        self.counts[self._index(value_us)] += 1
+        if not self.count or value_us < self.min:
+            self.min = value_us
+        if value_us > self.max:
+            self.max = value_us
+        self.count += 1
+        self.total += value_us
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> int:
+        """Get the value at the given percentile (0-100)"""
+        return self.percentiles(percentile)[0]
+
+    def percentiles(self, *percentiles: float) -> List[int]:
+        """Get values at several ascending percentiles in one bucket walk"""
+        if not self.count:
+            return [0] * len(percentiles)
+
+        counts = self.counts
+        targets = [max(1, -(-self.count * p // 100)) for p in percentiles]
+        results = []
+        seen = 0
+        pending = 0
+
+        # Only buckets between the recorded min and max can hold samples
+        for index in range(self._index(self.min), self._index(self.max) + 1):
+            bucket_count = counts[index]
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            while seen >= targets[pending]:
+                results.append(min(self._highest_equivalent(index), self.max))
+                pending += 1
+                if pending == len(targets):
+                    return results
+
+        results.extend([self.max] * (len(targets) - pending))
+        return results
+
+
+class WindowedCounter:
+    """Event counter over a sliding window of fixed-width time buckets
+
+    Counts live in a circular array of integers. Stale buckets are zeroed
+    as the clock advances, so recording and reading are O(buckets) at worst
+    and no per-event timestamps are stored.
+    """
+
+    __slots__ = ("buckets", "width", "last_tick")
+
+    def __init__(self, buckets: int = 60, width: float = 5.0):
+        self.buckets = array("I", bytes(4 * buckets))
+        self.width = width
+        self.last_tick = 0
+
+    def _advance(self, now: float) -> int:
+        """Zero buckets that fell out of the window and return the current tick"""
+        tick = int(now // self.width)
+        gap = tick - self.last_tick
+        if gap > 0:
+            buckets = self.buckets
+            size = len(buckets)
+            if gap >= size:
+                for i in range(size):
+                    buckets[i] = 0
+            else:
+                for t in range(self.last_tick + 1, tick + 1):
+                    buckets[t % size] = 0
+            self.last_tick = tick
+        return tick
+
+    def add(self, now: float):
+        """Count one event at the given time"""
+        tick = self._advance(now)
+        self.buckets[tick % len(self.buckets)] += 1
+
+    def total(self, now: float) -> int:
+        """Count events within the window ending at the given time"""
+        self._advance(now)
+        return sum(self.buckets)
+
 
 @dataclass
 class PerformanceMetrics:
     """Container for performance metrics"""
 
-    # Timing metrics
-    operation_times: Dict[str, deque] = field(
-        default_factory=lambda: defaultdict(lambda: deque(maxlen=1000))
+    # Timing metrics, indexed by Operation; ad-hoc names are appended after
+    operation_times: List[LatencyHistogram] = field(
+        default_factory=lambda: [LatencyHistogram() for _ in Operation]
+    )
+    operation_names: List[str] = field(
+        default_factory=lambda: [_operation_label(op) for op in Operation]
+    )
+    operation_index: Dict[str, int] = field(
+        default_factory=lambda: {_operation_label(op): int(op) for op in Operation}
     )
-    operation_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
 
     # Memory metrics
-    memory_usage: deque = field(default_factory=lambda: deque(maxlen=100))
+    memory_usage: RingBuffer = field(default_factory=lambda: RingBuffer(100))
     memory_peak: float = 0.0
 
     # Connection metrics
@@ -42,17 +320,18 @@ class PerformanceMetrics:
     rejected_connections: int = 0
 
     # Queue metrics
-    queue_sizes: Dict[str, deque] = field(
-        default_factory=lambda: defaultdict(lambda: deque(maxlen=100))
+    queue_sizes: Dict[str, RunningStat] = field(
+        default_factory=lambda: defaultdict(lambda: RunningStat(100))
     )
-    queue_wait_times: Dict[str, deque] = field(
-        default_factory=lambda: defaultdict(lambda: deque(maxlen=1000))
+    queue_wait_times: Dict[str, RunningStat] = field(
+        default_factory=lambda: defaultdict(lambda: RunningStat(1000))
     )
 
     # Error metrics
     error_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-    error_rates: Dict[str, deque] = field(
-        default_factory=lambda: defaultdict(lambda: deque(maxlen=100))
+    # 60 buckets of 5 seconds cover the 5 minute error rate window
+    error_rates: Dict[str, WindowedCounter] = field(
+        default_factory=lambda: defaultdict(WindowedCounter)
     )
 
 
@@ -64,6 +343,10 @@ class PerformanceMonitor:
         self._start_time = time.time()
         self._monitoring_task = None
         self._is_monitoring = False
+        self._statm_fd = None
+        self._process = None
+        # Rendered stats per operation/queue, reused until new samples arrive
+        self._snapshots: Dict[Any, tuple] = {}
 
     async def start_monitoring(self, interval: float = 5.0):
         """Start background monitoring"""
@@ -71,6 +354,10 @@ class PerformanceMonitor:
             return
 
         self._is_monitoring = True
+        try:
+            self._statm_fd = os.open(_PROC_STATM, os.O_RDONLY)
+        except (AttributeError, OSError):
+            self._statm_fd = None  # Not Linux, fall back to psutil
         self._monitoring_task = asyncio.create_task(self._monitor_loop(interval))
         logger.info("Performance monitoring started")
 
@@ -86,6 +373,9 @@ class PerformanceMonitor:
                 await self._monitoring_task
             except asyncio.CancelledError:
                 pass
+        if self._statm_fd is not None:
+            os.close(self._statm_fd)
+            self._statm_fd = None
         logger.info("Performance monitoring stopped")
 
     async def _monitor_loop(self, interval: float):
@@ -93,9 +383,7 @@ class PerformanceMonitor:
         while self._is_monitoring:
             try:
                 # Collect memory metrics
-                process = psutil.Process()
-                memory_info = process.memory_info()
-                memory_mb = memory_info.rss / 1024 / 1024
+                memory_mb = self._sample_rss_mb()
 
                 self.metrics.memory_usage.append(memory_mb)
                 if memory_mb > self.metrics.memory_peak:
@@ -111,10 +399,48 @@ class PerformanceMonitor:
                 logger.error(f"Error in monitoring loop: {e}")
                 await asyncio.sleep(interval)
 
-    def record_operation_time(self, operation: str, duration: float):
-        """Record timing for an operation"""
-        self.metrics.operation_times[operation].append(duration)
-        self.metrics.operation_counts[operation] += 1
+    def _operation_slot(self, operation: Union[Operation, str]) -> int:
+        """Resolve an operation to its index, registering unknown names"""
+        if isinstance(operation, int):
+            return operation
+
+        index = self.metrics.operation_index.get(operation)
+        if index is None:
+            index = len(self.metrics.operation_times)
+            self.metrics.operation_times.append(LatencyHistogram())
+            self.metrics.operation_names.append(operation)
+            self.metrics.operation_index[operation] = index
+        return index
+
+    def operation_histogram(self, operation: Union[Operation, str]) -> LatencyHistogram:
+        """Get the histogram an operation records into
+
+        Hot paths can hold on to the result and call record() directly,
+        skipping the per-call operation lookup.
+        """
+        return self.metrics.operation_times[self._operation_slot(operation)]
+
+    def record_operation_time(self, operation: Union[Operation, str], duration: float):
+        """Record timing for an operation (duration in seconds)"""
+        if isinstance(operation, str):
+            operation = self._operation_slot(operation)
+        self.metrics.operation_times[operation].record(round(duration * 1_000_000))
+
+    def record_operation_ns(self, operation: Union[Operation, str], duration_ns: int):
+        """Record timing for an operation (duration in integer nanoseconds)"""
+        if isinstance(operation, str):
+            operation = self._operation_slot(operation)
+        self.metrics.operation_times[operation].record(duration_ns // 1000)
+
+    def _sample_rss_mb(self) -> float:
+        """Get the current resident set size in MB"""
+        if self._statm_fd is not None:
+            rss_pages = int(os.pread(self._statm_fd, 128, 0).split()[1])
+            return rss_pages * _PAGE_SIZE / 1024 / 1024
+
+        if self._process is None:
+            self._process = psutil.Process()
+        return self._process.memory_info().rss / 1024 / 1024
 
     def record_connection_event(self, event_type: str):
         """Record connection events"""
@@ -130,18 +456,21 @@ class PerformanceMonitor:
 
     def record_queue_metrics(self, queue_name: str, size: int, wait_time: float = None):
         """Record queue metrics"""
-        self.metrics.queue_sizes[queue_name].append(size)
+        self.metrics.queue_sizes[queue_name].add(size)
         if wait_time is not None:
-            self.metrics.queue_wait_times[queue_name].append(wait_time)
+            self.metrics.queue_wait_times[queue_name].add(wait_time)
 
     def record_error(self, error_type: str):
         """Record error occurrence"""
         self.metrics.error_counts[error_type] += 1
-        current_time = time.time()
-        self.metrics.error_rates[error_type].append(current_time)
+        self.metrics.error_rates[error_type].add(time.monotonic())
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get comprehensive performance statistics"""
+        """Get comprehensive performance statistics
+
+        Per-operation and per-queue entries are shared between calls while
+        their samples are unchanged, so callers must treat them as read-only.
+        """
         stats = {
             "uptime_seconds": time.time() - self._start_time,
             "memory": self._get_memory_stats(),
@@ -157,7 +486,7 @@ class PerformanceMonitor:
         if not self.metrics.memory_usage:
             return {"current_mb": 0, "peak_mb": 0, "average_mb": 0}
 
-        current = self.metrics.memory_usage[-1]
+        current = self.metrics.memory_usage.last
         average = sum(self.metrics.memory_usage) / len(self.metrics.memory_usage)
 
         return {
@@ -169,19 +498,28 @@ class PerformanceMonitor:
     def _get_operation_stats(self) -> Dict[str, Any]:
         """Get operation timing statistics"""
         stats = {}
-        for operation, times in self.metrics.operation_times.items():
-            if times:
-                avg_time = sum(times) / len(times)
-                min_time = min(times)
-                max_time = max(times)
-                count = self.metrics.operation_counts[operation]
-
+        snapshots = self._snapshots
+        for operation, times in zip(
+            self.metrics.operation_names, self.metrics.operation_times
+        ):
+            if times.count:
+                key = ("operation", operation)
+                cached = snapshots.get(key)
+                if cached is not None and cached[0] == times.count:
+                    stats[operation] = cached[1]
+                    continue
+
+                p50, p95, p99 = times.percentiles(50, 95, 99)
                 stats[operation] = {
-                    "count": count,
-                    "avg_time_ms": round(avg_time * 1000, 2),
-                    "min_time_ms": round(min_time * 1000, 2),
-                    "max_time_ms": round(max_time * 1000, 2),
+                    "count": times.count,
+                    "avg_time_ms": round(times.mean / 1000, 2),
+                    "min_time_ms": round(times.min / 1000, 2),
+                    "max_time_ms": round(times.max / 1000, 2),
+                    "p50_time_ms": round(p50 / 1000, 2),
+                    "p95_time_ms": round(p95 / 1000, 2),
+                    "p99_time_ms": round(p99 / 1000, 2),
                 }
+                snapshots[key] = (times.count, stats[operation])
         return stats
 
     def _get_connection_stats(self) -> Dict[str, Any]:
@@ -195,36 +533,37 @@ class PerformanceMonitor:
     def _get_queue_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
         stats = {}
+        snapshots = self._snapshots
         for queue_name, sizes in self.metrics.queue_sizes.items():
             if sizes:
-                avg_size = sum(sizes) / len(sizes)
-                max_size = max(sizes)
-                current_size = sizes[-1]
+                wait_times = self.metrics.queue_wait_times.get(queue_name)
+                key = ("queue", queue_name)
+                version = (sizes.added, wait_times.added if wait_times else 0)
+                cached = snapshots.get(key)
+                if cached is not None and cached[0] == version:
+                    stats[queue_name] = cached[1]
+                    continue
 
-                wait_times = self.metrics.queue_wait_times[queue_name]
-                avg_wait = sum(wait_times) / len(wait_times) if wait_times else 0
+                avg_wait = wait_times.mean if wait_times else 0
 
                 stats[queue_name] = {
-                    "current_size": current_size,
-                    "avg_size": round(avg_size, 2),
-                    "max_size": max_size,
+                    "current_size": int(sizes.last),
+                    "avg_size": round(sizes.mean, 2),
+                    "max_size": sizes.max,
                     "avg_wait_time_ms": round(avg_wait * 1000, 2),
                 }
+                snapshots[key] = (version, stats[queue_name])
         return stats
 
     def _get_error_stats(self) -> Dict[str, Any]:
         """Get error statistics"""
         stats = {}
-        current_time = time.time()
+        current_time = time.monotonic()
 
         for error_type, count in self.metrics.error_counts.items():
             # Calculate error rate (errors per minute in last 5 minutes)
-            recent_errors = [
-                t
-                for t in self.metrics.error_rates[error_type]
-                if current_time - t < 300  # 5 minutes
-            ]
-            error_rate = len(recent_errors) / 5.0  # per minute
+            recent = self.metrics.error_rates[error_type].total(current_time)
+            error_rate = recent / 5.0  # per minute
 
             stats[error_type] = {
                 "total_count": count,
@@ -233,249 +572,208 @@ class PerformanceMonitor:
         return stats
 
 
-def timing_decorator(operation_name: str, monitor: PerformanceMonitor):
-    """Decorator to time function execution"""
+def timing_decorator(
+    operation_name: Union[Operation, str], monitor: PerformanceMonitor
+):
+    """Decorator to time function execution
+
+    Without a monitor the function is returned unwrapped, so unmonitored
+    call sites pay nothing.
+    """
 
     def decorator(func: Callable) -> Callable:
+        if monitor is None:
+            return func
+
+        # Bind everything the wrappers touch up front to keep lookups local.
+        # The histogram does not reference the monitor and the monitor itself
+        # is only held weakly, so decorated functions never pin its lifetime.
+        clock = time.monotonic_ns
+        record_us = monitor.operation_histogram(operation_name).record
+        monitor_ref = weakref.ref(monitor)
+        error_name = f"{_operation_label(operation_name)}_error"
+
+        def record_err():
+            current = monitor_ref()
+            if current is not None:
+                current.record_error(error_name)
+
         if asyncio.iscoroutinefunction(func):
 
             @functools.wraps(func)
             async def async_wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_ns = clock()
                 try:
-                    result = await func(*args, **kwargs)
-                    return result
+                    return await func(*args, **kwargs)
                 except Exception:
-                    if monitor:
-                        monitor.record_error(f"{operation_name}_error")
+                    record_err()
                     raise
                 finally:
-                    duration = time.time() - start_time
-                    if monitor:
-                        monitor.record_operation_time(operation_name, duration)
+                    record_us((clock() - start_ns) // 1000)
 
             return async_wrapper
         else:
 
             @functools.wraps(func)
             def sync_wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_ns = clock()
                 try:
-                    result = func(*args, **kwargs)
-                    return result
+                    return func(*args, **kwargs)
                 except Exception:
-                    if monitor:
-                        monitor.record_error(f"{operation_name}_error")
+                    record_err()
                     raise
                 finally:
-                    duration = time.time() - start_time
-                    if monitor:
-                        monitor.record_operation_time(operation_name, duration)
+                    record_us((clock() - start_ns) // 1000)
 
             return sync_wrapper
 
     return decorator
 
 
-class ConnectionPool:
-    """Connection pool for upstream DNS queries"""
-
-    def __init__(self, max_connections: int = 100, connection_timeout: float = 30.0):
-        self.max_connections = max_connections
-        self.connection_timeout = connection_timeout
-        self._pools = {}  # server -> list of connections
-        self._in_use = {}  # server -> set of connection ids
-        self._lock = asyncio.Lock()
-        self._monitor = None
-        self._connection_counter = 0
-
-    def set_monitor(self, monitor: PerformanceMonitor):
-        """Set performance monitor"""
-        self._monitor = monitor
-
-    async def get_connection(self, server: str, port: int):
-        """Get a connection from the pool"""
-        server_key = f"{server}:{port}"
-
-        async with self._lock:
-            # Initialize server pools if needed
-            if server_key not in self._pools:
-                self._pools[server_key] = []
-                self._in_use[server_key] = set()
-
-            # Try to reuse existing connection
-            available_connections = [
-                conn
-                for conn in self._pools[server_key]
-                if conn["id"] not in self._in_use[server_key]
-            ]
-
-            if available_connections:
-                connection = available_connections[0]
-                self._in_use[server_key].add(connection["id"])
-                return ConnectionWrapper(connection, self, server_key)
-
-            # Create new connection if under limit
-            total_connections = sum(len(pool) for pool in self._pools.values())
-            if total_connections < self.max_connections:
-                connection = await self._create_connection(server, port)
-                self._pools[server_key].append(connection)
-                self._in_use[server_key].add(connection["id"])
-
-                if self._monitor:
-                    self._monitor.record_connection_event("new")
-
-                return ConnectionWrapper(connection, self, server_key)
-
-            # Pool exhausted
-            if self._monitor:
-                self._monitor.record_connection_event("rejected")
-            raise RuntimeError("Connection pool exhausted")
-
-    async def _create_connection(self, server: str, port: int):
-        """Create a new connection"""
-        # For DNS, we use UDP sockets which are connectionless
-        # But we can still pool them for reuse
-        import socket
-
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setblocking(False)  # Essential for asyncio operations
-
-        # Set socket options for better performance
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-        # Set receive buffer size
-        try:
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
-        except OSError:
-            pass  # Ignore if not supported
-
-        self._connection_counter += 1
-
-        logger.debug(
-            f"Created new UDP socket connection {self._connection_counter} for {server}:{port}"
-        )
-
-        return {
-            "id": self._connection_counter,
-            "socket": sock,
-            "server": server,
-            "port": port,
-            "created": time.time(),
-        }
-
-    async def return_connection(self, connection, server_key: str):
-        """Return a connection to the pool"""
-        async with self._lock:
-            if server_key in self._in_use:
-                self._in_use[server_key].discard(connection["id"])
-
-    async def cleanup_old_connections(self):
-        """Clean up old connections"""
-        current_time = time.time()
-        async with self._lock:
-            for server_key, pool in list(self._pools.items()):
-                new_pool = []
-                old_connections = []
-
-                for conn in pool:
-                    if current_time - conn["created"] < self.connection_timeout:
-                        new_pool.append(conn)
-                    else:
-                        old_connections.append(conn)
-
-                self._pools[server_key] = new_pool
-
-                # Close old connections
-                for conn in old_connections:
-                    try:
-                        conn["socket"].close()
-                        if self._monitor:
-                            self._monitor.record_connection_event("closed")
-                    except Exception:
-                        pass
-
-
-class ConnectionWrapper:
-    """Wrapper for pooled connections"""
-
-    def __init__(self, connection, pool: ConnectionPool, server_key: str):
-        self.connection = connection
-        self._pool = pool
-        self._server_key = server_key
-        self._returned = False
-
-    async def __aenter__(self):
-        return self.connection
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if not self._returned:
-            await self._pool.return_connection(self.connection, self._server_key)
-            self._returned = True
+# Adaptive concurrency (AIMD): the limit grows by _AIMD_INCREASE after every
+# _AIMD_WINDOW latency samples whose EWMA meets the target, and is halved at
+# most once per _AIMD_BACKOFF_INTERVAL seconds when it does not or on overload
+_AIMD_ALPHA = 0.1
+_AIMD_WINDOW = 100
+_AIMD_INCREASE = 1
+_AIMD_BACKOFF_INTERVAL = 1.0
 
 
 class ConcurrencyLimiter:
-    """Limits concurrent operations with queuing and backpressure"""
+    """Limits concurrent operations with queuing and backpressure
+
+    With a target latency set (configure_adaptive) the number of slots
+    adapts between min_concurrent and max_concurrent using AIMD.
+    """
 
     def __init__(self, max_concurrent: int = 1000, queue_size: int = 5000):
         self.max_concurrent = max_concurrent
+        self.limit = max_concurrent
         self.queue_size = queue_size
-        self._semaphore = asyncio.Semaphore(max_concurrent)
-        self._queue = asyncio.Queue(maxsize=queue_size)
         self._active_count = 0
+        # Futures of queued acquirers, oldest first; released slots go to
+        # them directly so newcomers cannot overtake the queue
+        self._waiters: deque = deque()
         self._monitor = None
 
+        # Adaptive sizing, off until a target latency is configured
+        self._target_latency_ms: Optional[float] = None
+        self._min_concurrent = 1
+        self._ewma_latency_ms = 0.0
+        self._samples = 0
+        self._last_backoff = 0.0
+
     def set_monitor(self, monitor: PerformanceMonitor):
         """Set performance monitor"""
         self._monitor = monitor
 
-    async def acquire(self, timeout: float = 30.0):
-        """Acquire permission to proceed"""
-        start_time = time.time()
+    def configure(self, max_concurrent: int, queue_size: int):
+        """Update limits; takes effect for subsequent acquisitions"""
+        self.max_concurrent = max_concurrent
+        self.limit = max_concurrent
+        self.queue_size = queue_size
 
-        try:
-            # Check if we can proceed immediately
-            try:
-                self._semaphore.acquire_nowait()
-                acquired = True
-            except Exception:
-                acquired = False
+    def configure_adaptive(
+        self, target_latency_ms: Optional[float], min_concurrent: int = 1
+    ):
+        """Adapt the limit to keep latency near the target (None disables)"""
+        self._target_latency_ms = target_latency_ms
+        self._min_concurrent = min(min_concurrent, self.max_concurrent)
+        self._ewma_latency_ms = 0.0
+        self._samples = 0
+        self.limit = self.max_concurrent
+
+    def record_latency(self, latency_ms: float):
+        """Feed a completed operation's latency to the adaptive limit"""
+        if self._target_latency_ms is None:
+            return
 
-            if acquired:
-                self._active_count += 1
-                if self._monitor:
-                    self._monitor.record_queue_metrics(
-                        "concurrency", self._active_count, 0
-                    )
-                return ConcurrencyContext(self)
-
-            # Need to wait - check queue capacity
-            if self._queue.qsize() >= self.queue_size:
-                if self._monitor:
-                    self._monitor.record_error("queue_full")
-                raise RuntimeError("Request queue full - backpressure applied")
-
-            # Wait for permission
-            await asyncio.wait_for(self._semaphore.acquire(), timeout=timeout)
-            wait_time = time.time() - start_time
-            self._active_count += 1
+        self._ewma_latency_ms += _AIMD_ALPHA * (latency_ms - self._ewma_latency_ms)
+        self._samples += 1
+        if self._samples < _AIMD_WINDOW:
+            return
 
-            if self._monitor:
-                self._monitor.record_queue_metrics(
-                    "concurrency", self._active_count, wait_time
-                )
+        if self._ewma_latency_ms <= self._target_latency_ms:
+            self._samples = 0
+            self.limit = min(self.max_concurrent, self.limit + _AIMD_INCREASE)
+        else:
+            self.record_overload()
+
+    def record_overload(self):
+        """Halve the adaptive limit after a timeout, rejection or slow window"""
+        if self._target_latency_ms is None:
+            return
+
+        now = time.monotonic()
+        if now - self._last_backoff < _AIMD_BACKOFF_INTERVAL:
+            return
+        self._last_backoff = now
+        self._samples = 0
+        self.limit = max(self._min_concurrent, self.limit // 2)
+        if self._monitor:
+            self._monitor.record_queue_metrics("concurrency_limit", self.limit)
 
+    async def acquire(self, timeout: float = 30.0):
+        """Acquire permission to proceed"""
+        # Fast path: take a free slot unless others are already queued for one
+        if not self._waiters and self._active_count < self.limit:
+            self._active_count += 1
+            if self._monitor:
+                self._monitor.record_queue_metrics("concurrency", self._active_count, 0)
             return ConcurrencyContext(self)
 
+        # Need to wait - check queue capacity
+        if len(self._waiters) >= self.queue_size:
+            if self._monitor:
+                self._monitor.record_error("queue_full")
+            self.record_overload()
+            raise RuntimeError("Request queue full - backpressure applied")
+
+        start_time = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=timeout)
         except asyncio.TimeoutError:
+            self._abandon(waiter)
             if self._monitor:
                 self._monitor.record_error("concurrency_timeout")
+            self.record_overload()
             raise RuntimeError("Concurrency limit timeout")
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
 
-    def release(self):
-        """Release concurrent operation slot"""
-        self._semaphore.release()
+        if self._monitor:
+            self._monitor.record_queue_metrics(
+                "concurrency", self._active_count, time.monotonic() - start_time
+            )
+
+        return ConcurrencyContext(self)
+
+    def _abandon(self, waiter: asyncio.Future):
+        """Drop a waiter that gave up, passing on a slot it was just handed"""
+        if waiter.done() and not waiter.cancelled():
+            self._release_slot()
+            return
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release_slot(self):
+        """Free a slot, handing it straight to the longest waiter if any"""
         self._active_count = max(0, self._active_count - 1)
+        waiters = self._waiters
+        while waiters and self._active_count < self.limit:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                self._active_count += 1
+                waiter.set_result(None)
+
+    async def release(self):
+        """Release concurrent operation slot"""
+        self._release_slot()
 
         if self._monitor:
             self._monitor.record_queue_metrics("concurrency", self._active_count)
@@ -491,14 +789,12 @@ class ConcurrencyContext:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        self._limiter.release()
+        await self._limiter.release()
 
 
 # Global instances
 performance_monitor = PerformanceMonitor()
-connection_pool = ConnectionPool()
 concurrency_limiter = ConcurrencyLimiter()
 
 # Set up cross-references
-connection_pool.set_monitor(performance_monitor)
 concurrency_limiter.set_monitor(performance_monitor)
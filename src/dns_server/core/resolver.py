@@ -2,21 +2,22 @@
 DNS Resolver Engine
 
 This module implements the core DNS resolution functionality including:
-- Recursive resolution with connection pooling
+- Recursive resolution over a pool of upstream UDP sockets
 - Iterative resolution
 - Upstream forwarder with failover logic
 - Root hints management
 - Query timeout and retry mechanisms
-- Performance optimization with connection pooling
 """
 
 import asyncio
+import functools
 import logging
 import random
+import secrets
 import socket
 import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from typing import ClassVar, Dict, List, Optional, Set, Tuple
 
 from .message import (
     DNSClass,
@@ -26,13 +27,176 @@ from .message import (
     DNSRecordType,
     DNSResourceRecord,
     DNSResponseCode,
+    _encode_name,
+)
+from .performance import (
+    Operation,
+    PerformanceMonitor,
+    timing_decorator,
 )
-from .performance import PerformanceMonitor, connection_pool, timing_decorator
 
 logger = logging.getLogger(__name__)
 
+# Record types compared per RR in the resolution loops, as plain ints
+_TYPE_A = int(DNSRecordType.A)
+_TYPE_NS = int(DNSRecordType.NS)
+_TYPE_SOA = int(DNSRecordType.SOA)
+
+# EDNS0 (RFC 6891) OPT pseudo-record advertising a larger UDP payload;
+# the class field carries the payload size
+_TYPE_OPT = 41
+_EDNS_UDP_PAYLOAD = 4096
+_EDNS_OPT_RECORD = DNSResourceRecord(
+    name=".", rtype=_TYPE_OPT, rclass=_EDNS_UDP_PAYLOAD, ttl=0, rdata=b""
+)
+
+# Number of upstream servers queried concurrently per forwarded question
+_UPSTREAM_RACE_WIDTH = 2
+
+# Upstream queries leave from a pool of UDP sockets on random ports, each
+# query through a random one, and a socket is replaced after a number of
+# queries. A spoofed reply has to guess the port as well as the txid.
+_UPSTREAM_SOCKETS = 8
+_UPSTREAM_SOCKET_QUERIES = 1000
+_UPSTREAM_PORT_MIN = 1024
+_UPSTREAM_BIND_ATTEMPTS = 10
+
+# Upstream sockets are created non-blocking in the same call where the
+# platform allows it, with their buffers sized up front
+_SOCK_NONBLOCK = getattr(socket, "SOCK_NONBLOCK", 0)
+_UPSTREAM_SOCKET_OPTIONS = (
+    (socket.SOL_SOCKET, socket.SO_RCVBUF, 65536),
+    (socket.SOL_SOCKET, socket.SO_SNDBUF, 65536),
+)
+
+# Upstream refusals are cached briefly; our own SERVFAILs (timeouts) never are
+_NEGATIVE_ERROR_RCODES = frozenset(
+    (DNSResponseCode.FORMERR, DNSResponseCode.NOTIMP, DNSResponseCode.REFUSED)
+)
+
+
+def _negative_ttl(authority: List[DNSResourceRecord]) -> Optional[int]:
+    """How long a negative answer may be cached (RFC 2308)
+
+    The lower of the SOA record's TTL and its MINIMUM field, or None without
+    a usable SOA in the authority section.
+    """
+    for rr in authority:
+        if rr.rtype == _TYPE_SOA and len(rr.rdata) >= 20:
+            return min(rr.ttl, int.from_bytes(rr.rdata[-4:], "big"))
+    return None
+
+
+@functools.lru_cache(maxsize=2048)
+def _ip_to_int(ip: str) -> int:
+    """Pack a dotted-quad IPv4 address into an int"""
+    return int.from_bytes(socket.inet_aton(ip), "big")
+
+
+def _bind_upstream_socket(port: int) -> socket.socket:
+    """Create a non-blocking upstream UDP socket bound to port (0: any)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM | _SOCK_NONBLOCK)
+    try:
+        if not _SOCK_NONBLOCK:
+            sock.setblocking(False)
+        for level, option, value in _UPSTREAM_SOCKET_OPTIONS:
+            try:
+                sock.setsockopt(level, option, value)
+            except OSError:
+                pass  # Ignore if not supported
+        sock.bind(("0.0.0.0", port))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+# a.root-servers.net. .. m.root-servers.net. in wire format
+_ROOT_NS_WIRE = tuple(
+    _encode_name(f"{chr(ord('a') + i)}.root-servers.net.") for i in range(13)
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_query_template(
+    name: str, qtype: int, qclass: int, edns: bool
+) -> Tuple[bytes, bytes]:
+    """Wire image of a recursion-desired query with a zero transaction ID
+
+    Returned with the question section a response has to echo.
+    """
+    header = DNSHeader(transaction_id=0, flags=0, rd=True, question_count=1)
+    question = DNSQuestion(name, qtype, qclass)
+    query = DNSMessage(
+        header=header,
+        questions=[question],
+        answers=[],
+        authority=[],
+        additional=[_EDNS_OPT_RECORD] if edns else [],
+    )
+    wire = query.to_bytes()
+    return wire, wire[12 : 12 + len(_encode_name(name)) + 4]
+
 
-@dataclass
+# Pending upstream query: (future, server address, question, socket)
+_PendingQuery = Tuple[asyncio.Future, Tuple[str, int], bytes, "_UpstreamProtocol"]
+
+
+class _UpstreamProtocol(asyncio.DatagramProtocol):
+    """Dispatches upstream responses to the query waiting on their txid"""
+
+    __slots__ = ("pending", "transport", "queries", "inflight", "retired")
+
+    def __init__(self, pending: Dict[int, _PendingQuery]):
+        self.pending = pending
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.queries = 0  # Sent over this socket's lifetime
+        self.inflight = 0
+        self.retired = False
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        # Only the header is read here; stray packets are never fully parsed
+        try:
+            txid, flags, _ = DNSMessage.peek_header(data)
+        except ValueError:
+            return
+        if not flags & 0x8000:  # QR bit clear: not a response
+            return
+
+        entry = self.pending.get(txid)
+        if entry is None:
+            return
+
+        future, expected, question, sock = entry
+        # Ignore answers from anyone other than the server we asked, on any
+        # other socket, or for any other question (names compared ignoring
+        # case, for servers that randomize it)
+        if sock is not self or addr[:2] != expected or future.done():
+            return
+        echoed = data[12 : 12 + len(question)]
+        if (
+            data[4:6] != b"\x00\x01"
+            or echoed[-4:] != question[-4:]
+            or echoed[:-4].lower() != question[:-4].lower()
+        ):
+            return
+        future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"Upstream UDP socket error: {exc}")
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        for future, _, _, sock in self.pending.values():
+            if sock is self and not future.done():
+                future.set_exception(
+                    exc or ConnectionError("Upstream UDP socket closed")
+                )
+
+
+@dataclass(slots=True)
 class UpstreamServer:
     """Upstream DNS server configuration"""
 
@@ -43,28 +207,64 @@ class UpstreamServer:
     is_available: bool = True
     last_failure: Optional[float] = None
     failure_count: int = 0
+    ewma_rtt: float = 0.0
+
+    def record_rtt(self, rtt: float) -> None:
+        """Fold a response time (seconds) into the smoothed RTT"""
+        if self.ewma_rtt == 0.0:
+            self.ewma_rtt = rtt
+        else:
+            self.ewma_rtt = 0.125 * rtt + 0.875 * self.ewma_rtt
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryContext:
     """Context for a DNS query resolution"""
 
     original_question: DNSQuestion
     recursion_depth: int = 0
     max_recursion_depth: int = 10
-    start_time: float = 0.0
     timeout: float = 30.0
-    visited_servers: Set[str] = None
+    deadline: float = 0.0  # time.monotonic() by which resolution must finish
+    visited_servers: Set[int] = None  # IPv4 addresses packed by _ip_to_int
+
+    # Released contexts kept for reuse, bounded by _POOL_SIZE
+    _pool: ClassVar[List["QueryContext"]] = []
+    _POOL_SIZE: ClassVar[int] = 256
 
     def __post_init__(self):
         if self.visited_servers is None:
             self.visited_servers = set()
-        if self.start_time == 0.0:
-            self.start_time = time.time()
+        if self.deadline == 0.0:
+            self.deadline = time.monotonic() + self.timeout
+
+    @classmethod
+    def acquire(cls, question: DNSQuestion) -> "QueryContext":
+        """Get a fresh context, reusing a released one when available"""
+        if not cls._pool:
+            return cls(original_question=question)
+
+        context = cls._pool.pop()
+        context.original_question = question
+        context.recursion_depth = 0
+        context.deadline = time.monotonic() + context.timeout
+        return context
+
+    def release(self) -> None:
+        """Return this context to the pool; it must not be used afterwards"""
+        pool = QueryContext._pool
+        if len(pool) < QueryContext._POOL_SIZE:
+            self.original_question = None
+            self.visited_servers.clear()
+            pool.append(self)
 
     def is_expired(self) -> bool:
         """Check if query has timed out"""
-        return time.time() - self.start_time > self.timeout
+        return time.monotonic() >= self.deadline
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative"""
+        return max(0.0, self.deadline - time.monotonic())
 
     def can_recurse(self) -> bool:
         """Check if we can recurse further"""
@@ -75,7 +275,7 @@ class DNSResolver:
     """DNS Resolution Engine with performance optimizations"""
 
     # Root name servers (built-in root hints)
-    ROOT_SERVERS = [
+    ROOT_SERVERS: Tuple[str, ...] = (
         "198.41.0.4",  # a.root-servers.net
         "170.247.170.2",  # b.root-servers.net
         "192.33.4.12",  # c.root-servers.net
@@ -89,13 +289,49 @@ class DNSResolver:
         "193.0.14.129",  # k.root-servers.net
         "199.7.83.42",  # l.root-servers.net
         "202.12.27.33",  # m.root-servers.net
-    ]
+    )
+
+    # Methods wrapped with timing_decorator once a monitor is attached
+    _TIMED_METHODS = (
+        ("resolve_with_cache_hit", Operation.DNS_RESOLUTION),
+        ("_forward_to_upstream", Operation.UPSTREAM_FORWARDING),
+        ("_recursive_resolve", Operation.RECURSIVE_RESOLUTION),
+        ("health_check", Operation.UPSTREAM_HEALTH_CHECK),
+    )
 
     def __init__(self, config):
         self.config = config
         self.upstream_servers = self._load_upstream_servers(config.upstream_servers)
         self.performance_monitor = None  # Will be set by the server
-        self._transaction_counter = 0
+
+        # Spread load across the roots per process rather than per query
+        self._root_order = tuple(
+            random.sample(self.ROOT_SERVERS, len(self.ROOT_SERVERS))
+        )
+
+        # Pool of upstream UDP sockets; responses are matched to queries by
+        # txid, which is unique across the pool
+        self._udp_sockets: List[Optional[_UpstreamProtocol]]
+        self._udp_sockets = [None] * _UPSTREAM_SOCKETS
+        # Per-slot locks guarding only the opening of a replacement socket
+        self._udp_locks: List[Optional[asyncio.Lock]] = [None] * _UPSTREAM_SOCKETS
+        self._pending: Dict[int, _PendingQuery] = {}
+        self._upstream_addrs: Dict[Tuple[str, int], Tuple[str, int]] = {}
+        self._send_buf = bytearray(512)
+        server_config = getattr(config, "server", None)
+        self.edns0_enabled = getattr(server_config, "edns0_enabled", True)
+
+        # Negative answers keyed by (name, qtype, qclass):
+        # (expires_at, rcode, authority)
+        self._negative_cache: Dict[
+            Tuple[str, int, int], Tuple[float, int, List[DNSResourceRecord]]
+        ] = {}
+        self.negative_ttl_max = getattr(server_config, "negative_ttl_max", 300)
+        self.negative_error_ttl = getattr(server_config, "negative_error_ttl", 5)
+        self.negative_cache_size = getattr(server_config, "negative_cache_size", 10000)
+
+        # Lookups in progress keyed by (name, qtype, qclass, use_recursion)
+        self._inflight: Dict[Tuple[str, int, int, bool], asyncio.Task] = {}
 
     def _load_upstream_servers(
         self, server_addresses: List[str]
@@ -121,21 +357,51 @@ class DNSResolver:
         return servers
 
     def set_performance_monitor(self, monitor: PerformanceMonitor):
-        """Set the performance monitor"""
+        """Set the performance monitor and time the resolution entry points"""
         self.performance_monitor = monitor
+        for name, operation in self._TIMED_METHODS:
+            method = getattr(type(self), name).__get__(self)
+            setattr(self, name, timing_decorator(operation, monitor)(method))
 
-    @timing_decorator("dns_resolution", None)  # Will be set dynamically
     async def resolve(
         self, question: DNSQuestion, use_recursion: bool = True
     ) -> DNSMessage:
         """
         Main resolve method that routes queries to appropriate resolution strategy
         """
-        # Set up timing decorator with current performance monitor
-        if self.performance_monitor:
-            timing_decorator.__defaults__ = ("dns_resolution", self.performance_monitor)
+        response, _ = await self.resolve_with_cache_hit(question, use_recursion)
+        return response
 
-        context = QueryContext(original_question=question)
+    async def resolve_with_cache_hit(
+        self, question: DNSQuestion, use_recursion: bool = True
+    ) -> Tuple[DNSMessage, bool]:
+        """Resolve a question and report whether it was answered from cache"""
+        cache_key = (question.name.lower(), question.qtype, question.qclass)
+        cached = self._get_negative(question, cache_key)
+        if cached is not None:
+            return cached, True
+
+        # Identical questions already being resolved share one lookup
+        inflight_key = (*cache_key, use_recursion)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                self._resolve_uncached(question, use_recursion, cache_key)
+            )
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+
+        # Shielded so one cancelled client does not cancel the shared lookup
+        return await asyncio.shield(task), False
+
+    async def _resolve_uncached(
+        self,
+        question: DNSQuestion,
+        use_recursion: bool,
+        cache_key: Tuple[str, int, int],
+    ) -> DNSMessage:
+        """Resolve a question that missed the negative cache"""
+        context = QueryContext.acquire(question)
 
         try:
             # Determine resolution strategy
@@ -146,6 +412,7 @@ class DNSResolver:
                 # Perform recursive resolution ourselves
                 response = await self._recursive_resolve(question, context)
 
+            self._put_negative(cache_key, response)
             return response
 
         except Exception as e:
@@ -155,18 +422,13 @@ class DNSResolver:
             # Return SERVFAIL response
             return self._create_error_response(question, DNSResponseCode.SERVFAIL)
 
-    @timing_decorator("upstream_forwarding", None)
+        finally:
+            context.release()
+
     async def _forward_to_upstream(
         self, question: DNSQuestion, context: QueryContext
     ) -> DNSMessage:
-        """Forward query to upstream servers with failover and connection pooling"""
-        # Set up timing decorator with current performance monitor
-        if self.performance_monitor:
-            timing_decorator.__defaults__ = (
-                "upstream_forwarding",
-                self.performance_monitor,
-            )
-
+        """Forward query to upstream servers with failover"""
         available_servers = [s for s in self.upstream_servers if s.is_available]
         if not available_servers:
             # Reset all servers if none are available
@@ -175,34 +437,54 @@ class DNSResolver:
                 server.failure_count = 0
             available_servers = self.upstream_servers
 
-        # Try servers in order, with some randomization
-        random.shuffle(available_servers)
+        ordered = self._order_upstreams(available_servers)
+        next_index = 0
+        racing: Dict[asyncio.Task, Tuple[UpstreamServer, float]] = {}
 
-        for server in available_servers:
-            try:
-                response = await self._query_server_pooled(
-                    server.address, server.port, question, server.timeout
-                )
-
-                # Reset failure count on success
-                server.failure_count = 0
-                server.last_failure = None
-
-                return response
+        try:
+            while racing or next_index < len(ordered):
+                # Keep the best few servers racing; the first answer wins
+                while len(racing) < _UPSTREAM_RACE_WIDTH and next_index < len(ordered):
+                    server = ordered[next_index]
+                    next_index += 1
+                    task = asyncio.create_task(
+                        self._query_upstream(
+                            server.address, server.port, question, server.timeout
+                        )
+                    )
+                    racing[task] = (server, time.monotonic())
 
-            except Exception as e:
-                server.failure_count += 1
-                server.last_failure = time.time()
+                done, _ = await asyncio.wait(
+                    racing, return_when=asyncio.FIRST_COMPLETED
+                )
 
-                # Mark server as unavailable after multiple failures
-                if server.failure_count >= server.retries:
-                    server.is_available = False
-                    logger.warning(
-                        f"Marking upstream server {server.address} as unavailable"
-                    )
+                for task in done:
+                    server, start = racing.pop(task)
+                    e = task.exception()
+                    if e is None:
+                        # Reset failure count on success
+                        server.record_rtt(time.monotonic() - start)
+                        server.failure_count = 0
+                        server.last_failure = None
+                        return task.result()
+
+                    server.record_rtt(server.timeout)
+                    server.failure_count += 1
+                    server.last_failure = time.time()
+
+                    # Mark server as unavailable after multiple failures
+                    if server.failure_count >= server.retries:
+                        server.is_available = False
+                        logger.warning(
+                            f"Marking upstream server {server.address} as unavailable"
+                        )
 
-                logger.debug(f"Upstream server {server.address} failed: {e}")
-                continue
+                    logger.debug(f"Upstream server {server.address} failed: {e}")
+        finally:
+            # Losers are cancelled, not counted as failures
+            for task in racing:
+                if not task.cancel() and not task.cancelled():
+                    task.exception()  # Finished alongside the winner
 
         # All upstream servers failed, try recursive resolution as fallback
         logger.warning(
@@ -212,18 +494,24 @@ class DNSResolver:
             self.performance_monitor.record_error("all_upstream_servers_failed")
         return await self._recursive_resolve(question, context)
 
-    @timing_decorator("recursive_resolution", None)
+    @staticmethod
+    def _order_upstreams(servers: List[UpstreamServer]) -> List[UpstreamServer]:
+        """Pick the faster of two random servers first, then the rest by RTT"""
+        if len(servers) < 2:
+            return servers
+
+        a, b = random.sample(servers, 2)
+        primary = a if a.ewma_rtt <= b.ewma_rtt else b
+        rest = sorted(
+            (s for s in servers if s is not primary), key=lambda s: s.ewma_rtt
+        )
+        rest.insert(0, primary)
+        return rest
+
     async def _recursive_resolve(
         self, question: DNSQuestion, context: QueryContext
     ) -> DNSMessage:
         """Perform recursive DNS resolution starting from root servers"""
-        # Set up timing decorator with current performance monitor
-        if self.performance_monitor:
-            timing_decorator.__defaults__ = (
-                "recursive_resolution",
-                self.performance_monitor,
-            )
-
         if context.is_expired():
             logger.warning(f"Query for {question.name} timed out")
             if self.performance_monitor:
@@ -237,18 +525,22 @@ class DNSResolver:
             return self._create_error_response(question, DNSResponseCode.SERVFAIL)
 
         # Start with root servers
-        nameservers = self.ROOT_SERVERS.copy()
+        nameservers = self._root_order
 
         while nameservers and not context.is_expired():
             # Try each nameserver for the current zone
             for ns_ip in nameservers:
-                if ns_ip in context.visited_servers:
+                ns_key = _ip_to_int(ns_ip)
+                if ns_key in context.visited_servers:
                     continue
 
-                context.visited_servers.add(ns_ip)
+                context.visited_servers.add(ns_key)
 
                 try:
-                    response = await self._query_server_pooled(ns_ip, 53, question, 5.0)
+                    # Never wait on one server past the overall deadline
+                    response = await self._query_upstream(
+                        ns_ip, 53, question, min(5.0, context.remaining())
+                    )
 
                     # Check response code
                     if response.header.rcode == DNSResponseCode.NOERROR:
@@ -256,24 +548,20 @@ class DNSResolver:
                             # We got the answer!
                             return response
                         elif response.authority:
-                            # We got a referral, extract nameservers
-                            new_nameservers = []
-                            ns_names = []
-
-                            for auth_rr in response.authority:
-                                if auth_rr.rtype == DNSRecordType.NS:
-                                    ns_name = auth_rr.get_readable_rdata()
-                                    ns_names.append(ns_name)
-
-                            # Look for A records for the nameservers in additional section
-                            for add_rr in response.additional:
-                                if add_rr.rtype == DNSRecordType.A:
-                                    ns_ip = add_rr.get_readable_rdata()
-                                    if any(
-                                        add_rr.name.startswith(ns_name.rstrip("."))
-                                        for ns_name in ns_names
-                                    ):
-                                        new_nameservers.append(ns_ip)
+                            # We got a referral, extract nameservers and
+                            # their A glue from the additional section
+                            ns_names = [
+                                rr.get_readable_rdata()
+                                for rr in response.authority
+                                if rr.rtype == _TYPE_NS
+                            ]
+                            ns_set = frozenset(n.rstrip(".").lower() for n in ns_names)
+                            new_nameservers = [
+                                rr.get_readable_rdata()
+                                for rr in response.additional
+                                if rr.rtype == _TYPE_A
+                                and rr.name.rstrip(".").lower() in ns_set
+                            ]
 
                             # If we didn't get glue records, we need to resolve the NS names
                             if not new_nameservers and ns_names:
@@ -292,7 +580,7 @@ class DNSResolver:
                                             context.recursion_depth -= 1
 
                                             for answer in ns_response.answers:
-                                                if answer.rtype == DNSRecordType.A:
+                                                if answer.rtype == _TYPE_A:
                                                     new_nameservers.append(
                                                         answer.get_readable_rdata()
                                                     )
@@ -313,231 +601,238 @@ class DNSResolver:
                     logger.debug(f"Query to {ns_ip} failed: {e}")
                     continue
 
-            # If we reach here, we need to move to the next set of nameservers
-            break
+            else:
+                # No nameserver in this set answered or referred us onwards
+                break
 
         # Resolution failed
         if self.performance_monitor:
             self.performance_monitor.record_error("recursive_resolution_failed")
         return self._create_error_response(question, DNSResponseCode.SERVFAIL)
 
-    async def _query_server_pooled(
+    async def _query_upstream(
         self, server_ip: str, port: int, question: DNSQuestion, timeout: float
     ) -> DNSMessage:
-        """Send a DNS query to a specific server using connection pool"""
-        start_time = time.time()
-
+        """Send a DNS query to a specific server and record its timing"""
+        monitor = self.performance_monitor
+        if monitor is None:
+            return await self._query_server(server_ip, port, question, timeout)
+
+        # Timed inline in integer nanoseconds: successes and failures go to
+        # different operations, which a single decorator could not do
+        clock = time.monotonic_ns
+        start_ns = clock()
         try:
-            # Try using connection pool first
-            try:
-                async with await connection_pool.get_connection(
-                    server_ip, port
-                ) as conn:
-                    response = await self._send_query_with_connection(
-                        conn, question, timeout
-                    )
-
-                    query_time = time.time() - start_time
-                    if self.performance_monitor:
-                        self.performance_monitor.record_operation_time(
-                            "dns_query", query_time
-                        )
-
-                    return response
-
-            except Exception as pool_error:
-                # Log the pooled connection error and fall back to direct query
-                logger.debug(
-                    f"Pooled connection failed for {server_ip}:{port}, falling back to direct query: {pool_error}"
-                )
-
-                # Fallback to non-pooled query
-                response = await self._query_server(server_ip, port, question, timeout)
-
-                query_time = time.time() - start_time
-                if self.performance_monitor:
-                    self.performance_monitor.record_operation_time(
-                        "dns_query_fallback", query_time
-                    )
-
-                return response
+            response = await self._query_server(server_ip, port, question, timeout)
+        except Exception:
+            monitor.record_operation_ns(Operation.DNS_QUERY_FAILED, clock() - start_ns)
+            monitor.record_error("dns_query_failed")
+            raise
 
-        except Exception as e:
-            query_time = time.time() - start_time
-            if self.performance_monitor:
-                self.performance_monitor.record_operation_time(
-                    "dns_query_failed", query_time
-                )
-                self.performance_monitor.record_error("dns_query_failed")
-            raise e
+        monitor.record_operation_ns(Operation.DNS_QUERY, clock() - start_ns)
+        return response
 
-    async def _send_query_with_connection(
-        self, connection, question: DNSQuestion, timeout: float
-    ) -> DNSMessage:
-        """Send query using pooled connection - using UDP transport approach"""
-        # Create query message
-        self._transaction_counter = (self._transaction_counter + 1) % 65536
-        header = DNSHeader(
-            transaction_id=self._transaction_counter,
-            flags=0,
-            qr=False,
-            rd=True,  # Recursion desired
-            question_count=1,
+    def _usable(self, sock: Optional[_UpstreamProtocol]) -> bool:
+        """Whether a pooled socket can take another query"""
+        return (
+            sock is not None
+            and not sock.transport.is_closing()
+            and sock.queries < _UPSTREAM_SOCKET_QUERIES
         )
 
-        query = DNSMessage(
-            header=header, questions=[question], answers=[], authority=[], additional=[]
+    async def _get_udp_socket(self) -> _UpstreamProtocol:
+        """Pick a random pooled upstream socket, replacing it if it is used up"""
+        slot = secrets.randbelow(_UPSTREAM_SOCKETS)
+        sock = self._udp_sockets[slot]
+        if self._usable(sock):
+            return sock
+
+        lock = self._udp_locks[slot]
+        if lock is None:
+            lock = self._udp_locks[slot] = asyncio.Lock()
+
+        async with lock:
+            stale = self._udp_sockets[slot]
+            if self._usable(stale):
+                return stale
+            sock = await self._open_udp_socket()
+            self._udp_sockets[slot] = sock
+
+        # The lock only covers swapping the slot; the old socket is retired
+        # outside it
+        if stale is not None:
+            self._retire_udp_socket(stale)
+        return sock
+
+    async def _open_udp_socket(self) -> _UpstreamProtocol:
+        """Open an upstream UDP socket bound to a random port"""
+        for _ in range(_UPSTREAM_BIND_ATTEMPTS):
+            port = _UPSTREAM_PORT_MIN + secrets.randbelow(65536 - _UPSTREAM_PORT_MIN)
+            try:
+                udp = _bind_upstream_socket(port)
+                break
+            except OSError:
+                continue  # Port taken, try another
+        else:
+            # Leave the choice to the kernel's own ephemeral port selection
+            udp = _bind_upstream_socket(0)
+
+        _, sock = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _UpstreamProtocol(self._pending), sock=udp
         )
+        return sock
 
-        query_data = query.to_bytes()
-
-        # Get server info from connection
-        server = connection["server"]
-        port = connection["port"]
-
-        # Use the same UDP transport/protocol approach as fallback for consistency
-        loop = asyncio.get_running_loop()
-
-        # Create future for the response
-        response_future = asyncio.Future()
-
-        class DNSProtocol(asyncio.DatagramProtocol):
-            def __init__(self, future):
-                self.future = future
-
-            def datagram_received(self, data, addr):
-                if not self.future.done():
-                    self.future.set_result(data)
-
-            def error_received(self, exc):
-                if not self.future.done():
-                    self.future.set_exception(exc)
+    @staticmethod
+    def _retire_udp_socket(sock: _UpstreamProtocol) -> None:
+        """Close a socket taken out of the pool once its queries are answered"""
+        sock.retired = True
+        if not sock.inflight:
+            sock.transport.close()
 
+    async def _resolve_upstream_addr(self, host: str, port: int) -> Tuple[str, int]:
+        """Map a configured server to the address its replies will come from"""
         try:
-            # Create UDP endpoint
-            transport, protocol = await loop.create_datagram_endpoint(
-                lambda: DNSProtocol(response_future), family=socket.AF_INET
+            socket.inet_aton(host)
+            addr = (host, port)
+        except OSError:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM
             )
+            addr = infos[0][4][:2]
+        self._upstream_addrs[(host, port)] = addr
+        return addr
 
-            try:
-                # Send query
-                transport.sendto(query_data, (server, port))
-
-                # Wait for response with timeout
-                try:
-                    response_data = await asyncio.wait_for(
-                        response_future, timeout=timeout
-                    )
-                except asyncio.TimeoutError:
-                    raise TimeoutError(
-                        f"Query to {server}:{port} timed out after {timeout}s"
-                    )
-
-                # Parse response
-                response = DNSMessage.from_bytes(response_data)
+    def _alloc_txid(self) -> int:
+        """Pick a random transaction ID that is not already in flight"""
+        if len(self._pending) >= 65536:
+            raise RuntimeError("No free transaction IDs for upstream queries")
 
-                # Verify transaction ID matches
-                if response.header.transaction_id != header.transaction_id:
-                    raise ValueError(
-                        f"Transaction ID mismatch: expected {header.transaction_id}, got {response.header.transaction_id}"
-                    )
-
-                logger.debug(
-                    f"Successful pooled DNS query to {server}:{port} for {question.name}"
-                )
-                return response
-
-            finally:
-                transport.close()
-
-        except Exception as e:
-            # Log the specific error for debugging
-            logger.error(
-                f"Pooled DNS query failed to {server}:{port}: {type(e).__name__}: {e}"
-            )
-            raise e
+        while True:
+            txid = secrets.randbits(16)
+            if txid not in self._pending:
+                return txid
 
     async def _query_server(
         self, server_ip: str, port: int, question: DNSQuestion, timeout: float
     ) -> DNSMessage:
-        """Send a DNS query to a specific server (fallback without pooling)"""
+        """Send a DNS query to a specific server over a pooled UDP socket"""
+        sock = await self._get_udp_socket()
 
-        # Create query message
-        self._transaction_counter = (self._transaction_counter + 1) % 65536
-        header = DNSHeader(
-            transaction_id=self._transaction_counter,
-            flags=0,
-            qr=False,
-            rd=True,  # Recursion desired
-            question_count=1,
-        )
+        addr = self._upstream_addrs.get((server_ip, port))
+        if addr is None:
+            addr = await self._resolve_upstream_addr(server_ip, port)
 
-        query = DNSMessage(
-            header=header, questions=[question], answers=[], authority=[], additional=[]
+        # Only the transaction ID differs between sends of the same question
+        txid = self._alloc_txid()
+        template, question_wire = _encode_query_template(
+            question.name, question.qtype, question.qclass, self.edns0_enabled
         )
 
-        query_data = query.to_bytes()
-
-        # Use asyncio UDP transport/protocol instead of low-level socket operations
-        loop = asyncio.get_running_loop()
-
-        # Create future for the response
-        response_future = asyncio.Future()
-
-        class DNSProtocol(asyncio.DatagramProtocol):
-            def __init__(self, future):
-                self.future = future
-
-            def datagram_received(self, data, addr):
-                if not self.future.done():
-                    self.future.set_result(data)
-
-            def error_received(self, exc):
-                if not self.future.done():
-                    self.future.set_exception(exc)
+        response_future = asyncio.get_running_loop().create_future()
+        self._pending[txid] = (response_future, addr, question_wire, sock)
+        sock.queries += 1
+        sock.inflight += 1
 
         try:
-            # Create UDP endpoint
-            transport, protocol = await loop.create_datagram_endpoint(
-                lambda: DNSProtocol(response_future), family=socket.AF_INET
-            )
+            # sendto either transmits or copies synchronously, so the scratch
+            # buffer is free again as soon as it returns
+            n = len(template)
+            buf = self._send_buf
+            buf[:n] = template
+            buf[0] = txid >> 8
+            buf[1] = txid & 0xFF
+            with memoryview(buf)[:n] as view:
+                sock.transport.sendto(view, addr)
 
             try:
-                # Send query
-                transport.sendto(query_data, (server_ip, port))
-
-                # Wait for response with timeout
-                try:
-                    response_data = await asyncio.wait_for(
-                        response_future, timeout=timeout
-                    )
-                except asyncio.TimeoutError:
-                    raise TimeoutError(
-                        f"Query to {server_ip}:{port} timed out after {timeout}s"
-                    )
-
-                # Parse response
-                response = DNSMessage.from_bytes(response_data)
-
-                # Verify transaction ID matches
-                if response.header.transaction_id != header.transaction_id:
-                    raise ValueError(
-                        f"Transaction ID mismatch: expected {header.transaction_id}, got {response.header.transaction_id}"
-                    )
-
-                logger.debug(
-                    f"Successful DNS query to {server_ip}:{port} for {question.name}"
+                response_data = await asyncio.wait_for(response_future, timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Query to {server_ip}:{port} timed out after {timeout}s"
                 )
-                return response
 
-            finally:
-                transport.close()
+            response = DNSMessage.from_bytes(response_data)
+            if response.header.tc:
+                logger.debug(f"Truncated response from {server_ip}:{port}")
+            if self.edns0_enabled:
+                # Our OPT negotiation is hop-by-hop; don't pass theirs on
+                response.additional = [
+                    rr for rr in response.additional if rr.rtype != _TYPE_OPT
+                ]
+            logger.debug(
+                f"Successful DNS query to {server_ip}:{port} for {question.name}"
+            )
+            return response
 
         except Exception as e:
             logger.error(
                 f"DNS query failed to {server_ip}:{port}: {type(e).__name__}: {e}"
             )
-            raise e
+            raise
+
+        finally:
+            entry = self._pending.get(txid)
+            if entry is not None and entry[0] is response_future:
+                del self._pending[txid]
+            sock.inflight -= 1
+            if sock.retired and not sock.inflight:
+                sock.transport.close()
+
+    def close(self) -> None:
+        """Close the pooled upstream sockets"""
+        for slot, sock in enumerate(self._udp_sockets):
+            if sock is not None:
+                sock.transport.close()
+                self._udp_sockets[slot] = None
+
+    def _get_negative(
+        self, question: DNSQuestion, key: Tuple[str, int, int]
+    ) -> Optional[DNSMessage]:
+        """Answer from the negative cache if the entry is still fresh"""
+        entry = self._negative_cache.get(key)
+        if entry is None:
+            return None
+
+        expires_at, rcode, authority = entry
+        remaining = int(expires_at - time.monotonic())
+        if remaining <= 0:
+            del self._negative_cache[key]
+            return None
+
+        response = self._create_error_response(question, rcode)
+        response.authority = [
+            DNSResourceRecord(
+                rr.name, rr.rtype, rr.rclass, min(rr.ttl, remaining), rr.rdata
+            )
+            for rr in authority
+        ]
+        return response
+
+    def _put_negative(self, key: Tuple[str, int, int], response: DNSMessage) -> None:
+        """Remember NXDOMAIN/NODATA (RFC 2308) and upstream refusals"""
+        rcode = response.header.rcode
+        if rcode in _NEGATIVE_ERROR_RCODES:
+            ttl = self.negative_error_ttl
+            authority = []
+        elif rcode == DNSResponseCode.NXDOMAIN or (
+            rcode == DNSResponseCode.NOERROR and not response.answers
+        ):
+            # The SOA in the authority section bounds how long we may cache
+            soa_ttl = _negative_ttl(response.authority)
+            if soa_ttl is None:
+                return
+            authority = [rr for rr in response.authority if rr.rtype == _TYPE_SOA]
+            ttl = min(soa_ttl, self.negative_ttl_max)
+        else:
+            return
+
+        if ttl <= 0:
+            return
+
+        cache = self._negative_cache
+        if key not in cache and len(cache) >= self.negative_cache_size:
+            del cache[next(iter(cache))]
+        cache[key] = (time.monotonic() + ttl, rcode, authority)
 
     def _create_error_response(self, question: DNSQuestion, rcode: int) -> DNSMessage:
         """Create an error response for a question"""
@@ -554,56 +849,72 @@ class DNSResolver:
             header=header, questions=[question], answers=[], authority=[], additional=[]
         )
 
-    @timing_decorator("upstream_health_check", None)
     async def health_check(self) -> Dict[str, any]:
         """Check health of upstream servers and resolver"""
-        # Set up timing decorator with current performance monitor
-        if self.performance_monitor:
-            timing_decorator.__defaults__ = (
-                "upstream_health_check",
-                self.performance_monitor,
-            )
+        # Probe every upstream and a root server concurrently
+        *upstream_health, root_ok = await asyncio.gather(
+            *(self._probe_upstream(server) for server in self.upstream_servers),
+            self._probe_root(),
+        )
 
-        health_info = {
-            "status": "healthy",
-            "upstream_servers": [],
-            "root_servers_accessible": False,
+        return {
+            "status": "healthy" if root_ok else "degraded",
+            "upstream_servers": upstream_health,
+            "root_servers_accessible": root_ok,
         }
 
-        # Check upstream servers
-        for server in self.upstream_servers:
-            server_health = {
-                "address": f"{server.address}:{server.port}",
-                "available": server.is_available,
-                "failure_count": server.failure_count,
-                "last_failure": server.last_failure,
-            }
+    async def _probe_upstream(self, server: UpstreamServer) -> Dict[str, any]:
+        """Report the state of one upstream server and test connectivity"""
+        server_health = {
+            "address": f"{server.address}:{server.port}",
+            "available": server.is_available,
+            "failure_count": server.failure_count,
+            "last_failure": server.last_failure,
+        }
 
-            # Test connectivity
-            try:
-                test_question = DNSQuestion("google.com.", DNSRecordType.A, DNSClass.IN)
-                await self._query_server_pooled(
-                    server.address, server.port, test_question, 3.0
-                )
-                server_health["responsive"] = True
-                server_health["last_response_time"] = time.time()
-            except Exception as e:
-                server_health["responsive"] = False
-                server_health["last_error"] = str(e)
+        try:
+            test_question = DNSQuestion("google.com.", DNSRecordType.A, DNSClass.IN)
+            await self._query_upstream(server.address, server.port, test_question, 3.0)
+            server_health["responsive"] = True
+            server_health["last_response_time"] = time.time()
+        except Exception as e:
+            server_health["responsive"] = False
+            server_health["last_error"] = str(e)
 
-            health_info["upstream_servers"].append(server_health)
+        return server_health
 
-        # Check root server accessibility
+    async def _probe_root(self) -> bool:
+        """Check that a random root server answers"""
         try:
             root_server = random.choice(self.ROOT_SERVERS)
             test_question = DNSQuestion(".", DNSRecordType.NS, DNSClass.IN)
-            await self._query_server_pooled(root_server, 53, test_question, 5.0)
-            health_info["root_servers_accessible"] = True
+            await self._query_upstream(root_server, 53, test_question, 5.0)
+            return True
         except Exception:
-            health_info["root_servers_accessible"] = False
-            health_info["status"] = "degraded"
-
-        return health_info
+            return False
+
+
+# Constant root referral handed to iterative clients: the first three roots
+_ROOT_REFERRAL_AUTHORITY = tuple(
+    DNSResourceRecord(
+        name=".",
+        rtype=DNSRecordType.NS,
+        rclass=DNSClass.IN,
+        ttl=86400,
+        rdata=_ROOT_NS_WIRE[i],
+    )
+    for i in range(3)
+)
+_ROOT_REFERRAL_ADDITIONAL = tuple(
+    DNSResourceRecord(
+        name=f"{chr(ord('a') + i)}.root-servers.net.",
+        rtype=DNSRecordType.A,
+        rclass=DNSClass.IN,
+        ttl=86400,
+        rdata=socket.inet_aton(root_ip),
+    )
+    for i, root_ip in enumerate(DNSResolver.ROOT_SERVERS[:3])
+)
 
 
 class IterativeResolver:
@@ -637,41 +948,12 @@ class IterativeResolver:
             additional=[],
         )
 
-        # Add root server NS records in authority section
-        for i, root_ip in enumerate(self.resolver.ROOT_SERVERS[:3]):  # Just add a few
-            root_name = f"{chr(ord('a') + i)}.root-servers.net."
-
-            # NS record
-            ns_record = DNSResourceRecord(
-                name=".",
-                rtype=DNSRecordType.NS,
-                rclass=DNSClass.IN,
-                ttl=86400,
-                rdata=self._encode_name(root_name),
-            )
-            response.authority.append(ns_record)
-
-            # A record in additional section
-            a_record = DNSResourceRecord(
-                name=root_name,
-                rtype=DNSRecordType.A,
-                rclass=DNSClass.IN,
-                ttl=86400,
-                rdata=socket.inet_aton(root_ip),
-            )
-            response.additional.append(a_record)
+        # Add a few root servers as NS records with their glue
+        response.authority.extend(_ROOT_REFERRAL_AUTHORITY)
+        response.additional.extend(_ROOT_REFERRAL_ADDITIONAL)
 
         return response
 
     def _encode_name(self, name: str) -> bytes:
         """Encode domain name for DNS records"""
-        if name == ".":
-            return b"\x00"
-
-        labels = name.rstrip(".").split(".")
-        result = b""
-        for label in labels:
-            label_bytes = label.encode("ascii")
-            result += bytes([len(label_bytes)]) + label_bytes
-        result += b"\x00"
-        return result
+        return _encode_name(name)
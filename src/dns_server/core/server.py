@@ -11,11 +11,15 @@ This module implements the main DNS server functionality including:
 """
 
 import asyncio
+import collections
+import concurrent.futures
+import logging
+import socket
 import struct
 import time
-import uuid
+from array import array
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 # Import structured logging
 from ..dns_logging import (
@@ -25,13 +29,119 @@ from ..dns_logging import (
     log_performance_event,
     log_security_event,
 )
-from .message import DNSHeader, DNSMessage, DNSResponseCode
-from .performance import PerformanceMonitor, concurrency_limiter, timing_decorator
-from .resolver import DNSResolver, IterativeResolver
+from .message import (
+    DNSHeader,
+    DNSMessage,
+    DNSQuestion,
+    DNSResponseCode,
+    _encode_name,
+)
+from .performance import (
+    Operation,
+    PerformanceMonitor,
+    RingBuffer,
+    concurrency_limiter,
+    timing_decorator,
+)
+from .resolver import DNSResolver, IterativeResolver, _negative_ttl
 
 # Logger will be initialized when DNSServer is created
 logger = None
 
+# The stdlib logger behind it, checked before building per-query log events
+_stdlib_logger = logging.getLogger("dns_server_core")
+
+# Pre-serialized error response headers. Per query the ID and opcode/RD bits
+# are patched in, plus the question section for SERVFAIL/REFUSED
+_FORMERR_HEADER = DNSHeader(
+    transaction_id=0, flags=0, qr=True, rcode=DNSResponseCode.FORMERR
+).to_bytes()
+_ERROR_HEADERS = {
+    rcode: DNSHeader(
+        transaction_id=0, flags=0, qr=True, rd=False, ra=True, rcode=rcode
+    ).to_bytes()
+    for rcode in (DNSResponseCode.SERVFAIL, DNSResponseCode.REFUSED)
+}
+
+# Messages larger than a classic UDP datagram are parsed on a worker thread
+_PARSE_OFFLOAD_SIZE = 512
+
+# Datagrams read per wakeup of the UDP socket, and the largest one read
+_UDP_BATCH = 64
+_UDP_RECV_SIZE = 65535
+
+# A TCP connection's receive buffer holds the largest length-prefixed
+# message; reading pauses while this many queries wait to be answered
+_TCP_BUFFER_SIZE = 2 + 65535
+_TCP_PIPELINE_MAX = 64
+
+# Defaults and upper bounds for the encoded-response cache
+_RESPONSE_CACHE_SIZE = 10000
+_RESPONSE_CACHE_TTL_MAX = 300
+
+# EDNS0 OPT pseudo-record; its TTL field carries flags, not a lifetime
+_TYPE_OPT = 41
+
+# Slots in the rate limiter's table (a power of two). Clients are placed by
+# address hash and one landing on an occupied slot takes it over, so spoofed
+# sources can't grow the table
+_RATE_LIMIT_SLOTS = 65536
+
+# Largest UDP answer for clients that don't advertise a size with EDNS0
+_UDP_PAYLOAD_MIN = 512
+
+# Precompiled wire layouts: the TCP length prefix and a record's TTL, and an
+# OPT record's type and payload size
+_U16 = struct.Struct("!H")
+_U16_PAIR = struct.Struct("!HH")
+_U32 = struct.Struct("!I")
+
+# Names used in request logs
+_RECORD_TYPE_NAMES = {
+    1: "A",
+    28: "AAAA",
+    5: "CNAME",
+    15: "MX",
+    2: "NS",
+    12: "PTR",
+    16: "TXT",
+    6: "SOA",
+    33: "SRV",
+    99: "SPF",
+}
+_RCODE_NAMES = {
+    0: "NOERROR",
+    1: "FORMERR",
+    2: "SERVFAIL",
+    3: "NXDOMAIN",
+    4: "NOTIMP",
+    5: "REFUSED",
+}
+
+
+def _question_key(data: bytes) -> Tuple[bytes, int]:
+    """Build the response-cache key of a plain single-question query
+
+    The key is the RD bit plus the question with its QNAME lowercased.
+    Returns the key and the offset where the question ends, or (b"", 0)
+    if the packet is not a standard query with exactly one question.
+    """
+    try:
+        _, flags, qname, _, _ = DNSMessage.parse_header_and_first_question(data)
+    except ValueError:
+        return b"", 0
+    return _cache_key(data, flags, qname)
+
+
+def _cache_key(data: bytes, flags: int, qname: bytes) -> Tuple[bytes, int]:
+    """Build the response-cache key from an already peeked header and QNAME"""
+    if flags & 0xF800 or data[4:6] != b"\x00\x01":
+        return b"", 0
+
+    name_end = 12 + len(qname)
+    end = name_end + 4
+    return bytes((flags >> 8 & 0x01,)) + qname.lower() + data[name_end:end], end
+
 
 def _get_logger():
     """Get logger instance, initializing if needed."""
@@ -41,9 +151,7 @@ def _get_logger():
             logger = get_logger("dns_server_core")
         except RuntimeError:
             # Fallback to basic logging if structured logging not configured
-            import logging
-
-            logger = logging.getLogger("dns_server_core")
+            logger = _stdlib_logger
     return logger
 
 
@@ -58,10 +166,6 @@ class RequestMetrics:
     domain: str
     protocol: str  # 'UDP' or 'TCP'
 
-    def __post_init__(self):
-        if not self.request_id:
-            self.request_id = str(uuid.uuid4())
-
 
 @dataclass
 class ResponseMetrics:
@@ -75,12 +179,54 @@ class ResponseMetrics:
     answer_count: int
 
 
+def _udp_payload_size(query: bytes) -> int:
+    """Largest UDP response a client accepts: its EDNS0 payload size or 512"""
+    try:
+        _, _, qname, _, _ = DNSMessage.parse_header_and_first_question(query)
+    except ValueError:
+        return _UDP_PAYLOAD_MIN
+
+    # The OPT record leads the additional section of a plain query, owned by
+    # the root name
+    offset = 12 + len(qname) + 4
+    if query[6:10] != b"\0\0\0\0" or query[offset : offset + 1] != b"\0":
+        return _UDP_PAYLOAD_MIN
+    if len(query) < offset + 5:
+        return _UDP_PAYLOAD_MIN
+    rtype, payload_size = _U16_PAIR.unpack_from(query, offset + 1)
+    if rtype != _TYPE_OPT:
+        return _UDP_PAYLOAD_MIN
+    return max(payload_size, _UDP_PAYLOAD_MIN)
+
+
+def _fit_udp(response: bytes, query: bytes) -> bytes:
+    """Cut a response the client can't take over UDP down to a TC answer
+
+    Only the header and question are kept, with TC set, so the client
+    retries over TCP.
+    """
+    if len(response) <= _UDP_PAYLOAD_MIN or len(response) <= _udp_payload_size(query):
+        return response
+
+    try:
+        _, _, qname, _, _ = DNSMessage.parse_header_and_first_question(response)
+        end, question_count = 12 + len(qname) + 4, 1
+    except ValueError:
+        end, question_count = 12, 0
+    buf = bytearray(response[:end])
+    buf[2] |= 0x02  # TC
+    _U16.pack_into(buf, 4, question_count)
+    buf[6:12] = bytes(6)
+    return bytes(buf)
+
+
 class DNSUDPProtocol(asyncio.DatagramProtocol):
     """Async UDP protocol handler for DNS queries"""
 
     def __init__(self, server: "DNSServer"):
         self.server = server
         self.transport = None
+        self._sock: Optional[socket.socket] = None
 
     def connection_made(self, transport):
         """Called when UDP socket is ready"""
@@ -91,18 +237,82 @@ class DNSUDPProtocol(asyncio.DatagramProtocol):
             port=transport.get_extra_info("sockname")[1],
         )
 
+        # Responses go out on a duplicate of the listening socket, which
+        # skips the transport's per-call checks (see _send)
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            try:
+                self._sock = socket.fromfd(sock.fileno(), sock.family, sock.type)
+                self._sock.setblocking(False)
+            except OSError:
+                self._sock = None
+
+    def connection_lost(self, exc):
+        """Called when the UDP socket is closed"""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+
+    def _send(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Send a response, straight on the socket unless it would block"""
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.sendto(data, addr)
+                return
+            except (BlockingIOError, InterruptedError):
+                pass  # The transport buffers it until the socket is writable
+            except OSError as exc:
+                self.error_received(exc)
+                return
+        self.transport.sendto(data, addr)
+
     def datagram_received(self, data: bytes, addr: Tuple[str, int]):
-        """Handle incoming UDP DNS queries"""
+        """Handle incoming UDP DNS queries
+
+        The transport reads one datagram per readiness event, so whatever
+        else is already queued on the socket is read here in a batch.
+        """
+        self._handle_datagram(data, addr)
+
+        sock = self._sock
+        if sock is None:
+            return
+        for _ in range(_UDP_BATCH - 1):
+            try:
+                data, addr = sock.recvfrom(_UDP_RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                self.error_received(exc)
+                return
+            self._handle_datagram(data, addr)
+
+    def _handle_datagram(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Answer one datagram inline or hand it to a task"""
+        server = self.server
+        if server._inflight >= server._inflight_limit:
+            # Overloaded: drop the query, the client will retry
+            server._drops += 1
+            return
+
         client_ip, debug_info = _extract_client_ip(
-            addr, self.transport, {"protocol": "UDP"}, self.server.config
+            addr, self.transport, {"protocol": "UDP"}, server.config
         )
 
+        # Refusals and cached answers are sent right away without a task
+        response = server.answer_inline(data, client_ip, "UDP")
+        if response is not None:
+            self._send(_fit_udp(response, data), addr)
+            return
+
         # Create task to handle the request asynchronously
         task = asyncio.create_task(self._handle_request(data, client_ip, addr))
 
         # Store task reference to prevent garbage collection
-        self.server._background_tasks.add(task)
-        task.add_done_callback(self.server._background_tasks.discard)
+        server._inflight += 1
+        server._background_tasks.add(task)
+        task.add_done_callback(server._background_tasks.discard)
 
     async def _handle_request(self, data: bytes, client_ip: str, addr: Tuple[str, int]):
         """Process DNS query and send response with concurrency limiting"""
@@ -110,10 +320,10 @@ class DNSUDPProtocol(asyncio.DatagramProtocol):
             # Apply concurrency limiting
             async with await concurrency_limiter.acquire():
                 response_data = await self.server.handle_dns_request(
-                    data, client_ip, "UDP"
+                    data, client_ip, "UDP", rate_checked=True
                 )
                 if response_data:
-                    self.transport.sendto(response_data, addr)
+                    self._send(_fit_udp(response_data, data), addr)
         except RuntimeError as e:
             # Handle backpressure (queue full, etc.)
             _get_logger().warning(
@@ -127,12 +337,195 @@ class DNSUDPProtocol(asyncio.DatagramProtocol):
             _get_logger().error(
                 "Error handling UDP request", client_ip=client_ip, error=str(e)
             )
+        finally:
+            self.server._inflight -= 1
 
     def error_received(self, exc):
         """Handle UDP errors"""
         _get_logger().error("DNS UDP protocol error", error=str(exc))
 
 
+class DNSTCPProtocol(asyncio.BufferedProtocol):
+    """Async TCP protocol handler reading length-prefixed DNS queries in place"""
+
+    def __init__(self, server: "DNSServer"):
+        self.server = server
+        self.transport = None
+        self.client_ip = "unknown"
+
+        # Received bytes land in one reused buffer; [_start, _end) is unread
+        self._buf = bytearray(_TCP_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+
+        # Queries are answered one at a time, in order, by a single task
+        self._pending: collections.deque = collections.deque()
+        self._task: Optional[asyncio.Task] = None
+        self._reading_paused = False
+        self._writing_paused = False
+        self._eof = False
+
+    def connection_made(self, transport):
+        """Called when a client connects"""
+        self.transport = transport
+        client_addr = transport.get_extra_info("peername")
+        if client_addr:
+            self.client_ip, _ = _extract_client_ip(
+                client_addr, transport, {"protocol": "TCP"}, self.server.config
+            )
+
+        # Answers are small and each one completes a query, so Nagle would
+        # only delay them. A zero high-water mark means any answer the
+        # kernel cannot take right away pauses reading (see pause_writing),
+        # so a client that stops reading cannot pile answers up in memory
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        transport.set_write_buffer_limits(high=0)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Hand the free tail of the receive buffer to the transport"""
+        return self._view[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Split every complete message out of the newly received bytes"""
+        self._end += nbytes
+        buf = self._buf
+        start = self._start
+        end = self._end
+
+        while end - start >= 2:
+            length = buf[start] << 8 | buf[start + 1]
+            if end - start - 2 < length:
+                break
+            data = bytes(self._view[start + 2 : start + 2 + length])
+            start += 2 + length
+
+            # Refusals and cached answers go out right away unless earlier
+            # queries are still queued or being answered, which would
+            # reorder them
+            if self._task is None and not self._pending:
+                response = self.server.answer_inline(data, self.client_ip, "TCP")
+                if response is not None:
+                    self._send(response)
+                    continue
+                self._pending.append((data, True))
+            else:
+                self._pending.append((data, False))
+
+        # Move a partial message to the front so the buffer never runs out
+        if start == end:
+            self._start = self._end = 0
+        elif start:
+            rest = end - start
+            buf[:rest] = buf[start:end]
+            self._start, self._end = 0, rest
+
+        if self._pending:
+            if len(self._pending) >= _TCP_PIPELINE_MAX:
+                self._pause_reading()
+            if self._task is None:
+                self._start_task()
+
+    def eof_received(self) -> bool:
+        """Keep the connection open until queued queries are answered"""
+        self._eof = True
+        return self._task is not None
+
+    def connection_lost(self, exc):
+        """Called when the connection is closed"""
+        self._pending.clear()
+
+    def pause_writing(self) -> None:
+        """Stop reading queries while the client is not reading answers"""
+        self._writing_paused = True
+        self._pause_reading()
+
+    def resume_writing(self) -> None:
+        """Read queries again once the client has caught up"""
+        self._writing_paused = False
+        self._maybe_resume_reading()
+
+    def _pause_reading(self) -> None:
+        if not self._reading_paused and not self.transport.is_closing():
+            self._reading_paused = True
+            self.transport.pause_reading()
+
+    def _resume_reading(self) -> None:
+        if self._reading_paused and not self.transport.is_closing():
+            self._reading_paused = False
+            self.transport.resume_reading()
+
+    def _maybe_resume_reading(self) -> None:
+        # The transport reports pause_writing only once, so reading stays off
+        # until resume_writing however far the queue drains meanwhile
+        if not self._writing_paused and len(self._pending) < _TCP_PIPELINE_MAX:
+            self._resume_reading()
+
+    def _send(self, response: bytes) -> None:
+        """Write one response after its length prefix
+
+        The two buffers are not joined here. Transports that support it
+        (the selector loop on Python 3.12+) send them with a single
+        sendmsg(), and the others join them once internally.
+        """
+        self.transport.writelines((_U16.pack(len(response)), response))
+
+    def _start_task(self) -> None:
+        server = self.server
+        self._task = asyncio.create_task(self._answer_pending())
+        server._background_tasks.add(self._task)
+        self._task.add_done_callback(server._background_tasks.discard)
+
+    async def _answer_pending(self) -> None:
+        """Answer queued queries in order with concurrency limiting"""
+        server = self.server
+        client_ip = self.client_ip
+        try:
+            async with await concurrency_limiter.acquire():
+                while self._pending:
+                    data, rate_checked = self._pending.popleft()
+                    response = None
+                    if not rate_checked:
+                        response = server.answer_inline(data, client_ip, "TCP")
+                    if response is None:
+                        response = await server.handle_dns_request(
+                            data, client_ip, "TCP", rate_checked=True
+                        )
+                    if self.transport.is_closing():
+                        return
+                    if not response:
+                        # No response or error
+                        self.transport.close()
+                        return
+
+                    self._send(response)
+                    self._maybe_resume_reading()
+        except RuntimeError as e:
+            _get_logger().warning(
+                "TCP connection rejected due to backpressure",
+                client_ip=client_ip,
+                error=str(e),
+            )
+            # Log security event for potential DDoS
+            log_security_event("backpressure_rejection", client_ip)
+            self.transport.close()
+        except Exception as e:
+            _get_logger().error("TCP client error", client_ip=client_ip, error=str(e))
+            self.transport.close()
+        finally:
+            self._task = None
+            if self._pending and not self.transport.is_closing():
+                # Queries that arrived while the limiter was being released
+                self._start_task()
+            elif self._eof:
+                self.transport.close()
+
+
 class DNSServer:
     """Main DNS Server Implementation"""
 
@@ -150,24 +543,50 @@ class DNSServer:
         self._tcp_server = None
         self._background_tasks = set()
         self._is_running = False
+        self._parser_pool = None
+
+        # Bound on UDP queries being handled at once
+        self._inflight = 0
+        self._inflight_limit = getattr(config.server, "max_inflight", None) or 10000
 
         # Performance tracking
+        self._total_queries = 0
+        self._udp_queries = 0
+        self._tcp_queries = 0
+        self._errors = 0
+        self._drops = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
         self._stats = {
-            "total_queries": 0,
-            "udp_queries": 0,
-            "tcp_queries": 0,
-            "errors": 0,
             "start_time": 0,
-            "response_times": [],
+            # Last 1000 response times (ms), unboxed, with their running sum
+            "response_times": RingBuffer(1000),
         }
+        self._response_time_sum = 0.0
+
+        # Encoded recursive answers in LRU order: question key ->
+        # (expires_at, stored_at, wire, TTL fields, domain, query_type,
+        #  rcode name, data)
+        self._response_cache: collections.OrderedDict = collections.OrderedDict()
+        self._response_cache_size = (
+            getattr(config.server, "response_cache_size", None) or _RESPONSE_CACHE_SIZE
+        )
 
-        # Rate limiting (per IP)
-        self._rate_limits = {}
+        # Rate limiting (per IP): token buckets as parallel slot arrays of
+        # owner address, tokens and last refill
+        self._rate_limit_mask = _RATE_LIMIT_SLOTS - 1
+        self._rate_limit_ips: List[Optional[str]] = [None] * _RATE_LIMIT_SLOTS
+        self._rate_limit_tokens = array("d", bytes(8 * _RATE_LIMIT_SLOTS))
+        self._rate_limit_last = array("d", bytes(8 * _RATE_LIMIT_SLOTS))
 
     def set_performance_monitor(self, monitor: PerformanceMonitor):
-        """Set the performance monitor"""
+        """Set the performance monitor and time the request handler"""
         self.performance_monitor = monitor
         self.resolver.set_performance_monitor(monitor)
+        handler = DNSServer.handle_dns_request.__get__(self)
+        self.handle_dns_request = timing_decorator(
+            Operation.DNS_REQUEST_HANDLING, monitor
+        )(handler)
 
     async def start(self) -> None:
         """Start the DNS server (UDP and TCP)"""
@@ -180,17 +599,27 @@ class DNSServer:
         bind_address = getattr(self.config.server, "bind_address", "127.0.0.1")
         dns_port = getattr(self.config.server, "dns_port", 9953)
 
+        # With several worker processes every one binds the same port and
+        # the kernel spreads incoming queries across their sockets
+        reuse_port = getattr(self.config.server, "workers", 1) > 1
+
         try:
             # Start UDP server
             loop = asyncio.get_running_loop()
             udp_transport, udp_protocol = await loop.create_datagram_endpoint(
-                lambda: DNSUDPProtocol(self), local_addr=(bind_address, dns_port)
+                lambda: DNSUDPProtocol(self),
+                local_addr=(bind_address, dns_port),
+                reuse_port=reuse_port,
             )
             self._udp_server = (udp_transport, udp_protocol)
+            self._tune_udp_socket(udp_transport.get_extra_info("socket"))
 
             # Start TCP server
-            tcp_server = await asyncio.start_server(
-                self._handle_tcp_client, host=bind_address, port=dns_port
+            tcp_server = await loop.create_server(
+                lambda: DNSTCPProtocol(self),
+                host=bind_address,
+                port=dns_port,
+                reuse_port=reuse_port,
             )
             self._tcp_server = tcp_server
 
@@ -207,6 +636,24 @@ class DNSServer:
             await self.stop()
             raise
 
+    def _tune_udp_socket(self, sock) -> None:
+        """Enlarge the UDP socket buffers so bursts are not dropped by the kernel"""
+        rcvbuf = getattr(self.config.server, "udp_rcvbuf", 4 * 1024 * 1024)
+        sndbuf = getattr(self.config.server, "udp_sndbuf", 4 * 1024 * 1024)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        except OSError as e:
+            _get_logger().warning("Could not resize UDP socket buffers", error=str(e))
+            return
+
+        # The kernel silently caps the sizes at net.core.{r,w}mem_max
+        _get_logger().info(
+            "UDP socket buffers configured",
+            rcvbuf=sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF),
+            sndbuf=sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF),
+        )
+
     async def stop(self) -> None:
         """Stop the DNS server"""
         if not self._is_running:
@@ -228,135 +675,97 @@ class DNSServer:
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
 
-        self._is_running = False
-        _get_logger().info("DNS server stopped")
-
-    async def _handle_tcp_client(
-        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
-    ):
-        """Handle TCP DNS client connection with concurrency limiting"""
-        client_addr = writer.get_extra_info("peername")
-        if client_addr:
-            client_ip, debug_info = _extract_client_ip(
-                client_addr, writer.transport, {"protocol": "TCP"}, self.config
-            )
-        else:
-            client_ip = "unknown"
-            debug_info = {"error": "No peername available", "protocol": "TCP"}
-
-        try:
-            # Apply concurrency limiting for TCP connections
-            async with await concurrency_limiter.acquire():
-                await self._process_tcp_connection(reader, writer, client_ip)
-        except RuntimeError as e:
-            _get_logger().warning(
-                "TCP connection rejected due to backpressure",
-                client_ip=client_ip,
-                error=str(e),
-                **debug_info,
-            )
-            # Log security event for potential DDoS
-            log_security_event("backpressure_rejection", client_ip)
-        finally:
-            writer.close()
-            await writer.wait_closed()
-
-    async def _process_tcp_connection(
-        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client_ip: str
-    ):
-        """Process TCP connection messages"""
-        try:
-            while True:
-                # Read message length (2 bytes, network byte order)
-                length_data = await reader.readexactly(2)
-                if not length_data:
-                    break
-
-                message_length = struct.unpack("!H", length_data)[0]
-
-                # Read the DNS message
-                dns_data = await reader.readexactly(message_length)
+        self.resolver.close()
 
-                # Process the request
-                response_data = await self.handle_dns_request(
-                    dns_data, client_ip, "TCP"
-                )
-
-                if response_data:
-                    # Send response with length prefix
-                    response_length = struct.pack("!H", len(response_data))
-                    writer.write(response_length + response_data)
-                    await writer.drain()
-                else:
-                    # No response or error
-                    break
+        if self._parser_pool is not None:
+            self._parser_pool.shutdown(wait=False)
+            self._parser_pool = None
 
-        except asyncio.IncompleteReadError:
-            # Client disconnected
-            pass
-        except Exception as e:
-            _get_logger().error("TCP client error", client_ip=client_ip, error=str(e))
+        self._is_running = False
+        _get_logger().info("DNS server stopped")
 
-    @timing_decorator("dns_request_handling", None)  # Will be set dynamically
     async def handle_dns_request(
-        self, data: bytes, client_ip: str, protocol: str
+        self, data: bytes, client_ip: str, protocol: str, rate_checked: bool = False
     ) -> Optional[bytes]:
         """
         Main DNS request handler for both UDP and TCP
-        """
-        # Set up timing decorator with current performance monitor
-        if self.performance_monitor:
-            timing_decorator.__defaults__ = (
-                "dns_request_handling",
-                self.performance_monitor,
-            )
 
+        rate_checked tells that answer_inline already charged the client's
+        rate limit for this query.
+        """
         # Start request tracking
         request_id = self.request_tracker.start_request()
-        start_time = time.time()
+        start_time = time.perf_counter()
+        question_end = 0
 
         try:
+            # Clients over their rate limit are refused before any parsing,
+            # whatever the packet holds
+            if (
+                not rate_checked
+                and len(data) >= 12
+                and not self._check_rate_limit(client_ip)
+            ):
+                return self._refuse_rate_limited(data, request_id, client_ip, protocol)
+
+            # Locate the first question so error responses can echo it, and
+            # key the answer for the response cache from the same peek
+            cache_key = b""
+            try:
+                _, flags, qname, _, _ = DNSMessage.parse_header_and_first_question(data)
+                question_end = 12 + len(qname) + 4
+                cache_key, _ = _cache_key(data, flags, qname)
+            except ValueError:
+                pass  # Left to the full parse, which answers FORMERR
+
             # Parse DNS message
             try:
-                query = DNSMessage.from_bytes(data)
-            except Exception as e:
-                _get_logger().warning(
-                    "Malformed DNS packet", client_ip=client_ip, error=str(e)
-                )
-                self._stats["errors"] += 1
+                if len(data) > _PARSE_OFFLOAD_SIZE:
+                    query = await self._parse_large_message(data)
+                else:
+                    query = DNSMessage.from_bytes(data)
+            except (ValueError, IndexError, struct.error) as e:
+                if _stdlib_logger.isEnabledFor(logging.WARNING):
+                    _get_logger().warning(
+                        "Malformed DNS packet", client_ip=client_ip, error=str(e)
+                    )
+                self._errors += 1
                 if self.performance_monitor:
                     self.performance_monitor.record_error("malformed_packet")
 
                 # Log the error
-                self.request_tracker.end_request(
-                    request_id=request_id,
-                    client_ip=client_ip,
-                    query_type="UNKNOWN",
-                    domain="UNKNOWN",
-                    response_code="FORMERR",
-                    cache_hit=False,
-                    error="Malformed DNS packet",
-                )
+                if self.request_tracker.enabled:
+                    self.request_tracker.end_request(
+                        request_id=request_id,
+                        client_ip=client_ip,
+                        query_type="UNKNOWN",
+                        domain="UNKNOWN",
+                        response_code="FORMERR",
+                        cache_hit=False,
+                        error="Malformed DNS packet",
+                    )
 
                 return self._create_format_error_response(data)
 
             # Validate query
             if not query.is_query() or not query.questions:
-                _get_logger().warning("Invalid DNS query", client_ip=client_ip)
-                self._stats["errors"] += 1
+                if _stdlib_logger.isEnabledFor(logging.WARNING):
+                    _get_logger().warning("Invalid DNS query", client_ip=client_ip)
+                self._errors += 1
                 if self.performance_monitor:
                     self.performance_monitor.record_error("invalid_query")
 
                 # Log the error
-                self.request_tracker.end_request(
-                    request_id=request_id,
-                    client_ip=client_ip,
-                    query_type="UNKNOWN",
-                    domain="UNKNOWN",
-                    response_code="FORMERR",
-                    cache_hit=False,
-                    error="Invalid DNS query",
-                )
+                if self.request_tracker.enabled:
+                    self.request_tracker.end_request(
+                        request_id=request_id,
+                        client_ip=client_ip,
+                        query_type="UNKNOWN",
+                        domain="UNKNOWN",
+                        response_code="FORMERR",
+                        cache_hit=False,
+                        error="Invalid DNS query",
+                    )
 
                 return self._create_format_error_response(data)
 
@@ -366,35 +775,11 @@ class DNSServer:
             domain = question.name
 
             # Update stats
-            self._stats["total_queries"] += 1
+            self._total_queries += 1
             if protocol == "UDP":
-                self._stats["udp_queries"] += 1
+                self._udp_queries += 1
             else:
-                self._stats["tcp_queries"] += 1
-
-            # Check rate limiting
-            if not self._check_rate_limit(client_ip):
-                _get_logger().warning("Rate limit exceeded", client_ip=client_ip)
-                if self.performance_monitor:
-                    self.performance_monitor.record_error("rate_limit_exceeded")
-
-                # Log security event
-                log_security_event("rate_limit_exceeded", client_ip, domain)
-
-                # Log the request
-                self.request_tracker.end_request(
-                    request_id=request_id,
-                    client_ip=client_ip,
-                    query_type=query_type,
-                    domain=domain,
-                    response_code="REFUSED",
-                    cache_hit=False,
-                    error="Rate limit exceeded",
-                )
-
-                response = query.create_response(DNSResponseCode.REFUSED)
-                response.header.transaction_id = query.header.transaction_id
-                return response.to_bytes()
+                self._tcp_queries += 1
 
             # Determine if recursion is desired and available
             recursion_desired = query.header.rd
@@ -403,13 +788,20 @@ class DNSServer:
             # Resolve the query
             upstream_server = None
             response_data = []
+            cache_hit = False
 
             try:
                 if recursion_desired and recursion_available:
                     # Use recursive resolver
-                    resolved_response = await self.resolver.resolve(
-                        question, use_recursion=True
+                    resolved_response, cache_hit = (
+                        await self.resolver.resolve_with_cache_hit(
+                            question, use_recursion=True
+                        )
                     )
+                    if cache_hit:
+                        self._cache_hits += 1
+                    else:
+                        self._cache_misses += 1
                     # Get upstream server info if available
                     upstream_server = getattr(
                         resolved_response, "upstream_server", None
@@ -436,41 +828,45 @@ class DNSServer:
                 if self.performance_monitor:
                     self.performance_monitor.record_error("resolution_failed")
 
-                # Log the error
-                self.request_tracker.end_request(
-                    request_id=request_id,
-                    client_ip=client_ip,
-                    query_type=query_type,
-                    domain=domain,
-                    response_code="SERVFAIL",
-                    cache_hit=False,
-                    error=f"Resolution failed: {str(e)}",
+                # Upstream timeouts count toward the adaptive concurrency limit
+                concurrency_limiter.record_latency(
+                    (time.perf_counter() - start_time) * 1000
                 )
 
-                response = query.create_response(DNSResponseCode.SERVFAIL)
-                response.header.transaction_id = query.header.transaction_id
-                response.header.ra = recursion_available
+                # Log the error
+                if self.request_tracker.enabled:
+                    self.request_tracker.end_request(
+                        request_id=request_id,
+                        client_ip=client_ip,
+                        query_type=query_type,
+                        domain=domain,
+                        response_code="SERVFAIL",
+                        cache_hit=False,
+                        error=f"Resolution failed: {str(e)}",
+                    )
 
-            # Calculate response time and update stats
-            response_time_ms = (time.time() - start_time) * 1000
-            self._stats["response_times"].append(response_time_ms)
+                return self._create_error_response(
+                    data, DNSResponseCode.SERVFAIL, question_end
+                )
 
-            # Keep only last 1000 response times for memory efficiency
-            if len(self._stats["response_times"]) > 1000:
-                self._stats["response_times"] = self._stats["response_times"][-1000:]
+            # Calculate response time and update stats
+            response_time_ms = (time.perf_counter() - start_time) * 1000
+            self._record_response_time(response_time_ms)
+            concurrency_limiter.record_latency(response_time_ms)
 
             # Log the successful request
             response_code = self._get_response_code_name(response.header.rcode)
-            self.request_tracker.end_request(
-                request_id=request_id,
-                client_ip=client_ip,
-                query_type=query_type,
-                domain=domain,
-                response_code=response_code,
-                cache_hit=False,
-                upstream_server=upstream_server,
-                response_data=response_data,
-            )
+            if self.request_tracker.enabled:
+                self.request_tracker.end_request(
+                    request_id=request_id,
+                    client_ip=client_ip,
+                    query_type=query_type,
+                    domain=domain,
+                    response_code=response_code,
+                    cache_hit=cache_hit,
+                    upstream_server=upstream_server,
+                    response_data=response_data,
+                )
 
             # Log performance event if slow
             if response_time_ms > 1000:  # Log slow queries (> 1 second)
@@ -482,122 +878,317 @@ class DNSServer:
                     client_ip=client_ip,
                 )
 
-            return response.to_bytes()
+            # Recursive answers and the static iterative referral are both
+            # kept encoded, so repeats skip building and serializing them
+            wire = response.to_bytes()
+            if response.header.rcode in (
+                DNSResponseCode.NOERROR,
+                DNSResponseCode.NXDOMAIN,
+            ):
+                self._cache_response(
+                    cache_key,
+                    question_end,
+                    wire,
+                    response,
+                    domain,
+                    query_type,
+                    response_data,
+                )
+            return wire
 
         except Exception as e:
             _get_logger().error(
                 "Unexpected error handling request", client_ip=client_ip, error=str(e)
             )
-            self._stats["errors"] += 1
+            self._errors += 1
             if self.performance_monitor:
                 self.performance_monitor.record_error("unexpected_error")
 
             # Log the error
-            response_time_ms = (time.time() - start_time) * 1000
+            if self.request_tracker.enabled:
+                self.request_tracker.end_request(
+                    request_id=request_id,
+                    client_ip=client_ip,
+                    query_type="UNKNOWN",
+                    domain="UNKNOWN",
+                    response_code="SERVFAIL",
+                    cache_hit=False,
+                    error=f"Unexpected error: {str(e)}",
+                )
+
+            # Answer SERVFAIL straight from the packet, without parsing it again
+            if len(data) < 12:
+                return None
+            return self._create_error_response(
+                data, DNSResponseCode.SERVFAIL, question_end
+            )
+
+    def answer_inline(
+        self, data: bytes, client_ip: str, protocol: str
+    ) -> Optional[bytes]:
+        """Answer a query synchronously when it needs no resolution
+
+        Clients over their rate limit are refused and repeated questions are
+        answered from the encoded-response cache. Returns None when the query
+        has to go through handle_dns_request with rate_checked=True.
+        """
+        if len(data) >= 12 and not self._check_rate_limit(client_ip):
+            request_id = self.request_tracker.start_request()
+            return self._refuse_rate_limited(data, request_id, client_ip, protocol)
+        return self.answer_from_cache(data, client_ip, protocol)
+
+    def answer_from_cache(
+        self, data: bytes, client_ip: str, protocol: str
+    ) -> Optional[bytes]:
+        """Answer a query synchronously from the encoded-response cache
+
+        Returns None when the query has to go through handle_dns_request.
+        """
+        if not self._response_cache:
+            return None
+
+        key, end = _question_key(data)
+        if not end:
+            return None
+
+        cache = self._response_cache
+        entry = cache.get(key)
+        if entry is None:
+            return None
+
+        (
+            expires_at,
+            stored_at,
+            wire,
+            ttl_fields,
+            domain,
+            query_type,
+            response_code,
+            response_data,
+        ) = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            del cache[key]
+            return None
+
+        cache.move_to_end(key)
+
+        self._total_queries += 1
+        if protocol == "UDP":
+            self._udp_queries += 1
+        else:
+            self._tcp_queries += 1
+        self._cache_hits += 1
+
+        if self.request_tracker.enabled:
+            request_id = self.request_tracker.start_request()
             self.request_tracker.end_request(
                 request_id=request_id,
                 client_ip=client_ip,
-                query_type="UNKNOWN",
-                domain="UNKNOWN",
-                response_code="SERVFAIL",
-                cache_hit=False,
-                error=f"Unexpected error: {str(e)}",
+                query_type=query_type,
+                domain=domain,
+                response_code=response_code,
+                cache_hit=True,
+                response_data=response_data,
             )
 
-            # Try to create a SERVFAIL response
-            try:
-                # Parse original query to get transaction ID
-                query = DNSMessage.from_bytes(data)
-                response = query.create_response(DNSResponseCode.SERVFAIL)
-                response.header.transaction_id = query.header.transaction_id
-                return response.to_bytes()
-            except:
-                return None
+        # Echo the client's ID and question spelling (0x20 case randomization)
+        age = int(now - stored_at)
+        if not age:
+            return data[:2] + wire[2:12] + data[12:end] + wire[end:]
+
+        # Count the time spent in the cache down from every TTL. Additional
+        # records don't bound the entry's lifetime, so theirs may run out first
+        buf = bytearray(wire)
+        buf[0:2] = data[:2]
+        buf[12:end] = data[12:end]
+        for offset, ttl in ttl_fields:
+            _U32.pack_into(buf, offset, ttl - age if ttl > age else 0)
+        return bytes(buf)
+
+    def _cache_response(
+        self,
+        key: bytes,
+        end: int,
+        wire: bytes,
+        response: DNSMessage,
+        domain: str,
+        query_type: str,
+        response_data: List[str],
+    ) -> None:
+        """Remember an encoded answer until its shortest TTL expires
+
+        key is the query's _cache_key (empty if it is not cacheable) and
+        end the offset where its question ends.
+        """
+        if not key:
+            return
 
-    def _create_format_error_response(self, original_data: bytes) -> Optional[bytes]:
+        # NXDOMAIN and NODATA answers last as long as their SOA allows
+        # (RFC 2308); anything else, referrals included, by its shortest TTL
+        ttl = None
+        if not response.answers:
+            ttl = _negative_ttl(response.authority)
+        if ttl is None:
+            ttls = [rr.ttl for rr in response.answers]
+            ttls.extend(rr.ttl for rr in response.authority)
+            if not ttls:
+                return
+            ttl = min(ttls)
+        ttl = min(ttl, _RESPONSE_CACHE_TTL_MAX)
+        if ttl <= 0:
+            return
+
+        # Locate each record's TTL in the uncompressed encoding
+        offset = end
+        ttl_fields = []
+        for section in (response.answers, response.authority, response.additional):
+            for rr in section:
+                offset += len(_encode_name(rr.name))
+                if rr.rtype != _TYPE_OPT:
+                    ttl_fields.append((offset + 4, rr.ttl))
+                offset += 10 + len(rr.rdata)
+        if offset != len(wire):
+            return
+
+        cache = self._response_cache
+        if key in cache:
+            cache.move_to_end(key)
+        elif len(cache) >= self._response_cache_size:
+            cache.popitem(last=False)
+        now = time.monotonic()
+        cache[key] = (
+            now + ttl,
+            now,
+            wire,
+            tuple(ttl_fields),
+            domain,
+            query_type,
+            self._get_response_code_name(response.header.rcode),
+            response_data,
+        )
+
+    async def _parse_large_message(self, data: bytes) -> DNSMessage:
+        """Parse a large message on the parser pool so the loop keeps serving"""
+        if self._parser_pool is None:
+            self._parser_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="dns-parse"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._parser_pool, DNSMessage.from_bytes, data
+        )
+
+    def _record_response_time(self, response_time_ms: float) -> None:
+        """Add a response time to the ring, keeping the running sum in step"""
+        evicted = self._stats["response_times"].append(response_time_ms)
+        if evicted is not None:
+            self._response_time_sum -= evicted
+        self._response_time_sum += response_time_ms
+
+    def _create_format_error_response(self, original_data: bytes) -> bytes:
         """Create a format error response"""
+        if len(original_data) < 2:
+            return _FORMERR_HEADER
+        buf = bytearray(_FORMERR_HEADER)
+        buf[0:2] = original_data[0:2]
+        if len(original_data) > 2:
+            buf[2] |= original_data[2] & 0x79  # Opcode and RD
+        return bytes(buf)
+
+    def _create_error_response(
+        self, data: bytes, rcode: int, question_end: int
+    ) -> bytes:
+        """Create a SERVFAIL/REFUSED response echoing the query's first question"""
+        buf = bytearray(_ERROR_HEADERS[rcode])
+        buf[0:2] = data[0:2]
+        buf[2] |= data[2] & 0x79  # Opcode and RD
+        if question_end:
+            buf[5] = 1
+            buf += data[12:question_end]
+        return bytes(buf)
+
+    def _refuse_rate_limited(
+        self, data: bytes, request_id: str, client_ip: str, protocol: str
+    ) -> bytes:
+        """Account for and answer a query from a client over its rate limit"""
+        query_type = domain = "UNKNOWN"
+        question_end = 0
         try:
-            # Try to extract transaction ID from the original data
-            if len(original_data) >= 2:
-                transaction_id = struct.unpack("!H", original_data[:2])[0]
-            else:
-                transaction_id = 0
-
-            # Create minimal FORMERR response
-            header = DNSHeader(
-                transaction_id=transaction_id,
-                flags=0,
-                qr=True,
-                rcode=DNSResponseCode.FORMERR,
-            )
+            _, _, qname, qtype, _ = DNSMessage.parse_header_and_first_question(data)
+            question_end = 12 + len(qname) + 4
+            query_type = self._get_record_type_name(qtype)
+            domain, _ = DNSQuestion._decode_name(data, 12)
+        except ValueError:
+            pass  # Refused without echoing a question
+
+        self._total_queries += 1
+        if protocol == "UDP":
+            self._udp_queries += 1
+        else:
+            self._tcp_queries += 1
+
+        if _stdlib_logger.isEnabledFor(logging.WARNING):
+            _get_logger().warning("Rate limit exceeded", client_ip=client_ip)
+        if self.performance_monitor:
+            self.performance_monitor.record_error("rate_limit_exceeded")
 
-            response = DNSMessage(
-                header=header, questions=[], answers=[], authority=[], additional=[]
+        # Log security event
+        log_security_event("rate_limit_exceeded", client_ip, domain)
+
+        # Log the request
+        if self.request_tracker.enabled:
+            self.request_tracker.end_request(
+                request_id=request_id,
+                client_ip=client_ip,
+                query_type=query_type,
+                domain=domain,
+                response_code="REFUSED",
+                cache_hit=False,
+                error="Rate limit exceeded",
             )
 
-            return response.to_bytes()
-        except:
-            return None
+        return self._create_error_response(data, DNSResponseCode.REFUSED, question_end)
 
     def _check_rate_limit(self, client_ip: str) -> bool:
-        """Check if client IP is within rate limits"""
+        """Check if client IP is within rate limits (token bucket per IP)"""
         rate_limit = getattr(self.config.security, "rate_limit_per_ip", 100)
         if rate_limit <= 0:
             return True  # No rate limiting
 
-        current_time = time.time()
+        now = time.monotonic()
+        slot = hash(client_ip) & self._rate_limit_mask
 
-        # Clean old entries (older than 1 minute)
-        self._rate_limits = {
-            ip: times
-            for ip, times in self._rate_limits.items()
-            if times and max(times) > current_time - 60
-        }
-
-        # Check current IP
-        if client_ip not in self._rate_limits:
-            self._rate_limits[client_ip] = []
-
-        # Remove times older than 1 minute
-        self._rate_limits[client_ip] = [
-            t for t in self._rate_limits[client_ip] if t > current_time - 60
-        ]
+        # Refill at rate_limit tokens per minute, up to a burst of rate_limit.
+        # A new client, or one taking over the slot, starts with a full bucket
+        if self._rate_limit_ips[slot] == client_ip:
+            tokens = (
+                self._rate_limit_tokens[slot]
+                + (now - self._rate_limit_last[slot]) * rate_limit / 60
+            )
+            if tokens > rate_limit:
+                tokens = rate_limit
+        else:
+            self._rate_limit_ips[slot] = client_ip
+            tokens = rate_limit
 
-        # Check if limit exceeded
-        if len(self._rate_limits[client_ip]) >= rate_limit:
+        self._rate_limit_last[slot] = now
+        if tokens < 1:
+            self._rate_limit_tokens[slot] = tokens
             return False
 
-        # Add current request time
-        self._rate_limits[client_ip].append(current_time)
+        self._rate_limit_tokens[slot] = tokens - 1
         return True
 
-    def _get_record_type_name(self, rtype: int) -> str:
+    @staticmethod
+    def _get_record_type_name(rtype: int) -> str:
         """Convert DNS record type to string"""
-        type_names = {
-            1: "A",
-            28: "AAAA",
-            5: "CNAME",
-            15: "MX",
-            2: "NS",
-            12: "PTR",
-            16: "TXT",
-            6: "SOA",
-            33: "SRV",
-            99: "SPF",
-        }
-        return type_names.get(rtype, f"TYPE{rtype}")
+        return _RECORD_TYPE_NAMES.get(rtype) or f"TYPE{rtype}"
 
-    def _get_response_code_name(self, rcode: int) -> str:
+    @staticmethod
+    def _get_response_code_name(rcode: int) -> str:
         """Convert DNS response code to string"""
-        code_names = {
-            0: "NOERROR",
-            1: "FORMERR",
-            2: "SERVFAIL",
-            3: "NXDOMAIN",
-            4: "NOTIMP",
-            5: "REFUSED",
-        }
-        return code_names.get(rcode, f"RCODE{rcode}")
+        return _RCODE_NAMES.get(rcode) or f"RCODE{rcode}"
 
     def get_stats(self) -> Dict[str, Any]:
         """Get server statistics"""
@@ -607,23 +1198,33 @@ class DNSServer:
 
         stats = {
             "uptime_seconds": round(uptime, 2),
-            "total_queries": self._stats["total_queries"],
-            "udp_queries": self._stats["udp_queries"],
-            "tcp_queries": self._stats["tcp_queries"],
-            "errors": self._stats["errors"],
+            "total_queries": self._total_queries,
+            "udp_queries": self._udp_queries,
+            "tcp_queries": self._tcp_queries,
+            "errors": self._errors,
+            "drops": self._drops,
+            "cache_hits": self._cache_hits,
+            "cache_misses": self._cache_misses,
             "is_running": self._is_running,
         }
 
         # Calculate response time statistics
-        if self._stats["response_times"]:
-            response_times = self._stats["response_times"]
+        ring = self._stats["response_times"]
+        if ring.count:
+            # Order doesn't matter here, so reduce the filled part of the
+            # backing array directly; until it wraps that is its prefix
+            samples = ring.buf if ring.count == ring.cap else ring.buf[: ring.count]
+
+            # The window is walked here anyway, so resync the running sum to
+            # stop float error from piling up over millions of updates
+            self._response_time_sum = sum(samples)
             stats.update(
                 {
                     "avg_response_time_ms": round(
-                        sum(response_times) / len(response_times), 2
+                        self._response_time_sum / ring.count, 2
                     ),
-                    "min_response_time_ms": round(min(response_times), 2),
-                    "max_response_time_ms": round(max(response_times), 2),
+                    "min_response_time_ms": round(min(samples), 2),
+                    "max_response_time_ms": round(max(samples), 2),
                 }
             )
 
@@ -6,6 +6,7 @@ with request/response tracking, performance monitoring, and log management.
 """
 
 from .dns_logger import (
+    REQUEST_TRACKING_ENABLED,
     DNSRequestLogger,
     DNSRequestTracker,
     extract_dns_info,
@@ -17,9 +18,11 @@ from .dns_logger import (
 from .logger import (
     StructuredLogger,
     configure_logger_for_module,
+    forward_file_logs,
     get_logger,
     log_exception,
     setup_logging,
+    start_file_log_listener,
 )
 from .manager import (
     LogManager,
@@ -36,9 +39,12 @@ __all__ = [
     "get_logger",
     "log_exception",
     "configure_logger_for_module",
+    "forward_file_logs",
+    "start_file_log_listener",
     # DNS-specific logging
     "DNSRequestLogger",
     "DNSRequestTracker",
+    "REQUEST_TRACKING_ENABLED",
     "get_request_tracker",
     "extract_dns_info",
     "format_response_data",
@@ -6,11 +6,17 @@ specified in the requirements, including request ID tracking and performance tim
 """
 
 import asyncio
+import itertools
 import json
 import logging
 import logging.handlers
+import os
+import queue
+import re
+import secrets
+import socket
+import threading
 import time
-import uuid
 from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
@@ -18,7 +24,200 @@ from typing import Any, Callable, Dict, List, Optional
 
 from dns import message, rcode
 
-from .logger import get_logger
+from .logger import file_log_forwarder, get_logger
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        """Serialize a log entry to a compact JSON line."""
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+
+    def _dumps(obj: Any) -> str:
+        """Serialize a log entry to a compact JSON line."""
+        return json.dumps(obj, separators=(",", ":"))
+
+
+# Per-request tracking feeds the recent-requests view and the DNS logs; set
+# DNS_REQUEST_TRACKING=0 to skip it when neither is needed
+REQUEST_TRACKING_ENABLED = os.environ.get(
+    "DNS_REQUEST_TRACKING", "1"
+).strip().lower() not in ("0", "false", "no", "off")
+
+# Whole-second part of the last timestamp, as the ISO prefix and as the DNS
+# query log's datetime, reused within that second
+_iso_second = -1
+_iso_prefix = ""
+_log_datetime = ""
+
+# IPv4 address inside a record's text form, for A records without raw rdata
+_IPV4_RE = re.compile(r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b")
+
+
+def _format_second(second: int) -> None:
+    """Format the date and time of a new second for reuse within it."""
+    global _iso_second, _iso_prefix, _log_datetime
+
+    _iso_prefix = datetime.fromtimestamp(second, timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%S"
+    )
+    _log_datetime = _iso_prefix.replace("T", " ") + " UTC"
+    _iso_second = second
+
+
+def _utc_isoformat() -> str:
+    """Get the current UTC time as an ISO 8601 string ending in "Z".
+
+    Only the microseconds change between requests in the same second, so the
+    date and time part is formatted once per second.
+
+    Returns:
+        Timestamp such as "2024-01-01T12:00:00.123456Z"
+    """
+    now = time.time()
+    second = int(now)
+    if second != _iso_second:
+        _format_second(second)
+    return f"{_iso_prefix}.{int((now - second) * 1_000_000):06d}Z"
+
+
+def _utc_log_datetime() -> str:
+    """Get the current UTC time in the DNS query log's datetime format.
+
+    Returns:
+        Timestamp such as "2024-01-01 12:00:00 UTC"
+    """
+    second = int(time.time())
+    if second != _iso_second:
+        _format_second(second)
+    return _log_datetime
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that batches writes instead of flushing per line.
+
+    Lines collect in a large write buffer that a background thread flushes
+    every flush_interval seconds, so a burst of queries costs one write()
+    instead of one per query. The file size is tracked as lines are written,
+    so checking for rollover doesn't flush the buffer either.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        maxBytes: int = 0,
+        backupCount: int = 0,
+        encoding: Optional[str] = None,
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 0.1,
+    ):
+        """Initialize the handler and start its flush thread.
+
+        Args:
+            filename: Path to the log file
+            maxBytes: Size at which the file is rolled over (0 never rolls)
+            backupCount: Number of rolled-over files to keep
+            encoding: File encoding
+            buffer_size: Bytes buffered between writes to the file
+            flush_interval: Seconds between flushes of buffered lines
+        """
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._size = 0
+        self._dirty = False
+        super().__init__(
+            filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding
+        )
+
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="dns-log-flush", daemon=True
+        )
+        self._flusher.start()
+
+    def _open(self):
+        """Open the log file with a large write buffer."""
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=getattr(self, "errors", None),
+        )
+        self._size = stream.tell()
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Buffer a record, rolling the file over first if it would be full."""
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += len(msg)
+            self._dirty = True
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write out buffered lines."""
+        self._dirty = False
+        super().flush()
+
+    def _flush_periodically(self) -> None:
+        """Flush buffered lines until the handler is closed."""
+        while not self._stop_flushing.wait(self.flush_interval):
+            if self._dirty:
+                self.flush()
+
+    def close(self) -> None:
+        """Stop the flush thread, then flush and close the file."""
+        self._stop_flushing.set()
+        super().close()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that hands records to a listener thread unformatted.
+
+    DNS log entries are dicts nothing touches after logging, so the copy and
+    formatting QueueHandler.prepare does are left to the listener thread too.
+    """
+
+    def __init__(self, handler: logging.Handler):
+        """Start a listener thread writing queued records to handler.
+
+        Args:
+            handler: Handler the listener thread emits records to
+        """
+        log_queue = queue.SimpleQueue()
+        super().__init__(log_queue)
+        self.listener: Optional[logging.handlers.QueueListener] = (
+            logging.handlers.QueueListener(
+                log_queue, handler, respect_handler_level=True
+            )
+        )
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Queue the record as is."""
+        return record
+
+    def close(self) -> None:
+        """Write out queued records, then close the target handler."""
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        super().close()
 
 
 class DNSFileLogger:
@@ -41,12 +240,19 @@ class DNSFileLogger:
 
         # Create dedicated logger for DNS file output
         self.file_logger = logging.getLogger("dns_file_logger")
+        self.close()
         self.file_logger.handlers.clear()
         self.file_logger.setLevel(logging.INFO)
         self.file_logger.propagate = False  # Prevent duplicate console output
 
-        # File handler with rotation
-        file_handler = logging.handlers.RotatingFileHandler(
+        # Worker processes leave the file to the main process
+        forwarder = file_log_forwarder()
+        if forwarder is not None:
+            self.file_logger.addHandler(forwarder)
+            return
+
+        # File handler with rotation, writing lines out in batches
+        file_handler = BatchedRotatingFileHandler(
             filename=self.log_file_path,
             maxBytes=100 * 1024 * 1024,  # 100MB
             backupCount=5,
@@ -57,10 +263,20 @@ class DNSFileLogger:
         # Custom formatter that outputs exact JSON format
         class DNSJSONFormatter(logging.Formatter):
             def format(self, record):
+                if isinstance(record.msg, dict):
+                    return _dumps(record.msg)
                 return record.getMessage()
 
         file_handler.setFormatter(DNSJSONFormatter())
-        self.file_logger.addHandler(file_handler)
+
+        # Serializing and writing happen on the queue listener's thread, off
+        # the request path
+        self.file_logger.addHandler(DeferredQueueHandler(file_handler))
+
+    def close(self) -> None:
+        """Write out pending DNS log lines and close the log file."""
+        for handler in self.file_logger.handlers:
+            handler.close()
 
     def log_dns_query(self, domain: str, ip_addresses: List[str] = None) -> None:
         """Log successful DNS query in the specified JSON format.
@@ -70,8 +286,7 @@ class DNSFileLogger:
             ip_addresses: List of IP addresses returned
         """
         # Format datetime as "YYYY-MM-DD HH:MM:SS UTC"
-        current_time = datetime.now(timezone.utc)
-        formatted_datetime = current_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+        formatted_datetime = _utc_log_datetime()
 
         # Create log entry in exact format specified
         log_entry = {
@@ -79,12 +294,11 @@ class DNSFileLogger:
             "domain": domain.rstrip("."),  # Remove trailing dot if present
             "ip_address": ip_addresses or [],
             "status": "success",
-            "message": None
+            "message": None,
         }
 
-        # Write as single JSON line
-        json_line = json.dumps(log_entry, separators=(",", ":"))
-        self.file_logger.info(json_line)
+        # Written as a single JSON line by the file handler
+        self.file_logger.info(log_entry)
 
     def log_dns_error(self, domain: str, error_message: str) -> None:
         """Log unsuccessful DNS query in the specified JSON format.
@@ -94,8 +308,7 @@ class DNSFileLogger:
             error_message: Error message describing the failure
         """
         # Format datetime as "YYYY-MM-DD HH:MM:SS UTC"
-        current_time = datetime.now(timezone.utc)
-        formatted_datetime = current_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+        formatted_datetime = _utc_log_datetime()
 
         # Create log entry for unsuccessful resolution
         log_entry = {
@@ -103,12 +316,11 @@ class DNSFileLogger:
             "domain": domain.rstrip("."),  # Remove trailing dot if present
             "ip_address": [],
             "status": "failed",
-            "message": error_message
+            "message": error_message,
         }
 
-        # Write as single JSON line
-        json_line = json.dumps(log_entry, separators=(",", ":"))
-        self.file_logger.info(json_line)
+        # Written as a single JSON line by the file handler
+        self.file_logger.info(log_entry)
 
 
 class DNSRequestLogger:
@@ -122,29 +334,27 @@ class DNSRequestLogger:
 
     def _is_valid_ip_address(self, ip_str: str) -> bool:
         """Check if a string is a valid IP address (IPv4 or IPv6).
-        
+
         Args:
             ip_str: String to validate as IP address
-            
+
         Returns:
             True if valid IP address, False otherwise
         """
-        import socket
-        
         # Try IPv4
         try:
             socket.inet_pton(socket.AF_INET, ip_str)
             return True
         except socket.error:
             pass
-        
+
         # Try IPv6
         try:
             socket.inet_pton(socket.AF_INET6, ip_str)
             return True
         except socket.error:
             pass
-            
+
         return False
 
     def log_dns_request(
@@ -174,33 +384,40 @@ class DNSRequestLogger:
             response_data: List of response data (IP addresses, etc.)
             error: Error message (if any)
         """
-        # Create log entry in exact format specified
-        log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "request_id": request_id,
-            "client_ip": client_ip,
-            "query_type": query_type,
-            "domain": domain,
-            "response_code": response_code,
-            "response_time_ms": round(response_time_ms, 2),
-            "cache_hit": cache_hit,
-            "upstream_server": upstream_server,
-            "response_data": response_data or [],
-        }
+        # Building and rendering the structured entry runs on every query, so
+        # skip it entirely unless INFO is enabled
+        if self.logger.isEnabledFor(logging.INFO):
+            # Create log entry in exact format specified
+            log_entry = {
+                "timestamp": _utc_isoformat(),
+                "request_id": request_id,
+                "client_ip": client_ip,
+                "query_type": query_type,
+                "domain": domain,
+                "response_code": response_code,
+                "response_time_ms": round(response_time_ms, 2),
+                "cache_hit": cache_hit,
+                "upstream_server": upstream_server,
+                "response_data": response_data or [],
+            }
 
-        # Add error field if present
-        if error:
-            log_entry["error"] = error
+            # Add error field if present
+            if error:
+                log_entry["error"] = error
 
-        # Log the entry to console/structured logs
-        self.logger.info("DNS request processed", **log_entry)
+            # Log the entry to console/structured logs
+            self.logger.info("DNS request processed", **log_entry)
 
         # Log to specialized DNS file based on query result
         if error or response_code != "NOERROR":
             # Log unsuccessful queries with error message
-            error_msg = error or f"DNS resolution failed with response code: {response_code}"
+            error_msg = (
+                error or f"DNS resolution failed with response code: {response_code}"
+            )
             self.file_logger.log_dns_error(domain, error_msg)
-        elif response_code == "NOERROR" and response_data and query_type in ["A", "AAAA"]:
+        elif (
+            response_code == "NOERROR" and response_data and query_type in ["A", "AAAA"]
+        ):
             # Log successful A and AAAA queries with IP addresses
             # Extract IP addresses from response data
             ip_addresses = []
@@ -208,19 +425,19 @@ class DNSRequestLogger:
                 # Skip entries that start with "rdata=" as they contain DNS binary data
                 if data.startswith("rdata="):
                     continue
-                    
+
                 # For A/AAAA records, the response data should be IP addresses
                 # Handle both "domain IP" and just "IP" formats
                 parts = data.split()
                 candidate_ip = None
-                
+
                 if len(parts) >= 2:
                     # Format: "example.com. 1.2.3.4"
                     candidate_ip = parts[-1]
                 elif len(parts) == 1:
                     # Format: "1.2.3.4"
                     candidate_ip = parts[0]
-                
+
                 # Validate that the candidate is actually an IP address
                 if candidate_ip and self._is_valid_ip_address(candidate_ip):
                     ip_addresses.append(candidate_ip)
@@ -252,7 +469,7 @@ class DNSRequestLogger:
         """
         # Log to file logger
         self.file_logger.log_dns_error(domain, error)
-        
+
         # Log to structured logging system
         self.log_dns_request(
             request_id=request_id,
@@ -271,15 +488,22 @@ class DNSRequestLogger:
 class DNSRequestTracker:
     """Tracks DNS requests for performance timing and logging."""
 
-    def __init__(self, max_recent_requests: int = 1000):
+    def __init__(self, max_recent_requests: int = 1000, enabled: Optional[bool] = None):
         """Initialize request tracker.
 
         Args:
             max_recent_requests: Maximum number of recent requests to store in memory
+            enabled: Whether requests are tracked; defaults to REQUEST_TRACKING_ENABLED
         """
+        # Callers check this before assembling end_request arguments
+        self.enabled = REQUEST_TRACKING_ENABLED if enabled is None else enabled
         self.active_requests: Dict[str, float] = {}
         self.dns_logger = DNSRequestLogger()
 
+        # Generated request IDs: a random per-process prefix plus a counter
+        self._id_prefix = secrets.token_hex(4)
+        self._id_counter = itertools.count()
+
         # Store recent requests for real-time display
         self.recent_requests = deque(maxlen=max_recent_requests)
         self.max_recent_requests = max_recent_requests
@@ -337,9 +561,10 @@ class DNSRequestTracker:
             Request ID for tracking
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = f"{self._id_prefix}{next(self._id_counter):012x}"
 
-        self.active_requests[request_id] = time.time()
+        if self.enabled:
+            self.active_requests[request_id] = time.perf_counter()
         return request_id
 
     def end_request(
@@ -370,12 +595,13 @@ class DNSRequestTracker:
         Returns:
             Response time in milliseconds
         """
-        start_time = self.active_requests.pop(request_id, time.time())
-        response_time_ms = (time.time() - start_time) * 1000
+        now = time.perf_counter()
+        start_time = self.active_requests.pop(request_id, now)
+        response_time_ms = (now - start_time) * 1000
 
         # Create request record for storage
         request_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "timestamp": _utc_isoformat(),
             "request_id": request_id,
             "client_ip": client_ip,
             "query_type": query_type,
@@ -435,22 +661,17 @@ class DNSRequestTracker:
         Returns:
             List of recent DNS request records
         """
-        # Convert deque to list for slicing
-        requests_list = list(self.recent_requests)
-
-        # Apply filters if provided
-        if filters:
-            filtered_requests = []
-            for request in requests_list:
-                if self._matches_filters(request, filters):
-                    filtered_requests.append(request)
-            requests_list = filtered_requests
-
-        # Apply offset and limit
-        start_idx = offset
-        end_idx = start_idx + limit
-
-        return requests_list[start_idx:end_idx]
+        # Page through the deque in place rather than copying all of it
+        if not filters:
+            return list(itertools.islice(self.recent_requests, offset, offset + limit))
+
+        # Filter lazily, stopping once the requested page is complete
+        matching = (
+            request
+            for request in self.recent_requests
+            if self._matches_filters(request, filters)
+        )
+        return list(itertools.islice(matching, offset, offset + limit))
 
     def _matches_filters(
         self, request: Dict[str, Any], filters: Dict[str, Any]
@@ -501,55 +722,57 @@ class DNSRequestTracker:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about DNS requests.
-        
+
         Returns:
             Dictionary containing request statistics
         """
         total_requests = len(self.recent_requests)
-        
+
         if total_requests == 0:
             return {
                 "total_requests": 0,
                 "query_types": {},
                 "response_codes": {},
                 "avg_response_time_ms": 0,
-                "cache_hit_ratio": 0
+                "cache_hit_ratio": 0,
             }
-        
+
         # Count query types
         query_types = {}
         response_codes = {}
         response_times = []
         cache_hits = 0
-        
+
         for request in self.recent_requests:
             # Count query types
             qtype = request.get("query_type", "UNKNOWN")
             query_types[qtype] = query_types.get(qtype, 0) + 1
-            
+
             # Count response codes
             rcode = request.get("response_code", "UNKNOWN")
             response_codes[rcode] = response_codes.get(rcode, 0) + 1
-            
+
             # Collect response times
             rt = request.get("response_time_ms", 0)
             if rt > 0:
                 response_times.append(rt)
-            
+
             # Count cache hits
             if request.get("cache_hit", False):
                 cache_hits += 1
-        
+
         # Calculate averages
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        avg_response_time = (
+            sum(response_times) / len(response_times) if response_times else 0
+        )
         cache_hit_ratio = cache_hits / total_requests if total_requests > 0 else 0
-        
+
         return {
             "total_requests": total_requests,
             "query_types": query_types,
             "response_codes": response_codes,
             "avg_response_time_ms": round(avg_response_time, 2),
-            "cache_hit_ratio": round(cache_hit_ratio, 3)
+            "cache_hit_ratio": round(cache_hit_ratio, 3),
         }
 
     def clear_recent_requests(self) -> None:
@@ -599,6 +822,21 @@ def extract_dns_info(dns_message: message.Message) -> Dict[str, Any]:
     return info
 
 
+def _record_text(rr: Any) -> str:
+    """Get the text form of a record, using its memoized rdata if it has one.
+
+    Args:
+        rr: DNS resource record
+
+    Returns:
+        Human-readable record data
+    """
+    get_readable_rdata = getattr(rr, "get_readable_rdata", None)
+    if get_readable_rdata is not None:
+        return get_readable_rdata()
+    return str(rr).strip()
+
+
 def format_response_data(answer_section: Any, query_type: str) -> List[str]:
     """Format DNS response data based on query type.
 
@@ -625,7 +863,12 @@ def format_response_data(answer_section: Any, query_type: str) -> List[str]:
 
             for rr in records:
                 try:
-                    if query_type == "A":
+                    # Core DNSResourceRecords render their rdata by their own
+                    # type once and keep it, so nothing is reformatted here
+                    get_readable_rdata = getattr(rr, "get_readable_rdata", None)
+                    if get_readable_rdata is not None:
+                        response_data.append(get_readable_rdata())
+                    elif query_type == "A":
                         # For A records, convert 4-byte binary to IPv4 address
                         if hasattr(rr, "rdata") and len(rr.rdata) == 4:
                             # Convert 4 bytes to IP address
@@ -636,12 +879,9 @@ def format_response_data(answer_section: Any, query_type: str) -> List[str]:
                             response_data.append(str(rr.address))
                         else:
                             # Try to parse the string representation
-                            rr_str = str(rr).strip()
+                            rr_str = _record_text(rr)
                             # Look for IP pattern in the string
-                            import re
-
-                            ip_pattern = r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b"
-                            ip_match = re.search(ip_pattern, rr_str)
+                            ip_match = _IPV4_RE.search(rr_str)
                             if ip_match:
                                 response_data.append(ip_match.group())
                             else:
@@ -650,43 +890,41 @@ def format_response_data(answer_section: Any, query_type: str) -> List[str]:
                         # For AAAA records, convert 16-byte binary to IPv6 address
                         if hasattr(rr, "rdata") and len(rr.rdata) == 16:
                             # Convert 16 bytes to IPv6 address
-                            import socket
-
                             ip_address = socket.inet_ntop(socket.AF_INET6, rr.rdata)
                             response_data.append(ip_address)
                         elif hasattr(rr, "address"):
                             response_data.append(str(rr.address))
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     elif query_type == "CNAME":
                         if hasattr(rr, "target"):
                             response_data.append(str(rr.target).rstrip("."))
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     elif query_type == "MX":
                         if hasattr(rr, "preference") and hasattr(rr, "exchange"):
                             response_data.append(
                                 f"{rr.preference} {str(rr.exchange).rstrip('.')}"
                             )
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     elif query_type == "TXT":
                         if hasattr(rr, "strings"):
                             response_data.append(
                                 " ".join(b.decode("utf-8") for b in rr.strings)
                             )
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     elif query_type == "NS":
                         if hasattr(rr, "target"):
                             response_data.append(str(rr.target).rstrip("."))
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     elif query_type == "PTR":
                         if hasattr(rr, "target"):
                             response_data.append(str(rr.target).rstrip("."))
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     elif query_type == "SOA":
                         if hasattr(rr, "mname") and hasattr(rr, "rname"):
                             response_data.append(
@@ -694,9 +932,9 @@ def format_response_data(answer_section: Any, query_type: str) -> List[str]:
                                 f"{rr.serial} {rr.refresh} {rr.retry} {rr.expire} {rr.minimum}"
                             )
                         else:
-                            response_data.append(str(rr).strip())
+                            response_data.append(_record_text(rr))
                     else:
-                        response_data.append(str(rr).strip())
+                        response_data.append(_record_text(rr))
                 except Exception as record_error:
                     # Log individual record error but continue processing
                     logger = get_logger("dns_formatter")
@@ -744,12 +982,15 @@ def log_performance_event(event_type: str, duration_ms: float, **kwargs) -> None
         duration_ms: Duration in milliseconds
         **kwargs: Additional event data
     """
+    if not logging.getLogger("dns_performance").isEnabledFor(logging.INFO):
+        return
+
     logger = get_logger("dns_performance")
     logger.info(
         "Performance event",
         event_type=event_type,
         duration_ms=round(duration_ms, 2),
-        timestamp=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        timestamp=_utc_isoformat(),
         **kwargs,
     )
 
@@ -765,12 +1006,15 @@ def log_security_event(
         domain: Domain involved (if any)
         **kwargs: Additional event data
     """
+    if not logging.getLogger("dns_security").isEnabledFor(logging.WARNING):
+        return
+
     logger = get_logger("dns_security")
     logger.warning(
         "Security event",
         event_type=event_type,
         client_ip=client_ip,
         domain=domain,
-        timestamp=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        timestamp=_utc_isoformat(),
         **kwargs,
     )
@@ -16,6 +16,10 @@ import structlog
 
 from ..config.schema import LoggingConfig
 
+# Queue that DNS worker processes send their log file records to, so the
+# files are only written (and rotated) by the main process
+_file_log_queue = None
+
 
 class DualOutputLogger:
     """Logger that handles both console and file output with different formats."""
@@ -195,6 +199,12 @@ class StructuredLogger:
 
         # Prevent propagation to avoid duplicate console output
         json_logger.propagate = False
+        self._json_logger = json_logger
+
+        forwarder = file_log_forwarder()
+        if forwarder is not None:
+            json_logger.addHandler(forwarder)
+            return
 
         # File handler with JSON formatting
         file_handler = logging.handlers.RotatingFileHandler(
@@ -231,9 +241,6 @@ class StructuredLogger:
         file_handler.setFormatter(JSONFileFormatter())
         json_logger.addHandler(file_handler)
 
-        # Store reference for use in logging calls
-        self._json_logger = json_logger
-
     def get_logger(self, name: str = "dns_server") -> structlog.BoundLogger:
         """Get a structured logger instance.
 
@@ -249,6 +256,69 @@ class StructuredLogger:
         return structlog.get_logger(name)
 
 
+class FileLogForwarder(logging.handlers.QueueHandler):
+    """Queue handler sending a worker's log file records to the main process.
+
+    Records keep dict messages as they are for the main process's formatters;
+    only what cannot be pickled is rendered here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Make the record picklable."""
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class _LoggerDispatcher(logging.Handler):
+    """Hands records from worker processes to the same-named local logger."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logging.getLogger(record.name).handle(record)
+        return True
+
+
+def forward_file_logs(log_queue) -> None:
+    """Queue this process's log file records instead of writing them.
+
+    Called by DNS worker processes before setup_logging().
+
+    Args:
+        log_queue: Queue read by the main process's start_file_log_listener()
+    """
+    global _file_log_queue
+    _file_log_queue = log_queue
+
+
+def file_log_forwarder() -> Optional[logging.Handler]:
+    """Get the handler to use in place of a log file handler, if any.
+
+    Returns:
+        A FileLogForwarder in worker processes, None in the main process
+    """
+    if _file_log_queue is None:
+        return None
+    return FileLogForwarder(_file_log_queue)
+
+
+def start_file_log_listener(log_queue) -> logging.handlers.QueueListener:
+    """Write log file records queued by worker processes in this process.
+
+    Args:
+        log_queue: Queue the workers pass to forward_file_logs()
+
+    Returns:
+        The running listener; stop() it after the workers have exited
+    """
+    listener = logging.handlers.QueueListener(log_queue, _LoggerDispatcher())
+    listener.start()
+    return listener
+
+
 # Global logger instance
 _logger_instance: Optional[StructuredLogger] = None
 
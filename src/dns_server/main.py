@@ -5,6 +5,7 @@ This script provides the main entry point for running the DNS server.
 """
 
 import asyncio
+import multiprocessing
 import platform
 import signal
 import sys
@@ -25,15 +26,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from dns_server.config.loader import ConfigLoader
 from dns_server.core import DNSServer
-from dns_server.core.performance import (
-    concurrency_limiter,
-    connection_pool,
-    performance_monitor,
-)
+from dns_server.core.performance import concurrency_limiter, performance_monitor
 from dns_server.dns_logging import (
+    forward_file_logs,
     get_logger,
     log_exception,
     setup_logging,
+    start_file_log_listener,
     start_log_management,
     stop_log_management,
 )
@@ -43,11 +42,15 @@ from dns_server.web import WebServer
 class DNSServerApp:
     """DNS Server Application"""
 
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, worker: bool = False, log_queue=None):
         self.config_path = config_path or "config/default.yaml"
+        self.worker = worker  # Additional worker process: DNS listeners only
         self.config = None
         self.dns_server = None
         self.web_server = None
+        self._worker_processes = []
+        self._log_queue = log_queue  # Carries worker log file records
+        self._log_listener = None
         self._shutdown_event = asyncio.Event()
         self.logger = None
 
@@ -66,7 +69,7 @@ class DNSServerApp:
             # Initialize performance monitoring
             await performance_monitor.start_monitoring()
 
-            # Configure connection pool and concurrency limiter based on config
+            # Configure the concurrency limiter based on config
             self._configure_performance_settings()
 
             # Create DNS server
@@ -77,7 +80,7 @@ class DNSServerApp:
 
             # Create web server if enabled
             web_config = getattr(self.config, "web", None)
-            if web_config and getattr(web_config, "enabled", True):
+            if web_config and getattr(web_config, "enabled", True) and not self.worker:
                 # Create web config that includes server settings
                 web_server_config = type(
                     "WebServerConfig",
@@ -112,42 +115,45 @@ class DNSServerApp:
 
     def _configure_performance_settings(self):
         """Configure performance settings based on config"""
-        # Configure connection pool
         server_config = getattr(self.config, "server", None)
         if server_config:
-            max_connections = getattr(server_config, "max_upstream_connections", 100)
-            connection_timeout = getattr(server_config, "connection_timeout", 30.0)
-
-            # Update global connection pool settings
-            connection_pool.max_connections = max_connections
-            connection_pool.connection_timeout = connection_timeout
-
             # Configure concurrency limiter
             max_concurrent = getattr(server_config, "max_concurrent_requests", 1000)
             queue_size = getattr(server_config, "request_queue_size", 5000)
 
-            concurrency_limiter.max_concurrent = max_concurrent
-            concurrency_limiter.queue_size = queue_size
-            concurrency_limiter._semaphore = asyncio.Semaphore(max_concurrent)
-            concurrency_limiter._queue = asyncio.Queue(maxsize=queue_size)
+            concurrency_limiter.configure(max_concurrent, queue_size)
+
+            # Optionally adapt the concurrency limit to a target latency
+            target_latency_ms = None
+            if getattr(server_config, "adaptive_concurrency", False):
+                target_latency_ms = getattr(server_config, "target_latency_ms", 200.0)
+            concurrency_limiter.configure_adaptive(
+                target_latency_ms,
+                getattr(server_config, "min_concurrent_requests", 10),
+            )
 
             self.logger.info(
                 "Performance settings configured",
-                max_connections=max_connections,
                 max_concurrent=max_concurrent,
                 queue_size=queue_size,
-                connection_timeout=connection_timeout,
+                target_latency_ms=target_latency_ms,
             )
 
     async def _setup_logging(self):
         """Setup structured logging configuration"""
         log_config = getattr(self.config, "logging", None)
         if log_config:
+            # Log files are written and rotated by the main process alone;
+            # workers queue their file records to it
+            if self.worker:
+                forward_file_logs(self._log_queue)
+
             # Setup structured logging
             setup_logging(log_config)
 
             # Start log management
-            await start_log_management(log_config)
+            if not self.worker:
+                await start_log_management(log_config)
 
             # Get logger for this module
             self.logger = get_logger("dns_server_app")
@@ -180,6 +186,9 @@ class DNSServerApp:
             if self.web_server:
                 await self.web_server.start()
 
+            if not self.worker:
+                self._spawn_workers()
+
             self.logger.info(
                 "DNS server started successfully",
                 bind_address=self.config.server.bind_address,
@@ -193,36 +202,51 @@ class DNSServerApp:
             for sig in [signal.SIGTERM, signal.SIGINT]:
                 loop.add_signal_handler(sig, self._signal_handler)
 
-            # Start background cleanup tasks
-            cleanup_task = asyncio.create_task(self._cleanup_loop())
-
             # Wait for shutdown signal
             await self._shutdown_event.wait()
 
-            # Cancel cleanup task
-            cleanup_task.cancel()
-            try:
-                await cleanup_task
-            except asyncio.CancelledError:
-                pass
-
         except Exception as e:
             log_exception(self.logger, "Error starting DNS server", e)
             raise
         finally:
             await self.stop()
 
-    async def _cleanup_loop(self):
-        """Background cleanup task for connection pool and monitoring"""
-        while True:
-            try:
-                await asyncio.sleep(60)  # Run cleanup every minute
-                await connection_pool.cleanup_old_connections()
-                self.logger.debug("Performed connection pool cleanup")
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                log_exception(self.logger, "Error in cleanup loop", e)
+    def _spawn_workers(self):
+        """Start the additional DNS worker processes sharing the port"""
+        workers = getattr(self.config.server, "workers", 1)
+        if workers <= 1:
+            return
+
+        ctx = multiprocessing.get_context("spawn")
+        self._log_queue = ctx.Queue()
+        self._log_listener = start_file_log_listener(self._log_queue)
+        for _ in range(workers - 1):
+            process = ctx.Process(
+                target=_run_worker,
+                args=(self.config_path, self._log_queue),
+                daemon=True,
+            )
+            process.start()
+            self._worker_processes.append(process)
+
+        if self._worker_processes:
+            self.logger.info(
+                "DNS worker processes started",
+                workers=workers,
+                pids=[p.pid for p in self._worker_processes],
+            )
+
+    def _stop_workers(self):
+        """Terminate the additional DNS worker processes"""
+        for process in self._worker_processes:
+            process.terminate()
+        for process in self._worker_processes:
+            process.join(timeout=5)
+        self._worker_processes.clear()
+
+        if self._log_listener:
+            self._log_listener.stop()
+            self._log_listener = None
 
     async def stop(self):
         """Stop the DNS server"""
@@ -237,14 +261,16 @@ class DNSServerApp:
             await self.dns_server.stop()
             self.logger.info("DNS server stopped")
 
+        if self._worker_processes:
+            await asyncio.get_running_loop().run_in_executor(None, self._stop_workers)
+            self.logger.info("DNS worker processes stopped")
+
         # Stop performance monitoring
         await performance_monitor.stop_monitoring()
 
-        # Clean up connection pool
-        await connection_pool.cleanup_old_connections()
-
         # Stop log management
-        await stop_log_management()
+        if not self.worker:
+            await stop_log_management()
 
         self.logger.info("DNS server application shutdown complete")
 
@@ -276,6 +302,15 @@ class DNSServerApp:
         return health
 
 
+def _run_worker(config_path: str, log_queue):
+    """Entry point of an additional DNS worker process"""
+    app = DNSServerApp(config_path, worker=True, log_queue=log_queue)
+    try:
+        asyncio.run(app.start())
+    except KeyboardInterrupt:
+        pass
+
+
 async def main():
     """Main function"""
     import argparse
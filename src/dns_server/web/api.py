@@ -8,6 +8,7 @@ Provides REST API endpoints for:
 - Health monitoring
 """
 
+import itertools
 import json
 import traceback
 from datetime import datetime
@@ -167,27 +168,33 @@ class APIHandler:
                     {"error": "Request tracker not available"}, status=503
                 )
 
-            # Get recent requests directly from the tracker
-            logs = list(request_tracker.recent_requests)
+            if not (domain_filter or query_type or client_ip or since):
+                # Without filters, page through the tracker's deque in place
+                recent = request_tracker.recent_requests
+                total_count = len(recent)
+                logs = list(itertools.islice(recent, offset, offset + limit))
+            else:
+                # Get recent requests directly from the tracker
+                logs = list(request_tracker.recent_requests)
             
-            # Apply filters if provided
-            if domain_filter:
-                logs = [log for log in logs if domain_filter.lower() in log.get("domain", "").lower()]
-            if query_type:
-                logs = [log for log in logs if log.get("query_type") == query_type.upper()]
-            if client_ip:
-                logs = [log for log in logs if log.get("client_ip") == client_ip]
-            if since:
-                try:
-                    since_time = datetime.fromisoformat(since.replace("Z", "+00:00"))
-                    logs = [log for log in logs 
-                           if datetime.fromisoformat(log.get("timestamp", "").replace("Z", "+00:00")) >= since_time]
-                except ValueError:
-                    pass  # Skip invalid timestamp filter
-
-            # Apply offset and limit
-            total_count = len(logs)
-            logs = logs[offset:offset + limit]
+                # Apply filters if provided
+                if domain_filter:
+                    logs = [log for log in logs if domain_filter.lower() in log.get("domain", "").lower()]
+                if query_type:
+                    logs = [log for log in logs if log.get("query_type") == query_type.upper()]
+                if client_ip:
+                    logs = [log for log in logs if log.get("client_ip") == client_ip]
+                if since:
+                    try:
+                        since_time = datetime.fromisoformat(since.replace("Z", "+00:00"))
+                        logs = [log for log in logs 
+                               if datetime.fromisoformat(log.get("timestamp", "").replace("Z", "+00:00")) >= since_time]
+                    except ValueError:
+                        pass  # Skip invalid timestamp filter
+
+                # Apply offset and limit
+                total_count = len(logs)
+                logs = logs[offset:offset + limit]
 
             return web.json_response(
                 {
@@ -0,0 +1,172 @@
+"""
+Core DNS Message Tests
+
+Tests for DNS wire format parsing and serialization.
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dns_server.core.message import (
+    DNSClass,
+    DNSHeader,
+    DNSMessage,
+    DNSQuestion,
+    DNSRecordType,
+    DNSResponseCode,
+    create_a_record,
+)
+
+
+def _build_query(name: str = "example.com.", qtype: int = DNSRecordType.A) -> bytes:
+    """Build a raw DNS query packet"""
+    header = DNSHeader(transaction_id=0x1234, flags=0, rd=True, question_count=1)
+    question = DNSQuestion(name, qtype, DNSClass.IN)
+    return DNSMessage(
+        header=header, questions=[question], answers=[], authority=[], additional=[]
+    ).to_bytes()
+
+
+class TestDNSHeader:
+    """Test DNS header parsing"""
+
+    def test_from_bytes_matches_constructor(self):
+        """Test parsed header fields match an equivalent constructed header"""
+        expected = DNSHeader(
+            transaction_id=0xBEEF,
+            flags=0,
+            qr=True,
+            opcode=2,
+            aa=True,
+            tc=True,
+            rd=False,
+            ra=True,
+            rcode=DNSResponseCode.NXDOMAIN,
+            question_count=1,
+            answer_count=2,
+            authority_count=3,
+            additional_count=4,
+        )
+
+        parsed = DNSHeader.from_bytes(expected.to_bytes())
+
+        assert parsed == expected
+        assert parsed.to_bytes() == expected.to_bytes()
+
+    def test_from_bytes_too_short(self):
+        """Test short header is rejected"""
+        with pytest.raises(ValueError):
+            DNSHeader.from_bytes(b"\x00" * 11)
+
+
+class TestDNSMessageRoundTrip:
+    """Test full message serialization round trips"""
+
+    def test_query_round_trip(self):
+        """Test a query survives to_bytes/from_bytes"""
+        data = _build_query("www.example.com.", DNSRecordType.AAAA)
+        message = DNSMessage.from_bytes(data)
+
+        assert message.header.transaction_id == 0x1234
+        assert message.is_query()
+        assert message.questions[0].name == "www.example.com."
+        assert message.questions[0].qtype == DNSRecordType.AAAA
+        assert message.to_bytes() == data
+
+    def test_response_with_answers(self):
+        """Test a response with answers round trips"""
+        query = DNSMessage.from_bytes(_build_query())
+        response = query.create_response()
+        response.answers = [
+            create_a_record("example.com.", "192.0.2.1"),
+            create_a_record("example.com.", "192.0.2.2"),
+        ]
+
+        parsed = DNSMessage.from_bytes(response.to_bytes())
+
+        assert parsed.is_response()
+        assert parsed.header.answer_count == 2
+        assert [a.get_readable_rdata() for a in parsed.answers] == [
+            "192.0.2.1",
+            "192.0.2.2",
+        ]
+
+    def test_compressed_name(self):
+        """Test names using compression pointers are decoded"""
+        data = _build_query("example.com.")
+        # Answer name is a pointer to the question name at offset 12
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 60, 4) + b"\xc0\x00\x02\x01"
+        data = data[:6] + struct.pack("!H", 1) + data[8:] + answer
+
+        message = DNSMessage.from_bytes(data)
+
+        assert message.answers[0].name == "example.com."
+        assert message.answers[0].get_readable_rdata() == "192.0.2.1"
+
+    def test_compression_loop_is_rejected(self):
+        """Test pointers that do not move backwards are rejected"""
+        # A label followed by a pointer back to that label
+        data = b"\x00" * 12 + b"\x01a\xc0\x0c"
+
+        with pytest.raises(ValueError):
+            DNSQuestion._decode_name(data, 12)
+
+    def test_peek_header(self):
+        """Test the header peek agrees with a full parse"""
+        query = DNSMessage.from_bytes(_build_query())
+        response = query.create_response(DNSResponseCode.NXDOMAIN)
+        data = response.to_bytes()
+
+        tid, flags, rcode = DNSMessage.peek_header(data)
+
+        assert tid == 0x1234
+        assert flags == DNSHeader.from_bytes(data).flags
+        assert rcode == DNSResponseCode.NXDOMAIN
+        with pytest.raises(ValueError):
+            DNSMessage.peek_header(data[:11])
+
+    def test_name_encoding(self):
+        """Test names encode to labels and over-long labels are rejected"""
+        assert DNSQuestion("www.example.com.", 1, 1).to_bytes()[:17] == (
+            b"\x03www\x07example\x03com\x00"
+        )
+        assert DNSQuestion(".", 1, 1).to_bytes() == b"\x00\x00\x01\x00\x01"
+        with pytest.raises(ValueError):
+            DNSQuestion("x" * 64 + ".com.", 1, 1).to_bytes()
+
+    def test_readable_rdata_is_memoized(self):
+        """Test the readable form is computed once and kept on the record"""
+        record = create_a_record("example.com.", "192.0.2.1")
+
+        assert record.get_readable_rdata() == "192.0.2.1"
+        record.rdata = b"\x00\x00\x00\x00"
+        assert record.get_readable_rdata() == "192.0.2.1"
+        assert record == create_a_record("example.com.", "0.0.0.0")
+
+    def test_parse_header_and_first_question(self):
+        """Test the header and first question are read without a full parse"""
+        data = _build_query("Example.COM.", DNSRecordType.AAAA)
+
+        assert DNSMessage.parse_header_and_first_question(data) == (
+            0x1234,
+            0x0100,
+            b"\x07Example\x03COM\x00",
+            DNSRecordType.AAAA,
+            DNSClass.IN,
+        )
+        with pytest.raises(ValueError):
+            DNSMessage.parse_header_and_first_question(data[:20])
+
+    def test_questions_are_hashable(self):
+        """Test parsed questions compare and hash by value"""
+        first = DNSMessage.from_bytes(_build_query()).questions[0]
+        second = DNSMessage.from_bytes(_build_query()).questions[0]
+
+        assert first == second
+        assert len({first, second}) == 1
+        assert not hasattr(first, "__dict__")
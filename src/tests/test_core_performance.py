@@ -0,0 +1,343 @@
+"""
+Performance Module Tests
+
+Tests for metrics aggregation and concurrency limiting.
+"""
+
+import asyncio
+import gc
+import random
+import sys
+import time
+import weakref
+from pathlib import Path
+
+import psutil
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dns_server.core.performance import (
+    ConcurrencyLimiter,
+    LatencyHistogram,
+    Operation,
+    PerformanceMonitor,
+    RingBuffer,
+    RunningStat,
+    WindowedCounter,
+    timing_decorator,
+)
+
+
+class TestRingBuffer:
+    """Test fixed-capacity sample rings"""
+
+    def test_wraps_and_evicts_oldest(self):
+        """Test the ring evicts the oldest sample once full"""
+        ring = RingBuffer(3)
+
+        assert [ring.append(v) for v in (1.0, 2.0, 3.0)] == [None, None, None]
+        assert ring.append(4.0) == 1.0
+        assert list(ring) == [2.0, 3.0, 4.0]
+        assert ring.last == 4.0
+        assert len(ring) == 3
+
+
+class TestWindowedCounter:
+    """Test bucketed event counting"""
+
+    def test_old_buckets_expire(self):
+        """Test events age out bucket by bucket"""
+        counter = WindowedCounter(buckets=4, width=1.0)
+        counter.add(10.0)
+        counter.add(11.5)
+        counter.add(11.9)
+
+        assert counter.total(12.0) == 3
+        assert counter.total(14.0) == 2
+        assert counter.total(15.0) == 0
+        counter.add(100.0)
+        assert counter.total(100.0) == 1
+
+
+class TestRunningStat:
+    """Test sliding-window aggregates"""
+
+    def test_matches_full_scan(self):
+        """Test running aggregates match a rescan of the window"""
+        stat = RunningStat(50)
+        samples = []
+        rng = random.Random(42)
+
+        for _ in range(500):
+            value = rng.random()
+            stat.add(value)
+            samples.append(value)
+            window = samples[-50:]
+
+            assert len(stat) == len(window)
+            assert stat.min == min(window)
+            assert stat.max == max(window)
+            assert stat.mean == pytest.approx(sum(window) / len(window))
+            assert stat.last == window[-1]
+
+
+class TestLatencyHistogram:
+    """Test histogram percentile estimates"""
+
+    def test_percentiles_within_precision(self):
+        """Test percentiles are within the histogram's relative error"""
+        histogram = LatencyHistogram()
+        for value in range(1, 10001):
+            histogram.record(value * 10)
+
+        assert histogram.count == 10000
+        assert histogram.min == 10
+        assert histogram.max == 100000
+        for percentile in (50, 95, 99):
+            exact = percentile * 1000
+            assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.035)
+
+        assert histogram.percentiles(50, 95, 99) == [
+            histogram.percentile(50),
+            histogram.percentile(95),
+            histogram.percentile(99),
+        ]
+        assert histogram.percentiles(0, 100) == [10, 100000]
+
+    def test_values_are_clamped(self):
+        """Test out-of-range values are clamped instead of raising"""
+        histogram = LatencyHistogram()
+        histogram.record(-5)
+        histogram.record(LatencyHistogram.MAX_VALUE_US * 10)
+
+        assert histogram.min == 0
+        assert histogram.max == LatencyHistogram.MAX_VALUE_US
+        assert histogram.percentile(100) == LatencyHistogram.MAX_VALUE_US
+
+
+class TestPerformanceMonitor:
+    """Test performance monitor statistics"""
+
+    def test_operation_stats(self):
+        """Test operation timings are reported in milliseconds"""
+        monitor = PerformanceMonitor()
+        for duration in (0.001, 0.002, 0.003):
+            monitor.record_operation_time("lookup", duration)
+
+        stats = monitor.get_stats()["operations"]["lookup"]
+
+        assert stats["count"] == 3
+        assert stats["avg_time_ms"] == 2.0
+        assert stats["min_time_ms"] == 1.0
+        assert stats["max_time_ms"] == 3.0
+        assert stats["p50_time_ms"] == pytest.approx(2.0, rel=0.035)
+        assert stats["p99_time_ms"] == 3.0
+
+    def test_queue_stats(self):
+        """Test queue sizes and wait times are aggregated"""
+        monitor = PerformanceMonitor()
+        monitor.record_queue_metrics("concurrency", 4, 0.002)
+        monitor.record_queue_metrics("concurrency", 2)
+
+        stats = monitor.get_stats()["queues"]["concurrency"]
+
+        assert stats["current_size"] == 2
+        assert stats["avg_size"] == 3.0
+        assert stats["max_size"] == 4
+        assert stats["avg_wait_time_ms"] == 2.0
+
+    def test_timing_decorator_records(self):
+        """Test the timing decorator records calls and errors"""
+        monitor = PerformanceMonitor()
+
+        @timing_decorator("work", monitor)
+        def work(fail=False):
+            if fail:
+                raise ValueError("boom")
+            return "done"
+
+        assert work() == "done"
+        with pytest.raises(ValueError):
+            work(fail=True)
+
+        stats = monitor.get_stats()
+        assert stats["operations"]["work"]["count"] == 2
+        assert stats["errors"]["work_error"]["total_count"] == 1
+
+    def test_operations_by_enum_and_name(self):
+        """Test enum operations and ad-hoc names report under their labels"""
+        monitor = PerformanceMonitor()
+        monitor.record_operation_time(Operation.DNS_QUERY, 0.001)
+        monitor.record_operation_time("dns_query", 0.001)
+        monitor.record_operation_time("custom_step", 0.001)
+
+        operations = monitor.get_stats()["operations"]
+
+        assert operations["dns_query"]["count"] == 2
+        assert operations["custom_step"]["count"] == 1
+        assert "dns_resolution" not in operations
+
+    @pytest.mark.asyncio
+    async def test_memory_sampling(self):
+        """Test the monitor samples resident memory"""
+        monitor = PerformanceMonitor()
+        await monitor.start_monitoring(interval=0.01)
+        await asyncio.sleep(0.05)
+        await monitor.stop_monitoring()
+
+        memory = monitor.get_stats()["memory"]
+        expected = psutil.Process().memory_info().rss / 1024 / 1024
+
+        assert memory["current_mb"] == pytest.approx(expected, rel=0.2)
+        assert monitor._statm_fd is None
+
+    def test_error_rate_window(self, monkeypatch):
+        """Test errors older than five minutes stop counting toward the rate"""
+        monitor = PerformanceMonitor()
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+        for _ in range(10):
+            monitor.record_error("timeout")
+        now[0] += 301
+        monitor.record_error("timeout")
+
+        stats = monitor.get_stats()["errors"]["timeout"]
+
+        assert stats["total_count"] == 11
+        assert stats["rate_per_minute"] == 0.2
+
+
+class TestConcurrencyLimiter:
+    """Test concurrency limiting and backpressure"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_resume_on_release(self):
+        """Test queued requests proceed as slots are released"""
+        limiter = ConcurrencyLimiter(max_concurrent=2, queue_size=10)
+        running = 0
+        peak = 0
+
+        async def work():
+            nonlocal running, peak
+            async with await limiter.acquire(timeout=1.0):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(10)))
+
+        assert peak == 2
+        assert limiter._active_count == 0
+        assert not limiter._waiters
+
+    def test_construction_allocates_no_primitives(self):
+        """Test limiters can be built outside a running loop"""
+        limiter = ConcurrencyLimiter()
+        limiter.configure(max_concurrent=5, queue_size=7)
+
+        assert not limiter._waiters
+        assert (limiter.max_concurrent, limiter.queue_size) == (5, 7)
+
+    @pytest.mark.asyncio
+    async def test_released_slot_goes_to_the_oldest_waiter(self):
+        """Test a newcomer cannot take a slot ahead of a queued request"""
+        limiter = ConcurrencyLimiter(max_concurrent=1, queue_size=10)
+        holder = await limiter.acquire()
+        order = []
+
+        async def queued():
+            async with await limiter.acquire(timeout=1.0):
+                order.append("queued")
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+        async with holder:
+            pass
+        async with await limiter.acquire(timeout=1.0):
+            order.append("late")
+        await task
+
+        assert order == ["queued", "late"]
+        assert limiter._active_count == 0
+        assert not limiter._waiters
+
+    @pytest.mark.asyncio
+    async def test_backpressure_and_timeout(self):
+        """Test full queues reject and stalled waiters time out"""
+        limiter = ConcurrencyLimiter(max_concurrent=1, queue_size=1)
+        holder = await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire(timeout=0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError, match="queue full"):
+            await limiter.acquire()
+        with pytest.raises(RuntimeError, match="timeout"):
+            await waiter
+
+        async with holder:
+            pass
+        async with await limiter.acquire(timeout=0.05):
+            assert limiter._active_count == 1
+
+    def test_adaptive_limit_backs_off_and_recovers(self):
+        """Test slow windows halve the limit and fast ones grow it again"""
+        limiter = ConcurrencyLimiter(max_concurrent=64, queue_size=10)
+        limiter.configure_adaptive(target_latency_ms=50.0, min_concurrent=4)
+
+        for _ in range(100):
+            limiter.record_latency(500.0)
+        assert limiter.limit == 32
+
+        limiter._last_backoff = 0.0
+        for _ in range(1000):
+            limiter.record_latency(1.0)
+        assert 32 < limiter.limit <= 64
+
+        limiter.configure_adaptive(None)
+        limiter.record_overload()
+        assert limiter.limit == 64
+
+    def test_timing_decorator_without_monitor(self):
+        """Test an unmonitored decorator returns the function unchanged"""
+
+        def work():
+            return "done"
+
+        assert timing_decorator("work", None)(work) is work
+
+    def test_stats_entries_reused_until_changed(self):
+        """Test unchanged operations reuse their rendered stats"""
+        monitor = PerformanceMonitor()
+        monitor.record_operation_time("lookup", 0.001)
+        monitor.record_queue_metrics("concurrency", 1, 0.001)
+
+        first = monitor.get_stats()
+        second = monitor.get_stats()
+        assert second["operations"]["lookup"] is first["operations"]["lookup"]
+        assert second["queues"]["concurrency"] is first["queues"]["concurrency"]
+
+        monitor.record_operation_time("lookup", 0.003)
+        monitor.record_queue_metrics("concurrency", 3)
+        third = monitor.get_stats()
+        assert third["operations"]["lookup"]["count"] == 2
+        assert third["queues"]["concurrency"]["current_size"] == 3
+
+    def test_timing_decorator_does_not_pin_monitor(self):
+        """Test decorated functions hold the monitor weakly"""
+        monitor = PerformanceMonitor()
+        monitor_ref = weakref.ref(monitor)
+
+        @timing_decorator("work", monitor)
+        def work():
+            raise ValueError("boom")
+
+        del monitor
+        gc.collect()
+
+        assert monitor_ref() is None
+        with pytest.raises(ValueError):
+            work()
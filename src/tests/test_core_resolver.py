@@ -0,0 +1,550 @@
+"""
+Core Resolver Tests
+
+Tests for upstream querying and resolution against a local fake upstream.
+"""
+
+import asyncio
+import socket
+import struct
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dns_server.core.message import (
+    DNSClass,
+    DNSHeader,
+    DNSMessage,
+    DNSQuestion,
+    DNSRecordType,
+    DNSResourceRecord,
+    DNSResponseCode,
+    create_a_record,
+)
+from dns_server.core import resolver as resolver_module
+from dns_server.core.performance import Operation, PerformanceMonitor
+from dns_server.core.resolver import DNSResolver, IterativeResolver, QueryContext
+
+
+def _soa_record(ttl: int, minimum: int) -> DNSResourceRecord:
+    rdata = b"\x02ns\x00\x05admin\x00" + struct.pack("!IIIII", 1, 2, 3, 4, minimum)
+    return DNSResourceRecord("example.com.", DNSRecordType.SOA, DNSClass.IN, ttl, rdata)
+
+
+class FakeUpstream(asyncio.DatagramProtocol):
+    """UDP upstream answering every A query with a fixed address"""
+
+    def __init__(self, delay: float = 0.0, rcode: int = DNSResponseCode.NOERROR):
+        self.delay = delay
+        self.rcode = rcode
+        self.queries = []
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        query = DNSMessage.from_bytes(data)
+        self.queries.append(query)
+        response = query.create_response(self.rcode)
+        if self.rcode == DNSResponseCode.NOERROR:
+            response.answers = [create_a_record(query.questions[0].name, "192.0.2.1")]
+        elif self.rcode == DNSResponseCode.NXDOMAIN:
+            response.authority = [_soa_record(ttl=3600, minimum=60)]
+        asyncio.get_running_loop().call_later(
+            self.delay, self.transport.sendto, response.to_bytes(), addr
+        )
+
+
+async def _start_upstream(**kwargs):
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: FakeUpstream(**kwargs), local_addr=("127.0.0.1", 0)
+    )
+    port = transport.get_extra_info("sockname")[1]
+    return transport, protocol, f"127.0.0.1:{port}"
+
+
+def _make_resolver(*servers: str, **settings) -> DNSResolver:
+    return DNSResolver(SimpleNamespace(upstream_servers=list(servers), **settings))
+
+
+def _question(name: str = "example.com.") -> DNSQuestion:
+    return DNSQuestion(name, DNSRecordType.A, DNSClass.IN)
+
+
+def _build_query(question: DNSQuestion) -> bytes:
+    header = DNSHeader(transaction_id=1, flags=0, rd=True, question_count=1)
+    return DNSMessage(
+        header=header, questions=[question], answers=[], authority=[], additional=[]
+    ).to_bytes()
+
+
+class TestUpstreamQueries:
+    """Test queries over the pooled upstream sockets"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_the_socket_pool(self):
+        """Test concurrent queries are matched to their own responses"""
+        transport, upstream, address = await _start_upstream(delay=0.01)
+        resolver = _make_resolver(address)
+        names = [f"host{i}.example.com." for i in range(20)]
+
+        try:
+            responses = await asyncio.gather(
+                *(resolver.resolve(_question(name)) for name in names)
+            )
+            txids = {q.header.transaction_id for q in upstream.queries}
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert [r.questions[0].name for r in responses] == names
+        assert all(r.header.rcode == DNSResponseCode.NOERROR for r in responses)
+        assert len(txids) == len(names)
+        assert not resolver._pending
+
+    @pytest.mark.asyncio
+    async def test_queries_leave_from_random_ports(self):
+        """Test the pool spreads queries over sockets on different ports"""
+        transport, upstream, address = await _start_upstream()
+        resolver = _make_resolver(address)
+
+        try:
+            for i in range(40):
+                await resolver.resolve(_question(f"port{i}.example.com."))
+            ports = {
+                sock.transport.get_extra_info("sockname")[1]
+                for sock in resolver._udp_sockets
+                if sock is not None
+            }
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert len(ports) > 1
+        assert all(port >= 1024 for port in ports)
+
+    @pytest.mark.asyncio
+    async def test_upstream_sockets_are_tuned(self):
+        """Test pooled sockets get sized buffers and no address reuse"""
+        transport, _, address = await _start_upstream()
+        resolver = _make_resolver(address)
+
+        try:
+            await resolver.resolve(_question())
+            (sock,) = [s for s in resolver._udp_sockets if s is not None]
+            udp = sock.transport.get_extra_info("socket")
+            rcvbuf = udp.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            reuseaddr = udp.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert rcvbuf >= 65536
+        assert not reuseaddr
+
+    @pytest.mark.asyncio
+    async def test_used_up_socket_is_replaced(self, monkeypatch):
+        """Test a socket is closed and replaced after its query quota"""
+        monkeypatch.setattr(resolver_module, "_UPSTREAM_SOCKETS", 1)
+        monkeypatch.setattr(resolver_module, "_UPSTREAM_SOCKET_QUERIES", 2)
+        transport, _, address = await _start_upstream()
+        resolver = _make_resolver(address)
+
+        try:
+            await resolver.resolve(_question("a.example.com."))
+            first = resolver._udp_sockets[0]
+            await resolver.resolve(_question("b.example.com."))
+            await resolver.resolve(_question("c.example.com."))
+            second = resolver._udp_sockets[0]
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert second is not first
+        assert first.transport.is_closing()
+
+    @pytest.mark.asyncio
+    async def test_slots_are_opened_independently(self, monkeypatch):
+        """Test opening one slot's socket does not hold up another slot"""
+        resolver = _make_resolver("127.0.0.1:53")
+        slots = iter([0, 1])
+        monkeypatch.setattr(
+            resolver_module,
+            "secrets",
+            SimpleNamespace(randbelow=lambda _: next(slots)),
+        )
+        opening = peak = 0
+
+        async def open_udp_socket():
+            nonlocal opening, peak
+            opening += 1
+            peak = max(peak, opening)
+            await asyncio.sleep(0.01)
+            opening -= 1
+            return SimpleNamespace(
+                transport=SimpleNamespace(is_closing=lambda: False), queries=0
+            )
+
+        resolver._open_udp_socket = open_udp_socket
+        first, second = await asyncio.gather(
+            resolver._get_udp_socket(), resolver._get_udp_socket()
+        )
+
+        assert peak == 2
+        assert resolver._udp_sockets[:2] == [first, second]
+
+    @pytest.mark.asyncio
+    async def test_reply_for_another_question_is_ignored(self):
+        """Test a reply matching the txid but not the question is dropped"""
+        transport, _, address = await _start_upstream(delay=1.0)
+        host, port = address.split(":")
+        resolver = _make_resolver(address)
+
+        async def spoof():
+            while not resolver._pending:
+                await asyncio.sleep(0)
+            txid, (_, addr, _, sock) = next(iter(resolver._pending.items()))
+            forged = DNSMessage.from_bytes(
+                _build_query(_question("evil.example.com."))
+            ).create_response()
+            forged.header.transaction_id = txid
+            sock.datagram_received(forged.to_bytes(), addr)
+
+        try:
+            spoofer = asyncio.ensure_future(spoof())
+            with pytest.raises(TimeoutError):
+                await resolver._query_server(host, int(port), _question(), 0.1)
+            await spoofer
+        finally:
+            resolver.close()
+            transport.close()
+
+    @pytest.mark.asyncio
+    async def test_queries_advertise_edns0(self):
+        """Test upstream queries carry an OPT record unless disabled"""
+        transport, upstream, address = await _start_upstream()
+        resolver = _make_resolver(address)
+        plain = _make_resolver(address, server=SimpleNamespace(edns0_enabled=False))
+
+        try:
+            await resolver.resolve(_question("edns.example."))
+            await plain.resolve(_question("plain.example."))
+        finally:
+            resolver.close()
+            plain.close()
+            transport.close()
+
+        edns_query, plain_query = upstream.queries
+        assert [(rr.rtype, rr.rclass) for rr in edns_query.additional] == [(41, 4096)]
+        assert plain_query.additional == []
+
+    @pytest.mark.parametrize(
+        "name", ["a" * 64 + ".example.com.", ".".join(["a" * 63] * 4) + "."]
+    )
+    def test_invalid_names_are_not_encoded(self, name):
+        """Test over-long labels and names are refused, not sent"""
+        with pytest.raises(ValueError):
+            resolver_module._encode_query_template(name, 1, 1, False)
+
+    @pytest.mark.asyncio
+    async def test_monitor_times_resolution(self):
+        """Test attaching a monitor times resolve and forwarding"""
+        transport, _, address = await _start_upstream()
+        resolver = _make_resolver(address)
+        monitor = PerformanceMonitor()
+        resolver.set_performance_monitor(monitor)
+
+        try:
+            await resolver.resolve(_question())
+        finally:
+            resolver.close()
+            transport.close()
+
+        for operation in (
+            Operation.DNS_RESOLUTION,
+            Operation.UPSTREAM_FORWARDING,
+            Operation.DNS_QUERY,
+        ):
+            assert monitor.operation_histogram(operation).count == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_questions_are_coalesced(self):
+        """Test concurrent duplicates trigger a single upstream query"""
+        transport, upstream, address = await _start_upstream(delay=0.02)
+        resolver = _make_resolver(address)
+
+        try:
+            responses = await asyncio.gather(
+                *(resolver.resolve(_question()) for _ in range(50))
+            )
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert len(upstream.queries) == 1
+        assert all(r.answers for r in responses)
+        assert not resolver._inflight
+
+    @pytest.mark.asyncio
+    async def test_timeout_clears_pending_entry(self):
+        """Test a timed-out query does not leak its transaction"""
+        transport, _, address = await _start_upstream(delay=1.0)
+        host, port = address.split(":")
+        resolver = _make_resolver(address)
+
+        try:
+            with pytest.raises(TimeoutError):
+                await resolver._query_server(host, int(port), _question(), 0.05)
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert not resolver._pending
+
+
+class TestNegativeCache:
+    """Test caching of negative upstream answers"""
+
+    @pytest.mark.asyncio
+    async def test_nxdomain_is_served_from_cache(self):
+        """Test a repeated NXDOMAIN does not reach the upstream again"""
+        transport, upstream, address = await _start_upstream(
+            rcode=DNSResponseCode.NXDOMAIN
+        )
+        resolver = _make_resolver(address)
+
+        try:
+            first = await resolver.resolve(_question("missing.example.com."))
+            second = await resolver.resolve(_question("MISSING.example.com."))
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert len(upstream.queries) == 1
+        assert first.header.rcode == second.header.rcode == DNSResponseCode.NXDOMAIN
+        assert second.authority[0].rtype == DNSRecordType.SOA
+        # The SOA minimum bounds the cached lifetime
+        assert 0 < second.authority[0].ttl <= 60
+
+    @pytest.mark.asyncio
+    async def test_configured_ttl_cap_applies(self):
+        """Test the server section's negative_ttl_max caps the cached lifetime"""
+        transport, _, address = await _start_upstream(rcode=DNSResponseCode.NXDOMAIN)
+        resolver = _make_resolver(address, server=SimpleNamespace(negative_ttl_max=5))
+
+        try:
+            await resolver.resolve(_question("missing.example.com."))
+            cached = await resolver.resolve(_question("missing.example.com."))
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert 0 < cached.authority[0].ttl <= 5
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_is_reported(self):
+        """Test callers learn whether the answer came from the cache"""
+        transport, upstream, address = await _start_upstream(
+            rcode=DNSResponseCode.NXDOMAIN
+        )
+        resolver = _make_resolver(address)
+
+        try:
+            _, first_hit = await resolver.resolve_with_cache_hit(_question())
+            _, second_hit = await resolver.resolve_with_cache_hit(_question())
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert (first_hit, second_hit) == (False, True)
+
+    @pytest.mark.asyncio
+    async def test_servfail_is_not_cached(self):
+        """Test upstream SERVFAIL answers are always retried"""
+        transport, upstream, address = await _start_upstream(
+            rcode=DNSResponseCode.SERVFAIL
+        )
+        resolver = _make_resolver(address)
+
+        try:
+            await resolver.resolve(_question())
+            await resolver.resolve(_question())
+        finally:
+            resolver.close()
+            transport.close()
+
+        assert len(upstream.queries) == 2
+
+
+class TestQueryContext:
+    """Test per-resolution context reuse"""
+
+    def test_released_context_is_reset_on_reuse(self):
+        """Test a pooled context comes back without stale state"""
+        context = QueryContext.acquire(_question("first.example."))
+        context.visited_servers.add(1)
+        context.recursion_depth = 3
+        context.release()
+
+        reused = QueryContext.acquire(_question("second.example."))
+
+        assert reused is context
+        assert reused.original_question.name == "second.example."
+        assert reused.recursion_depth == 0
+        assert not reused.visited_servers
+        assert not reused.is_expired()
+        assert 29.0 < reused.remaining() <= 30.0
+
+
+class TestUpstreamSelection:
+    """Test latency-aware upstream ordering"""
+
+    def test_fastest_server_is_tried_first(self):
+        """Test a two-server pool always prefers the lower RTT"""
+        resolver = _make_resolver("192.0.2.1", "192.0.2.2")
+        slow, fast = resolver.upstream_servers
+        slow.record_rtt(0.2)
+        fast.record_rtt(0.01)
+
+        for _ in range(10):
+            assert resolver._order_upstreams(resolver.upstream_servers) == [
+                fast,
+                slow,
+            ]
+
+    def test_rtt_is_smoothed(self):
+        """Test a single outlier only moves the average an eighth of the way"""
+        resolver = _make_resolver("192.0.2.1")
+        server = resolver.upstream_servers[0]
+        server.record_rtt(0.01)
+        server.record_rtt(0.81)
+
+        assert server.ewma_rtt == pytest.approx(0.11)
+
+    @pytest.mark.asyncio
+    async def test_stalled_upstream_does_not_delay_answer(self):
+        """Test the faster of two raced upstreams answers the query"""
+        slow_transport, _, slow_address = await _start_upstream(delay=2.0)
+        fast_transport, fast, fast_address = await _start_upstream()
+        resolver = _make_resolver(slow_address, fast_address)
+        slow_server = resolver.upstream_servers[0]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            response = await resolver.resolve(_question())
+        finally:
+            resolver.close()
+            slow_transport.close()
+            fast_transport.close()
+
+        assert loop.time() - start < 1.0
+        assert response.answers[0].get_readable_rdata() == "192.0.2.1"
+        assert len(fast.queries) == 1
+        # The cancelled loser is not penalised
+        assert slow_server.failure_count == 0
+        await asyncio.sleep(0.01)  # Let the cancelled loser unwind
+        assert not resolver._pending
+
+
+def _encode_name(name: str) -> bytes:
+    labels = name.rstrip(".").split(".")
+    return b"".join(bytes([len(l)]) + l.encode() for l in labels) + b"\x00"
+
+
+class TestRecursiveResolution:
+    """Test iterating from the roots through referrals"""
+
+    @pytest.mark.asyncio
+    async def test_referral_follows_glue(self):
+        """Test glue for the referred nameservers is used case-insensitively"""
+        resolver = _make_resolver()
+        question = _question("www.example.com.")
+        asked = []
+
+        async def fake_query(server_ip, port, q, timeout):
+            asked.append(server_ip)
+            response = DNSMessage.from_bytes(_build_query(q)).create_response()
+            if server_ip in resolver.ROOT_SERVERS:
+                response.authority = [
+                    DNSResourceRecord(
+                        "com.",
+                        DNSRecordType.NS,
+                        DNSClass.IN,
+                        172800,
+                        _encode_name("a.gtld-servers.net."),
+                    )
+                ]
+                response.additional = [
+                    create_a_record("A.GTLD-SERVERS.NET.", "192.0.2.53"),
+                    create_a_record("unrelated.example.", "192.0.2.99"),
+                ]
+            else:
+                response.answers = [create_a_record(q.name, "192.0.2.1")]
+            return response
+
+        resolver._query_upstream = fake_query
+
+        response = await resolver.resolve(question, use_recursion=False)
+
+        assert response.answers[0].get_readable_rdata() == "192.0.2.1"
+        assert asked[-1] == "192.0.2.53"
+        assert len(asked) == 2
+
+
+class TestIterativeResolver:
+    """Test root referrals for non-recursive clients"""
+
+    @pytest.mark.asyncio
+    async def test_root_referral(self):
+        """Test the referral names root servers with matching glue"""
+        resolver = IterativeResolver(_make_resolver())
+
+        response = await resolver.resolve(_question())
+        parsed = DNSMessage.from_bytes(response.to_bytes())
+
+        assert [rr.get_readable_rdata() for rr in parsed.authority] == [
+            "a.root-servers.net.",
+            "b.root-servers.net.",
+            "c.root-servers.net.",
+        ]
+        assert [rr.name for rr in parsed.additional] == [
+            rr.get_readable_rdata() for rr in parsed.authority
+        ]
+        assert parsed.additional[0].get_readable_rdata() == "198.41.0.4"
+
+
+class TestHealthCheck:
+    """Test resolver health reporting"""
+
+    @pytest.mark.asyncio
+    async def test_probes_run_concurrently(self):
+        """Test slow probes overlap rather than adding up"""
+        resolver = _make_resolver("192.0.2.1", "192.0.2.2", "192.0.2.3")
+
+        async def slow_query(server_ip, port, question, timeout):
+            await asyncio.sleep(0.1)
+            if server_ip == "192.0.2.2":
+                raise TimeoutError("no answer")
+            return DNSMessage.from_bytes(_build_query(question)).create_response()
+
+        resolver._query_upstream = slow_query
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        health = await resolver.health_check()
+
+        assert loop.time() - start < 0.3
+        assert health["status"] == "healthy"
+        assert [s["responsive"] for s in health["upstream_servers"]] == [
+            True,
+            False,
+            True,
+        ]
+        assert health["upstream_servers"][1]["last_error"] == "no answer"
@@ -0,0 +1,692 @@
+"""
+Core Server Tests
+
+Tests for request handling and listener setup in the DNS server.
+"""
+
+import asyncio
+import socket
+import struct
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dns_server.config.schema import LoggingConfig
+from dns_server.core.message import (
+    DNSClass,
+    DNSHeader,
+    DNSMessage,
+    DNSQuestion,
+    DNSRecordType,
+    DNSResourceRecord,
+    DNSResponseCode,
+)
+from dns_server.core import server as server_module
+from dns_server.core.performance import Operation, PerformanceMonitor
+from dns_server.core.server import DNSServer, DNSUDPProtocol
+from dns_server.dns_logging import dns_logger, setup_logging
+
+
+def _build_query(
+    name: str = "example.com.",
+    qtype: int = DNSRecordType.A,
+    tid: int = 0x1234,
+    rd: bool = False,
+) -> bytes:
+    """Build a raw DNS query packet"""
+    header = DNSHeader(transaction_id=tid, flags=0, rd=rd, question_count=1)
+    question = DNSQuestion(name, qtype, DNSClass.IN)
+    return DNSMessage(
+        header=header, questions=[question], answers=[], authority=[], additional=[]
+    ).to_bytes()
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """A DNS server with logging pointed at a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dns_logger, "_request_tracker", None)
+    setup_logging(LoggingConfig(level="WARNING", file=str(tmp_path / "app.log")))
+
+    config = SimpleNamespace(
+        upstream_servers=[],
+        server=SimpleNamespace(
+            bind_address="127.0.0.1", dns_port=0, udp_rcvbuf=65536, udp_sndbuf=65536
+        ),
+        security=SimpleNamespace(rate_limit_per_ip=100),
+    )
+    return DNSServer(config)
+
+
+class TestHandleRequest:
+    """Test the shared UDP/TCP request handler"""
+
+    @pytest.mark.asyncio
+    async def test_iterative_query_gets_referral(self, server):
+        """Test a non-recursive query is answered with the root referral"""
+        data = await server.handle_dns_request(_build_query(), "192.0.2.10", "UDP")
+        response = DNSMessage.from_bytes(data)
+
+        assert response.header.transaction_id == 0x1234
+        assert response.header.rcode == DNSResponseCode.NOERROR
+        assert response.authority
+        assert server.get_stats()["udp_queries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_request_ids_are_unique(self, server):
+        """Test each request is logged under its own ID"""
+        for tid in range(3):
+            await server.handle_dns_request(_build_query(tid=tid), "192.0.2.10", "UDP")
+
+        ids = [r["request_id"] for r in server.request_tracker.recent_requests]
+        assert len(set(ids)) == 3
+        assert all(i.startswith(server.request_tracker._id_prefix) for i in ids)
+
+    @pytest.mark.asyncio
+    async def test_monitor_times_request_handling(self, server):
+        """Test attaching a monitor times each handled request"""
+        monitor = PerformanceMonitor()
+        server.set_performance_monitor(monitor)
+
+        await server.handle_dns_request(_build_query(), "192.0.2.10", "UDP")
+
+        histogram = monitor.operation_histogram(Operation.DNS_REQUEST_HANDLING)
+        assert histogram.count == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_tracking_skips_request_records(self, server):
+        """Test queries are still answered but not recorded when tracking is off"""
+        server.request_tracker.enabled = False
+
+        data = await server.handle_dns_request(_build_query(), "192.0.2.10", "UDP")
+
+        assert DNSMessage.from_bytes(data).header.transaction_id == 0x1234
+        assert not server.request_tracker.recent_requests
+        assert not server.request_tracker.active_requests
+        assert server.get_stats()["total_queries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_large_query_is_parsed_off_loop(self, server):
+        """Test a query above the offload size is parsed on the parser pool"""
+        padding = DNSResourceRecord(
+            "pad.", DNSRecordType.TXT, DNSClass.IN, 0, b"x" * 600
+        )
+        query = DNSMessage.from_bytes(_build_query(tid=7))
+        query.additional.append(padding)
+        query.header.additional_count = 1
+
+        data = await server.handle_dns_request(query.to_bytes(), "192.0.2.10", "UDP")
+
+        assert DNSMessage.from_bytes(data).header.transaction_id == 7
+        assert server._parser_pool is not None
+        server._parser_pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_malformed_packet_gets_formerr(self, server):
+        """Test a truncated packet is answered with FORMERR under its own ID"""
+        data = await server.handle_dns_request(b"\xab\xcd\x01", "192.0.2.10", "UDP")
+        response = DNSMessage.from_bytes(data)
+
+        assert response.header.transaction_id == 0xABCD
+        assert response.header.qr and response.header.rd
+        assert response.header.rcode == DNSResponseCode.FORMERR
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_query_is_refused(self, server):
+        """Test a refused response echoes the ID, RD bit and question"""
+        server.config.security.rate_limit_per_ip = 1
+        server._check_rate_limit("192.0.2.10")
+        query = _build_query(tid=0x4321, rd=True)
+
+        data = await server.handle_dns_request(query, "192.0.2.10", "UDP")
+        response = DNSMessage.from_bytes(data)
+
+        assert response.header.transaction_id == 0x4321
+        assert response.header.rcode == DNSResponseCode.REFUSED
+        assert response.header.rd and response.header.ra
+        assert response.questions == DNSMessage.from_bytes(query).questions
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_garbage_is_refused_unparsed(self, server):
+        """Test an unparseable packet over the limit is refused, not FORMERR"""
+        server.config.security.rate_limit_per_ip = 1
+        server._check_rate_limit("192.0.2.10")
+        packet = b"\x43\x21\x01\x00\x00\x01" + b"\x00" * 6 + b"\xff\xff"
+
+        data = await server.handle_dns_request(packet, "192.0.2.10", "UDP")
+        response = DNSMessage.from_bytes(data)
+
+        assert response.header.transaction_id == 0x4321
+        assert response.header.rcode == DNSResponseCode.REFUSED
+        assert not response.questions
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_gets_servfail(self, server, monkeypatch):
+        """Test an internal failure still answers SERVFAIL with the query's ID"""
+
+        def fail(*args, **kwargs):
+            raise KeyError("boom")
+
+        monkeypatch.setattr(server, "_get_record_type_name", fail)
+        data = await server.handle_dns_request(
+            _build_query(tid=0x2222), "192.0.2.10", "UDP"
+        )
+        response = DNSMessage.from_bytes(data)
+
+        assert response.header.transaction_id == 0x2222
+        assert response.header.rcode == DNSResponseCode.SERVFAIL
+        assert response.questions[0].name == "example.com."
+        assert server.get_stats()["errors"] == 1
+
+    def test_rate_limit_is_per_ip(self, server):
+        """Test a client is refused once its bucket is empty"""
+        server.config.security.rate_limit_per_ip = 3
+
+        results = [server._check_rate_limit("192.0.2.10") for _ in range(4)]
+
+        assert results == [True, True, True, False]
+        assert server._check_rate_limit("192.0.2.11")
+
+    def test_rate_limiter_slot_is_taken_over(self, server, monkeypatch):
+        """Test a client hashed onto an occupied slot replaces its owner"""
+        monkeypatch.setattr(server_module, "_RATE_LIMIT_SLOTS", 1)
+        server = DNSServer(server.config)
+        server.config.security.rate_limit_per_ip = 1
+
+        assert server._check_rate_limit("192.0.2.1")
+        assert not server._check_rate_limit("192.0.2.1")
+        assert server._check_rate_limit("192.0.2.2")
+
+        assert server._rate_limit_ips == ["192.0.2.2"]
+
+
+class TestResponseCache:
+    """Test the encoded-response cache in front of the resolver"""
+
+    @staticmethod
+    def _answer_with(server, ttl=60):
+        """Make the resolver answer every question with one A record"""
+        calls = []
+
+        async def resolve(question, use_recursion=True):
+            calls.append(question)
+            answer = DNSResourceRecord(
+                question.name, DNSRecordType.A, DNSClass.IN, ttl, b"\xc0\x00\x02\x01"
+            )
+            response = DNSMessage.from_bytes(_build_query()).create_response()
+            response.answers = [answer]
+            return response, False
+
+        server.resolver.resolve_with_cache_hit = resolve
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_udp_hit_is_answered_without_a_task(self, server):
+        """Test a repeated question is answered inline from the cache"""
+        calls = self._answer_with(server)
+        await server.handle_dns_request(
+            _build_query("www.example.com.", tid=1, rd=True), "192.0.2.10", "UDP"
+        )
+
+        sent = []
+        protocol = DNSUDPProtocol(server)
+        protocol.transport = SimpleNamespace(
+            sendto=lambda data, addr: sent.append(data), get_extra_info=lambda _: None
+        )
+        query = _build_query("WWW.Example.COM.", tid=2, rd=True)
+        protocol.datagram_received(query, ("192.0.2.11", 5353))
+
+        assert len(calls) == 1
+        assert not server._background_tasks
+        response = DNSMessage.from_bytes(sent[0])
+        assert response.header.transaction_id == 2
+        assert response.questions[0].name == "WWW.Example.COM."
+        assert response.answers[0].rdata == b"\xc0\x00\x02\x01"
+        assert server.get_stats()["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_answers_are_not_cached(self, server):
+        """Test answers that must not be reused are not stored"""
+        self._answer_with(server, ttl=0)
+        await server.handle_dns_request(_build_query(rd=True), "192.0.2.10", "UDP")
+
+        assert (
+            server.answer_from_cache(_build_query(rd=True), "192.0.2.10", "UDP") is None
+        )
+        assert not server._response_cache
+
+    @pytest.mark.asyncio
+    async def test_iterative_referral_is_served_from_cache(self, server):
+        """Test the root referral is encoded once and kept apart from RD answers"""
+        first = await server.handle_dns_request(
+            _build_query(tid=1), "192.0.2.10", "UDP"
+        )
+
+        cached = server.answer_from_cache(_build_query(tid=2), "192.0.2.10", "UDP")
+
+        assert cached[2:] == first[2:]
+        assert cached[:2] == b"\x00\x02"
+        assert (
+            server.answer_from_cache(_build_query(rd=True), "192.0.2.10", "UDP") is None
+        )
+
+    @pytest.mark.asyncio
+    async def test_served_ttls_count_down(self, server):
+        """Test a cached answer reports the TTL left, not the original one"""
+        self._answer_with(server, ttl=60)
+        await server.handle_dns_request(_build_query(rd=True), "192.0.2.10", "UDP")
+
+        # Pretend the answer was stored ten seconds ago
+        key, entry = next(iter(server._response_cache.items()))
+        server._response_cache[key] = (entry[0] - 10, entry[1] - 10) + entry[2:]
+        data = server.answer_from_cache(_build_query(rd=True), "192.0.2.10", "UDP")
+
+        assert DNSMessage.from_bytes(data).answers[0].ttl == 50
+
+    @pytest.mark.asyncio
+    async def test_nxdomain_is_kept_for_the_soa_minimum(self, server):
+        """Test a negative answer expires by the SOA MINIMUM, not the SOA TTL"""
+        soa = b"\x02ns\x00\x05admin\x00" + struct.pack("!IIIII", 1, 2, 3, 4, 30)
+
+        async def resolve(question, use_recursion=True):
+            response = DNSMessage.from_bytes(_build_query()).create_response()
+            response.header.rcode = DNSResponseCode.NXDOMAIN
+            response.authority = [
+                DNSResourceRecord(
+                    "example.com.", DNSRecordType.SOA, DNSClass.IN, 3600, soa
+                )
+            ]
+            return response, False
+
+        server.resolver.resolve_with_cache_hit = resolve
+        await server.handle_dns_request(_build_query(rd=True), "192.0.2.10", "UDP")
+
+        expires_at, stored_at = next(iter(server._response_cache.values()))[:2]
+        assert expires_at - stored_at == 30
+
+    @pytest.mark.asyncio
+    async def test_short_lived_glue_ttl_stops_at_zero(self, server):
+        """Test an additional record outlived by the entry is served with TTL 0"""
+
+        async def resolve(question, use_recursion=True):
+            response = DNSMessage.from_bytes(_build_query()).create_response()
+            response.answers = [
+                DNSResourceRecord(
+                    question.name,
+                    DNSRecordType.MX,
+                    DNSClass.IN,
+                    60,
+                    b"\x00\x0a\x02mx\x07example\x03com\x00",
+                )
+            ]
+            response.additional = [
+                DNSResourceRecord(
+                    "mx.example.com.",
+                    DNSRecordType.A,
+                    DNSClass.IN,
+                    5,
+                    b"\xc0\x00\x02\x01",
+                )
+            ]
+            return response, False
+
+        server.resolver.resolve_with_cache_hit = resolve
+        query = _build_query(qtype=DNSRecordType.MX, rd=True)
+        await server.handle_dns_request(query, "192.0.2.10", "UDP")
+
+        key, entry = next(iter(server._response_cache.items()))
+        server._response_cache[key] = (entry[0] - 10, entry[1] - 10) + entry[2:]
+        response = DNSMessage.from_bytes(
+            server.answer_from_cache(query, "192.0.2.10", "UDP")
+        )
+
+        assert response.answers[0].ttl == 50
+        assert response.additional[0].ttl == 0
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_answer_is_evicted(self, server):
+        """Test a full cache drops the answer that went unused longest"""
+        self._answer_with(server)
+        server._response_cache_size = 2
+        for name in ("a.example.", "b.example."):
+            await server.handle_dns_request(
+                _build_query(name, rd=True), "192.0.2.10", "UDP"
+            )
+        server.answer_from_cache(
+            _build_query("a.example.", rd=True), "192.0.2.10", "UDP"
+        )
+        await server.handle_dns_request(
+            _build_query("c.example.", rd=True), "192.0.2.10", "UDP"
+        )
+
+        def cached(name):
+            query = _build_query(name, rd=True)
+            return server.answer_from_cache(query, "192.0.2.10", "UDP") is not None
+
+        assert cached("a.example.") and cached("c.example.")
+        assert not cached("b.example.")
+
+
+class TestStats:
+    """Test server statistics"""
+
+    def test_response_times_keep_last_thousand(self, server):
+        """Test the average covers only the most recent response times"""
+        server._record_response_time(5000.0)
+        for _ in range(1000):
+            server._record_response_time(2.0)
+
+        stats = server.get_stats()
+
+        assert len(server._stats["response_times"]) == 1000
+        assert stats["avg_response_time_ms"] == 2.0
+        assert stats["max_response_time_ms"] == 2.0
+
+    def test_response_times_before_window_fills(self, server):
+        """Test only recorded samples count while the window is filling"""
+        server._record_response_time(4.0)
+        server._record_response_time(8.0)
+
+        stats = server.get_stats()
+
+        assert stats["avg_response_time_ms"] == 6.0
+        assert stats["min_response_time_ms"] == 4.0
+        assert stats["max_response_time_ms"] == 8.0
+
+
+class TestUDPProtocol:
+    """Test the UDP datagram entry point"""
+
+    @pytest.mark.asyncio
+    async def test_queries_over_inflight_limit_are_dropped(self, server):
+        """Test new datagrams are dropped while the in-flight limit is reached"""
+        sent = []
+        protocol = DNSUDPProtocol(server)
+        protocol.transport = SimpleNamespace(
+            sendto=lambda data, addr: sent.append(data), get_extra_info=lambda _: None
+        )
+        server._inflight_limit = 1
+
+        addr = ("192.0.2.10", 5353)
+        protocol.datagram_received(_build_query(tid=1), addr)
+        protocol.datagram_received(_build_query(tid=2), addr)
+        await asyncio.gather(*server._background_tasks)
+
+        assert len(sent) == 1
+        assert server._inflight == 0
+        assert server.get_stats()["drops"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queued_datagrams_are_read_in_one_callback(self, server):
+        """Test datagrams waiting on the socket are drained with the first"""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.setblocking(False)
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.bind(("127.0.0.1", 0))
+        for tid in (1, 2, 3):
+            client.sendto(_build_query(tid=tid), listener.getsockname())
+        await asyncio.sleep(0.01)
+
+        protocol = DNSUDPProtocol(server)
+        protocol._sock = listener
+        protocol.datagram_received(*listener.recvfrom(512))
+        await asyncio.gather(*server._background_tasks)
+
+        tids = sorted(
+            DNSMessage.from_bytes(client.recv(512)).header.transaction_id
+            for _ in range(3)
+        )
+        listener.close()
+        client.close()
+        assert tids == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_oversized_answers_are_truncated_to_the_client_size(self, server):
+        """Test UDP answers over the client's payload size come back with TC"""
+
+        async def resolve(question, use_recursion=True):
+            response = DNSMessage.from_bytes(_build_query()).create_response()
+            response.answers = [
+                DNSResourceRecord(
+                    question.name,
+                    DNSRecordType.A,
+                    DNSClass.IN,
+                    60,
+                    bytes([192, 0, 2, i]),
+                )
+                for i in range(40)
+            ]
+            return response, False
+
+        server.resolver.resolve_with_cache_hit = resolve
+        sent = []
+        protocol = DNSUDPProtocol(server)
+        protocol.transport = SimpleNamespace(
+            sendto=lambda data, addr: sent.append(data), get_extra_info=lambda _: None
+        )
+        addr = ("192.0.2.10", 5353)
+
+        plain = _build_query("big.example.", tid=1, rd=True)
+        edns = DNSMessage.from_bytes(_build_query("big.example.", tid=2, rd=True))
+        edns.additional = [DNSResourceRecord(".", 41, 4096, 0, b"")]
+        edns.header.additional_count = 1
+
+        protocol.datagram_received(plain, addr)
+        await asyncio.gather(*server._background_tasks)
+        protocol.datagram_received(edns.to_bytes(), addr)  # From the cache
+        protocol.datagram_received(plain, addr)
+
+        truncated, full, cached = (DNSMessage.from_bytes(data) for data in sent)
+        assert len(sent[0]) <= 512 and truncated.header.tc
+        assert truncated.questions[0].name == "big.example."
+        assert not truncated.answers
+        assert len(sent[1]) > 512 and not full.header.tc
+        assert len(full.answers) == 40
+        assert cached.header.tc and cached.header.transaction_id == 1
+
+    def test_rate_limited_query_is_refused_without_a_task(self, server):
+        """Test an over-limit client is answered REFUSED from the callback"""
+        sent = []
+        protocol = DNSUDPProtocol(server)
+        protocol.transport = SimpleNamespace(
+            sendto=lambda data, addr: sent.append(data), get_extra_info=lambda _: None
+        )
+        server.config.security.rate_limit_per_ip = 1
+        server._check_rate_limit("192.0.2.10")
+
+        protocol.datagram_received(_build_query(tid=5), ("192.0.2.10", 5353))
+
+        assert not server._background_tasks
+        response = DNSMessage.from_bytes(sent[0])
+        assert response.header.transaction_id == 5
+        assert response.header.rcode == DNSResponseCode.REFUSED
+
+
+class TestTCP:
+    """Test the TCP listener"""
+
+    @pytest.mark.asyncio
+    async def test_responses_are_length_prefixed(self, server):
+        """Test TCP queries on one connection get length-prefixed answers"""
+        await server.start()
+        try:
+            port = server._tcp_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for tid in (1, 2):
+                query = _build_query(tid=tid)
+                writer.write(struct.pack("!H", len(query)) + query)
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                response = DNSMessage.from_bytes(await reader.readexactly(length))
+                assert response.header.transaction_id == tid
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await server.stop()
+
+        assert server.get_stats()["tcp_queries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_pipelined_and_split_queries_are_answered_in_order(self, server):
+        """Test messages sharing a segment or spanning two are all answered"""
+        await server.start()
+        try:
+            port = server._tcp_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            stream = b"".join(
+                struct.pack("!H", len(q)) + q
+                for q in (_build_query(tid=tid) for tid in (1, 2, 3))
+            )
+            writer.write(stream[:-5])
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            writer.write(stream[-5:])
+
+            tids = []
+            for _ in range(3):
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                response = DNSMessage.from_bytes(await reader.readexactly(length))
+                tids.append(response.header.transaction_id)
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await server.stop()
+
+        assert tids == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_cached_answer_waits_for_an_earlier_query(self, server):
+        """Test a cached answer does not overtake an uncached query before it"""
+        # Recursive answers are uncacheable; the iterative referral is cached
+        TestResponseCache._answer_with(server, ttl=0)
+        await server.handle_dns_request(_build_query(), "192.0.2.10", "TCP")
+
+        await server.start()
+        try:
+            port = server._tcp_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b"".join(
+                    struct.pack("!H", len(q)) + q
+                    for q in (_build_query(tid=1, rd=True), _build_query(tid=2))
+                )
+            )
+
+            tids = []
+            for _ in range(2):
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                response = DNSMessage.from_bytes(await reader.readexactly(length))
+                tids.append(response.header.transaction_id)
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await server.stop()
+
+        assert tids == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_client_that_never_reads_cannot_grow_the_write_buffer(
+        self, server, monkeypatch
+    ):
+        """Test reading stays paused while the client leaves answers unread"""
+        protocols = []
+
+        class RecordingProtocol(server_module.DNSTCPProtocol):
+            def connection_made(self, transport):
+                protocols.append(self)
+                sock = transport.get_extra_info("socket")
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+                super().connection_made(transport)
+
+        monkeypatch.setattr(server_module, "DNSTCPProtocol", RecordingProtocol)
+        # Uncacheable answers, so every query is answered by the connection's task
+        TestResponseCache._answer_with(server, ttl=0)
+        query = _build_query(rd=True)
+        message = struct.pack("!H", len(query)) + query
+        answer = await server.handle_dns_request(query, "192.0.2.10", "TCP")
+
+        await server.start()
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        client.setblocking(False)
+        try:
+            port = server._tcp_server.sockets[0].getsockname()[1]
+            loop = asyncio.get_running_loop()
+            await loop.sock_connect(client, ("127.0.0.1", port))
+            # Far more answers than the socket buffers can hold
+            try:
+                await asyncio.wait_for(
+                    loop.sock_sendall(client, message * 200000), timeout=1.0
+                )
+            except asyncio.TimeoutError:
+                pass
+            buffered = protocols[0].transport.get_write_buffer_size()
+        finally:
+            client.close()
+            await server.stop()
+
+        # At most the answers to one receive buffer's worth of queries plus
+        # the pipeline's, not one per query sent
+        per_buffer = server_module._TCP_BUFFER_SIZE // len(message)
+        limit = (per_buffer + server_module._TCP_PIPELINE_MAX) * (len(answer) + 2)
+        assert buffered <= limit
+
+
+class TestLifecycle:
+    """Test starting and stopping the listeners"""
+
+    @pytest.mark.asyncio
+    async def test_udp_socket_buffers_are_applied(self, server):
+        """Test the configured UDP buffer sizes reach the socket"""
+        await server.start()
+        try:
+            sock = server._udp_server[0].get_extra_info("socket")
+            rcvbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            sndbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        finally:
+            await server.stop()
+
+        # Linux reports double the requested size to account for overhead
+        assert rcvbuf >= 65536
+        assert sndbuf >= 65536
+
+    @pytest.mark.asyncio
+    async def test_udp_responses_are_sent_on_the_socket(self, server):
+        """Test UDP answers reach the client through the direct send path"""
+        await server.start()
+        try:
+            port = server._udp_server[0].get_extra_info("sockname")[1]
+            client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            client.setblocking(False)
+            client.sendto(_build_query(tid=3), ("127.0.0.1", port))
+            loop = asyncio.get_running_loop()
+            data = await asyncio.wait_for(loop.sock_recv(client, 512), 2)
+            client.close()
+            assert server._udp_server[1]._sock is not None
+        finally:
+            await server.stop()
+
+        await asyncio.sleep(0)  # connection_lost runs on the next loop pass
+        assert DNSMessage.from_bytes(data).header.transaction_id == 3
+        assert server._udp_server[1]._sock is None
+
+    @pytest.mark.asyncio
+    async def test_multiple_workers_share_the_port(self, server):
+        """Test a second worker can bind the same UDP port"""
+        server.config.server.workers = 2
+        await server.start()
+        port = server._udp_server[0].get_extra_info("sockname")[1]
+
+        server.config.server.dns_port = port
+        other = DNSServer(server.config)
+        try:
+            await other.start()
+            sock = other._udp_server[0].get_extra_info("socket")
+            assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT)
+        finally:
+            await other.stop()
+            await server.stop()
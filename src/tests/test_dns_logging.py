@@ -22,6 +22,7 @@ from dns_server.config.schema import LoggingConfig
 from dns_server.dns_logging import (
     DNSRequestLogger,
     DNSRequestTracker,
+    format_response_data,
     get_logger,
     get_request_tracker,
     setup_logging,
@@ -290,6 +291,193 @@ class TestLogManager:
         assert len(rotated_files) >= 1
 
 
+class TestTimestamps:
+    """Test request timestamp formatting."""
+
+    def test_utc_isoformat_matches_datetime(self):
+        """Test the cached timestamp parses back to the current UTC time."""
+        from datetime import datetime, timezone
+
+        from dns_server.dns_logging.dns_logger import _utc_isoformat
+
+        first = _utc_isoformat()
+        second = _utc_isoformat()
+
+        assert first.endswith("Z") and len(first) == 27
+        parsed = datetime.fromisoformat(second.replace("Z", "+00:00"))
+        assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 1
+        assert second >= first
+
+    def test_log_datetime_matches_strftime(self):
+        """Test the cached DNS log datetime matches the current UTC second."""
+        from datetime import datetime, timezone
+
+        from dns_server.dns_logging.dns_logger import _utc_log_datetime
+
+        formatted = _utc_log_datetime()
+
+        parsed = datetime.strptime(formatted, "%Y-%m-%d %H:%M:%S UTC").replace(
+            tzinfo=timezone.utc
+        )
+        assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 2
+
+
+class TestDNSFileLogger:
+    """Test the dedicated DNS query log file."""
+
+    def test_query_and_error_lines(self, tmp_path):
+        """Test each query is written as one compact JSON line."""
+        from dns_server.dns_logging.dns_logger import DNSFileLogger
+
+        log_file = tmp_path / "dns-server.log"
+        file_logger = DNSFileLogger(str(log_file))
+
+        file_logger.log_dns_query("example.com.", ["192.0.2.1"])
+        file_logger.log_dns_error("missing.example.", "NXDOMAIN")
+        file_logger.close()
+
+        lines = log_file.read_text().splitlines()
+        assert len(lines) == 2
+        assert ", " not in lines[0]
+
+        success, failure = (json.loads(line) for line in lines)
+        assert success["domain"] == "example.com"
+        assert success["ip_address"] == ["192.0.2.1"]
+        assert success["status"] == "success"
+        assert success["datetime"].endswith(" UTC")
+        assert failure["status"] == "failed"
+        assert failure["message"] == "NXDOMAIN"
+
+    def test_worker_lines_are_written_by_the_main_process(self, tmp_path):
+        """Test a worker queues its DNS log lines for the main process's file."""
+        import queue
+
+        from dns_server.dns_logging import logger as logger_module
+        from dns_server.dns_logging.dns_logger import DNSFileLogger
+
+        log_file = tmp_path / "dns-server.log"
+        log_queue = queue.Queue()
+
+        # Worker side: nothing is written locally
+        logger_module.forward_file_logs(log_queue)
+        try:
+            worker_logger = DNSFileLogger(str(log_file))
+            worker_logger.log_dns_query("example.com.", ["192.0.2.1"])
+            worker_logger.close()
+        finally:
+            logger_module.forward_file_logs(None)
+        assert not log_file.exists()
+        assert log_queue.qsize() == 1
+
+        # Main process side
+        main_logger = DNSFileLogger(str(log_file))
+        listener = logger_module.start_file_log_listener(log_queue)
+        listener.stop()
+        main_logger.close()
+
+        (line,) = log_file.read_text().splitlines()
+        assert json.loads(line)["ip_address"] == ["192.0.2.1"]
+
+    def test_batched_handler_rolls_over_by_written_size(self, tmp_path):
+        """Test buffered lines still roll the file over at maxBytes."""
+        import logging
+
+        from dns_server.dns_logging.dns_logger import BatchedRotatingFileHandler
+
+        log_file = tmp_path / "batched.log"
+        handler = BatchedRotatingFileHandler(
+            str(log_file), maxBytes=100, backupCount=1, flush_interval=60
+        )
+        try:
+            for i in range(3):
+                record = logging.LogRecord(
+                    "test", logging.INFO, __file__, 0, "x" * 39 + str(i), None, None
+                )
+                handler.handle(record)
+        finally:
+            handler.close()
+
+        # logging.shutdown closes every handler again at exit
+        handler.close()
+        handler._flusher.join(1)
+        assert not handler._flusher.is_alive()
+
+        assert log_file.read_text() == "x" * 39 + "2\n"
+        assert (tmp_path / "batched.log.1").read_text().splitlines() == [
+            "x" * 39 + "0",
+            "x" * 39 + "1",
+        ]
+
+
+class TestRecentRequests:
+    """Test paging through the tracker's recent requests."""
+
+    @pytest.fixture
+    def tracker(self, tmp_path, monkeypatch):
+        """A tracker holding five requests, newest first."""
+        monkeypatch.chdir(tmp_path)
+        setup_logging(LoggingConfig(level="WARNING", file=str(tmp_path / "app.log")))
+        tracker = DNSRequestTracker()
+        for i in range(5):
+            tracker.end_request(
+                request_id=tracker.start_request(),
+                client_ip="192.0.2.1",
+                query_type="AAAA" if i % 2 else "A",
+                domain=f"host{i}.example.",
+                response_code="NOERROR",
+                cache_hit=False,
+            )
+        yield tracker
+        tracker.dns_logger.file_logger.close()
+
+    @pytest.mark.asyncio
+    async def test_page_without_filters(self, tracker):
+        """Test offset and limit select a page of the newest requests."""
+        page = await tracker.get_recent_requests(limit=2, offset=1)
+
+        assert [r["domain"] for r in page] == ["host3.example.", "host2.example."]
+
+    @pytest.mark.asyncio
+    async def test_page_with_filters(self, tracker):
+        """Test offset and limit apply to the matching requests only."""
+        page = await tracker.get_recent_requests(
+            limit=5, offset=1, filters={"query_type": "A"}
+        )
+
+        assert [r["domain"] for r in page] == ["host2.example.", "host0.example."]
+
+
+class TestResponseFormatting:
+    """Test response data formatting for logs."""
+
+    def test_core_records_use_their_memoized_text(self):
+        """Test core records are rendered by their own type, once."""
+        from dns_server.core.message import DNSResourceRecord, create_cname_record
+
+        address = DNSResourceRecord("www.example.com.", 1, 1, 60, b"\xc0\x00\x02\x01")
+        alias = create_cname_record("example.com.", "www.example.com.")
+
+        assert format_response_data([alias, address], "A") == [
+            "www.example.com.",
+            "192.0.2.1",
+        ]
+        assert address._readable == "192.0.2.1"
+
+    def test_addresses_are_found_in_record_text(self):
+        """Test A and AAAA records without rdata objects still yield addresses."""
+
+        class TextRecord:
+            rdata = b""
+
+            def __str__(self):
+                return "example.com. 300 IN A 192.0.2.7"
+
+        aaaa = type("Record", (), {"rdata": bytes(15) + b"\x01"})()
+
+        assert format_response_data([TextRecord()], "A") == ["192.0.2.7"]
+        assert format_response_data([aaaa], "AAAA") == ["::1"]
+
+
 class TestIntegration:
     """Integration tests for the complete logging system."""
 
@@ -4,7 +4,6 @@ Performance Test Script for DNS Server
 
 This script demonstrates and tests the performance optimization features:
 - uvloop integration
-- Connection pooling
 - Concurrency limiting
 - Performance monitoring
 - Memory tracking
@@ -19,7 +18,6 @@ from pathlib import Path
 try:
     from dns_server.core.performance import (
         concurrency_limiter,
-        connection_pool,
         performance_monitor,
         timing_decorator,
     )
@@ -28,7 +26,6 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent / "src"))
     from dns_server.core.performance import (
         concurrency_limiter,
-        connection_pool,
         performance_monitor,
         timing_decorator,
     )
@@ -61,29 +58,6 @@ async def test_performance_monitor():
     print("✓ Performance monitoring test completed")
 
 
-async def test_connection_pool():
-    """Test connection pooling functionality"""
-    print("\nTesting Connection Pool...")
-
-    connection_pool.set_monitor(performance_monitor)
-
-    try:
-        # Test getting multiple connections
-        conn1 = await connection_pool.get_connection("8.8.8.8", 53)
-        conn2 = await connection_pool.get_connection("1.1.1.1", 53)
-
-        print("Got connections to 8.8.8.8 and 1.1.1.1")
-
-        # Return connections
-        await conn1.__aexit__(None, None, None)
-        await conn2.__aexit__(None, None, None)
-
-        print("✓ Connection pool test completed")
-
-    except Exception as e:
-        print(f"✗ Connection pool test failed: {e}")
-
-
 async def test_concurrency_limiter():
     """Test concurrency limiting functionality"""
     print("\nTesting Concurrency Limiter...")
@@ -181,7 +155,6 @@ async def main():
     try:
         await test_uvloop()
         await test_performance_monitor()
-        await test_connection_pool()
         await test_concurrency_limiter()
         await test_timing_decorator()
         await run_load_test()